@@ -1,8 +1,42 @@
 import bpy
+import json
 import os
 import sys
 import shutil
+import shlex
+import sqlite3
+import threading
+import time
 import subprocess # Importa o módulo subprocess para executar comandos externos
+from array import array
+
+# O núcleo sem bpy (planejamento dos jobs, cache, agendador) fica no pacote "render4me", ao lado deste arquivo
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+if ADDON_DIR not in sys.path:
+    sys.path.append(ADDON_DIR)
+
+from render4me.affinity import autotune_concurrency, plan_cpu_layout
+from render4me.assets import AssetCache, format_asset_report, stage_blend_assets
+from render4me.batch import build_batch_chunks, fair_share_order, load_batch_manifest, plan_batch, write_batch_manifest
+from render4me.benchmark import ENGINE_IDS, format_benchmark_report, run_benchmark, write_benchmark_report
+from render4me.blendfile import BlendFileError, read_blend_info
+from render4me.cache import RenderCache
+from render4me.core import SPEC_DEFAULTS, PlanningError, plan_render
+from render4me.farm import FarmError, farm_status, format_farm_status, submit_to_farm
+from render4me.history import RenderHistory, balance_chunks, format_batch_prediction, order_longest_first, predict_batch_seconds
+from render4me.integrity import FrameVerifier, format_verify_report
+from render4me.jobqueue import STATE_LABELS, RenderQueue
+from render4me.jobs import format_jobs, jobs_from_json, jobs_from_text, jobs_to_json, write_jobs_file
+from render4me.memory import GB, MemoryGovernor
+from render4me.metrics import BatchMetrics, format_eta
+from render4me.paths import render4me_data_dir
+from render4me.profiles import BUILTIN_PROFILES, PROFILE_DEFAULTS
+from render4me.retry import RetryPolicy, format_quarantine_report
+from render4me.scheduler import ParallelRenderScheduler, build_render_chunks, parse_render_command
+from render4me.shotlist import ShotListError, read_shot_list, write_shot_list
+from render4me.staging import OutputMover, default_staging_dir, format_staging_report, stage_chunks
+from render4me.tiling import TileStitchError, format_tile_report, plan_tile_chunks, single_process_seconds, stitch_stills
+from render4me.video import VideoAssemblyError, assemble_videos, find_ffmpeg, format_video_report, plan_video_chunks
 
 # Informações do Addon
 bl_info = {
@@ -17,6 +51,14 @@ bl_info = {
     "category": "Render",
 }
 
+# Motor próprio de uma cena/câmera da lista; GLOBAL usa o motor das configurações gerais
+SHOT_ENGINE_ITEMS = [
+    ('GLOBAL', "Global", "Usa o motor das configurações gerais"),
+    ('CYCLES', "Cycles", "Renderiza com o Cycles"),
+    ('EEVEE', "Eevee", "Renderiza com o Eevee"),
+    ('WORKBENCH', "Workbench", "Renderiza com o Workbench"),
+]
+
 # --- Propriedades para Cenas Individuais ---
 class BlenderSceneProperties(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(
@@ -36,6 +78,18 @@ class BlenderSceneProperties(bpy.types.PropertyGroup):
         default=250,
         min=1
     )
+    render_engine: bpy.props.EnumProperty(
+        name="Motor de Render",
+        description="Motor usado só nesta cena",
+        items=SHOT_ENGINE_ITEMS,
+        default='GLOBAL'
+    )
+    output_path: bpy.props.StringProperty(
+        name="Pasta de Saída",
+        description="Pasta de saída só desta cena (vazio = a pasta das configurações gerais)",
+        default="",
+        subtype='DIR_PATH'
+    )
 
 # --- Propriedades para Câmeras Individuais ---
 class BlenderCameraProperties(bpy.types.PropertyGroup):
@@ -56,6 +110,124 @@ class BlenderCameraProperties(bpy.types.PropertyGroup):
         default=250,
         min=1
     )
+    render_engine: bpy.props.EnumProperty(
+        name="Motor de Render",
+        description="Motor usado só nesta câmera",
+        items=SHOT_ENGINE_ITEMS,
+        default='GLOBAL'
+    )
+    output_path: bpy.props.StringProperty(
+        name="Pasta de Saída",
+        description="Pasta de saída só desta câmera (vazio = a pasta das configurações gerais)",
+        default="",
+        subtype='DIR_PATH'
+    )
+
+# --- Perfis de Desempenho (aplicados a cada comando por um script --python) ---
+def _follow_profile_rename(profile, context):
+    # Renomear o perfil selecionado mantém a seleção
+    props = context.scene.blender_render_props
+    if props.performance_profile not in props.performance_profiles:
+        props.performance_profile = profile.name
+
+class BlenderPerformanceProfile(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(
+        name="Nome do Perfil",
+        description="Nome usado para selecionar o perfil (ex.: draft, preview, final)",
+        default="",
+        update=_follow_profile_rename
+    )
+    resolution_percentage: bpy.props.IntProperty(
+        name="Resolução (%)",
+        description="Porcentagem da resolução da cena (0 = manter a do .blend)",
+        default=0,
+        min=0,
+        max=100
+    )
+    samples: bpy.props.IntProperty(
+        name="Samples",
+        description="Samples do Cycles ou do Eevee (0 = manter os do .blend)",
+        default=0,
+        min=0
+    )
+    adaptive_threshold: bpy.props.FloatProperty(
+        name="Limiar Adaptativo",
+        description="Limiar de ruído da amostragem adaptativa do Cycles (0 = manter o do .blend)",
+        default=0.0,
+        min=0.0,
+        precision=3
+    )
+    persistent_data: bpy.props.EnumProperty(
+        name="Dados Persistentes",
+        description="Mantém a cena carregada entre os frames de uma animação no Cycles",
+        items=[
+            ('KEEP', "Manter do .blend", "Não altera a opção gravada no .blend"),
+            ('ON', "Ativar", "Reaproveita BVH e texturas entre os frames"),
+            ('OFF', "Desativar", "Recarrega a cena a cada frame"),
+        ],
+        default='KEEP'
+    )
+    denoiser: bpy.props.EnumProperty(
+        name="Denoiser",
+        description="Denoiser do Cycles",
+        items=[
+            ('KEEP', "Manter do .blend", "Não altera o denoiser gravado no .blend"),
+            ('NONE', "Desativado", "Renderiza sem denoiser"),
+            ('OPENIMAGEDENOISE', "OpenImageDenoise", "Denoiser da Intel (CPU)"),
+            ('OPTIX', "OptiX", "Denoiser da NVIDIA (GPU)"),
+        ],
+        default='KEEP'
+    )
+    tile_size: bpy.props.IntProperty(
+        name="Tamanho do Tile",
+        description="Tamanho do tile do Cycles em pixels (0 = manter o do .blend)",
+        default=0,
+        min=0
+    )
+
+class AddPerformanceProfile(bpy.types.Operator):
+    bl_idname = "render.add_performance_profile"
+    bl_label = "Adicionar Perfil"
+    bl_description = "Adiciona um perfil de desempenho que mantém todos os ajustes do .blend, para ser editado"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        names = {profile.name for profile in props.performance_profiles}
+        name = next(f"perfil {i}" for i in range(1, len(names) + 2) if f"perfil {i}" not in names)
+        props.performance_profiles.add().name = name
+        props.performance_profile = name
+        return {'FINISHED'}
+
+class RemovePerformanceProfile(bpy.types.Operator):
+    bl_idname = "render.remove_performance_profile"
+    bl_label = "Remover Perfil"
+    bl_description = "Remove o perfil de desempenho selecionado"
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.blender_render_props
+        return props.performance_profile in props.performance_profiles
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        props.performance_profiles.remove(props.performance_profiles.find(props.performance_profile))
+        props.performance_profile = ""
+        return {'FINISHED'}
+
+class LoadDefaultPerformanceProfiles(bpy.types.Operator):
+    bl_idname = "render.load_default_profiles"
+    bl_label = "Carregar Perfis Padrão"
+    bl_description = "Cria (ou restaura) os perfis draft, preview e final"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        for name, settings in BUILTIN_PROFILES.items():
+            profile = props.performance_profiles.get(name) or props.performance_profiles.add()
+            profile.name = name
+            for key, value in settings.items():
+                setattr(profile, key, value)
+        self.report({'INFO'}, f"Perfis {', '.join(BUILTIN_PROFILES)} carregados.")
+        return {'FINISHED'}
 
 # --- Operador para Adicionar Cena ---
 class AddBlenderScene(bpy.types.Operator):
@@ -64,7 +236,9 @@ class AddBlenderScene(bpy.types.Operator):
     bl_description = "Adiciona uma nova entrada de cena para renderizar"
 
     def execute(self, context):
-        context.scene.blender_render_props.scenes.add()
+        props = context.scene.blender_render_props
+        props.scenes.add()
+        props.active_scene_index = len(props.scenes) - 1
         return {'FINISHED'}
 
 # --- Operador para Remover Cena ---
@@ -76,7 +250,12 @@ class RemoveBlenderScene(bpy.types.Operator):
     index: bpy.props.IntProperty()
 
     def execute(self, context):
-        context.scene.blender_render_props.scenes.remove(self.index)
+        props = context.scene.blender_render_props
+        if not 0 <= self.index < len(props.scenes):
+            self.report({'WARNING'}, "Nenhuma cena selecionada para remover.")
+            return {'FINISHED'}
+        props.scenes.remove(self.index)
+        props.active_scene_index = min(props.active_scene_index, max(0, len(props.scenes) - 1))
         return {'FINISHED'}
 
 # --- Operador para Adicionar Câmera ---
@@ -109,6 +288,47 @@ class RemoveBlenderCamera(bpy.types.Operator):
         
         return {'FINISHED'}
 
+# --- Operador para Ler Cenas e Câmeras Direto do Arquivo .blend ---
+class ReadBlendContents(bpy.types.Operator):
+    bl_idname = "render.read_blend_contents"
+    bl_label = "Ler Cenas e Câmeras do .blend"
+    bl_description = "Preenche as listas de cenas e câmeras lendo o arquivo .blend (sem abrir outro Blender)"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        blend_file_path = bpy.path.abspath(props.blend_file_path) if props.blend_file_path else bpy.data.filepath
+        if not blend_file_path:
+            self.report({'ERROR'}, "Defina o Caminho do Arquivo .blend ou salve o arquivo atual.")
+            return {'CANCELLED'}
+        started = time.perf_counter()
+        try:
+            info = read_blend_info(blend_file_path)
+        except (OSError, BlendFileError) as e:
+            self.report({'ERROR'}, f"Não foi possível ler o .blend: {e}")
+            return {'CANCELLED'}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        props.scenes.clear()
+        for scene in info["scenes"]:
+            item = props.scenes.add()
+            item.name = scene["name"]
+            item.start_frame = max(1, scene["start_frame"])
+            item.end_frame = max(item.start_frame, scene["end_frame"])
+
+        # Cada câmera recebe o range da cena em que está ativa (ou da primeira cena)
+        ranges = {scene["camera"]: scene for scene in reversed(info["scenes"]) if scene["camera"]}
+        props.cameras.clear()
+        for camera in info["cameras"]:
+            scene = ranges.get(camera, info["scenes"][0] if info["scenes"] else None)
+            item = props.cameras.add()
+            item.name = camera
+            if scene is not None:
+                item.start_frame = max(1, scene["start_frame"])
+                item.end_frame = max(item.start_frame, scene["end_frame"])
+        props.active_camera_index = 0
+        self.report({'INFO'}, f"{len(info['scenes'])} cena(s) e {len(info['cameras'])} câmera(s) lidas de {os.path.basename(blend_file_path)} em {elapsed_ms:.0f} ms.")
+        return {'FINISHED'}
+
 # --- Operador para Mover Câmera para Cima/Baixo ---
 class BLENDER_RENDER_OT_cameras_move(bpy.types.Operator):
     bl_idname = "render.cameras_move"
@@ -140,19 +360,254 @@ class BLENDER_RENDER_OT_cameras_move(bpy.types.Operator):
         
         return {'FINISHED'}
 
-# --- Classe UIList para o Sistema de Câmeras (Permite Arrastar e Soltar) ---
-class BLENDER_RENDER_UL_cameras(bpy.types.UIList):
+# --- Filtro e Ordenação das Listas de Câmeras e Cenas ---
+# Com milhares de planos, o filtro por nome e a ordenação são feitos de uma vez pelos utilitários do
+# Blender (UI_UL_list), e os frames são lidos com foreach_get em vez de um acesso por item.
+class ShotListFilter:
+    sort_by_frame: bpy.props.BoolProperty(
+        name="Ordenar pelo Frame Inicial",
+        description="Ordena a lista pelo frame inicial em vez da ordem de render",
+        default=False
+    )
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_property):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row(align=True)
-            row.prop(item, "name", text="", emboss=False, icon='CAMERA_DATA')
+            row.prop(item, "name", text="", emboss=False, icon=self.item_icon)
             row.prop(item, "start_frame", text="Início", emboss=False)
             row.prop(item, "end_frame", text="Fim", emboss=False)
+            if item.render_engine != 'GLOBAL' or item.output_path:
+                # Motor ou pasta de saída próprios
+                row.label(text="", icon='MODIFIER')
+        elif self.layout_type in {'GRID'}:
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon=self.item_icon)
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "sort_by_frame", text="", icon='SORTTIME')
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+        flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name") if self.filter_name else []
+        if self.sort_by_frame:
+            starts = array("i", [0]) * len(items)
+            items.foreach_get("start_frame", starts)
+            order = helper.sort_items_helper(list(enumerate(starts)), key=lambda pair: pair[1])
+        elif self.use_filter_sort_alpha:
+            order = helper.sort_items_by_name(items, "name")
+        else:
+            order = []
+        return flags, order
+
+# --- Classe UIList para o Sistema de Câmeras (Permite Arrastar e Soltar) ---
+class BLENDER_RENDER_UL_cameras(ShotListFilter, bpy.types.UIList):
+    item_icon = 'CAMERA_DATA'
+
+# --- Classe UIList para o Sistema de Cenas ---
+class BLENDER_RENDER_UL_scenes(ShotListFilter, bpy.types.UIList):
+    item_icon = 'SCENE_DATA'
+
+# --- Importação e Exportação da Lista de Câmeras/Cenas (CSV ou JSON) ---
+SHOT_LIST_TARGETS = [
+    ('CAMERAS', "Câmeras", "Lista de câmeras"),
+    ('SCENES', "Cenas", "Lista de cenas"),
+]
+
+def shot_from_item(item):
+    return {"name": item.name, "start_frame": item.start_frame, "end_frame": item.end_frame, "render_engine": "" if item.render_engine == 'GLOBAL' else item.render_engine, "output_path": item.output_path}
+
+def fill_shot_collection(collection, shots):
+    for shot in shots:
+        entry = collection.add()
+        entry.name = shot["name"]
+        entry.start_frame = shot["start_frame"]
+        entry.end_frame = shot["end_frame"]
+        entry.render_engine = shot.get("render_engine") or 'GLOBAL'
+        entry.output_path = shot.get("output_path", "")
+
+class ImportShotList(bpy.types.Operator):
+    bl_idname = "render.import_shot_list"
+    bl_label = "Importar Lista"
+    bl_description = "Lê câmeras ou cenas de um arquivo CSV ou JSON (nome, frames e, opcionalmente, motor e pasta de saída próprios)"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+    target: bpy.props.EnumProperty(items=SHOT_LIST_TARGETS)
+    replace: bpy.props.BoolProperty(
+        name="Substituir a Lista",
+        description="Apaga os itens atuais antes de importar; desativado, os itens do arquivo são acrescentados no fim",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        path = bpy.path.abspath(self.filepath)
+        try:
+            shots = read_shot_list(path)
+        except (OSError, ValueError, ShotListError) as e:
+            # O relatório mostra só o começo; a lista completa fica no console
+            print(f"Render4Me: {e}")
+            self.report({'ERROR'}, f"Lista não importada: {e}")
+            return {'CANCELLED'}
+        collection = props.cameras if self.target == 'CAMERAS' else props.scenes
+        if self.replace:
+            collection.clear()
+        fill_shot_collection(collection, shots)
+        if self.target == 'CAMERAS':
+            props.active_camera_index = 0
+        else:
+            props.active_scene_index = 0
+        label = "câmera(s)" if self.target == 'CAMERAS' else "cena(s)"
+        self.report({'INFO'}, f"{len(shots)} {label} importada(s) de {os.path.basename(path)}.")
+        return {'FINISHED'}
+
+class ExportShotList(bpy.types.Operator):
+    bl_idname = "render.export_shot_list"
+    bl_label = "Exportar Lista"
+    bl_description = "Grava a lista de câmeras ou cenas em CSV ou JSON (a extensão define o formato)"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    check_existing: bpy.props.BoolProperty(default=True, options={'HIDDEN'})
+    filter_glob: bpy.props.StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+    target: bpy.props.EnumProperty(items=SHOT_LIST_TARGETS)
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "cameras.csv" if self.target == 'CAMERAS' else "cenas.csv"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        collection = props.cameras if self.target == 'CAMERAS' else props.scenes
+        path = bpy.path.abspath(self.filepath)
+        if not path.lower().endswith((".csv", ".json")):
+            path += ".csv"
+        try:
+            write_shot_list([shot_from_item(item) for item in collection], path)
+        except OSError as e:
+            self.report({'ERROR'}, f"Não foi possível gravar a lista: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{len(collection)} item(ns) gravado(s) em {path}.")
+        return {'FINISHED'}
+
+def draw_shot_list_tools(layout, props, target):
+    # Motor/pasta próprios do item selecionado e os botões de importar/exportar
+    items, index = (props.cameras, props.active_camera_index) if target == 'CAMERAS' else (props.scenes, props.active_scene_index)
+    if 0 <= index < len(items):
+        col = layout.column(align=True)
+        col.prop(items[index], "render_engine")
+        col.prop(items[index], "output_path")
+    row = layout.row(align=True)
+    row.operator("render.import_shot_list", icon='IMPORT').target = target
+    row.operator("render.export_shot_list", icon='EXPORT').target = target
+
+# --- Propriedades de Cada Arquivo do Lote de Vários .blend ---
+class BlenderBatchFile(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(
+        name="Nome no Lote",
+        description="Nome mostrado no log e nas métricas do lote",
+        default=""
+    )
+    blend_file_path: bpy.props.StringProperty(
+        name="Arquivo .blend",
+        description="Arquivo renderizado por esta entrada do lote",
+        subtype='FILE_PATH',
+        default=""
+    )
+    priority: bpy.props.IntProperty(
+        name="Prioridade",
+        description="Peso na partilha da fila: prioridade 2 recebe o dobro dos processos de prioridade 1",
+        default=1,
+        min=1,
+        max=10
+    )
+    enabled: bpy.props.BoolProperty(
+        name="Ativo",
+        description="Inclui este arquivo no próximo render do lote",
+        default=True
+    )
+    # Cenas, câmeras, frames e demais ajustes do painel no momento em que o arquivo entrou no lote
+    spec_json: bpy.props.StringProperty(default="{}")
+
+class BLENDER_RENDER_UL_batch_files(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_property):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.prop(item, "enabled", text="")
+            row.prop(item, "name", text="", emboss=False, icon='FILE_BLEND')
+            row.prop(item, "priority", text="Prioridade", emboss=False)
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
-            layout.label(text="", icon='CAMERA_DATA')
+            layout.label(text="", icon='FILE_BLEND')
+
+# --- Converte as propriedades do addon na especificação usada pelo núcleo render4me ---
+def spec_from_props(props):
+    spec = {key: getattr(props, key) for key in SPEC_DEFAULTS if key not in ("scenes", "cameras", "performance_profiles")}
+    spec["scenes"] = [shot_from_item(item) for item in props.scenes]
+    spec["cameras"] = [shot_from_item(item) for item in props.cameras]
+    spec["performance_profiles"] = {item.name: {key: getattr(item, key) for key in PROFILE_DEFAULTS} for item in props.performance_profiles}
+    return spec
+
+def apply_spec_to_props(props, spec):
+    # Caminho inverso de spec_from_props: preenche o painel com a especificação de um arquivo do lote
+    for key in SPEC_DEFAULTS:
+        if key not in ("scenes", "cameras", "performance_profiles") and key in spec:
+            setattr(props, key, spec[key])
+    for collection, items in ((props.scenes, spec.get("scenes", [])), (props.cameras, spec.get("cameras", []))):
+        collection.clear()
+        fill_shot_collection(collection, items)
+    props.active_camera_index = 0
+    props.active_scene_index = 0
+    props.performance_profiles.clear()
+    for name, values in spec.get("performance_profiles", {}).items():
+        profile = props.performance_profiles.add()
+        profile.name = name
+        for key, value in values.items():
+            setattr(profile, key, value)
+
+def manifest_from_props(props):
+    files = []
+    for entry in props.batch_files:
+        spec = json.loads(entry.spec_json)
+        spec.update(label=entry.name, priority=entry.priority, enabled=entry.enabled, blend_file_path=bpy.path.abspath(entry.blend_file_path))
+        files.append(spec)
+    return {"defaults": {}, "files": files}
 
 # --- Operador para Gerar o Comando ---
+def apply_plan_to_props(props, plan, report):
+    props.generated_command = format_jobs(plan["jobs"])
+    props.generated_jobs = jobs_to_json(plan["jobs"])
+    for message in plan["messages"]:
+        report({'INFO'}, message)
+    if plan["jobs"]:
+        report({'INFO'}, "Comando(s) gerado(s) com sucesso!")
+    props.predicted_batch_duration = predict_batch_from_props(props)
+
+def _apply_planned_commands():
+    # Executado na thread principal: só ela pode alterar as propriedades
+    plan = _parallel_render_state.pop("plan_result", None)
+    if plan is None:
+        return 0.5 if _parallel_render_state["running"] else None
+
+    def report(level, message):
+        _parallel_render_state["status"] = message
+        print(f"Render4Me: {message}")
+
+    apply_plan_to_props(bpy.context.scene.blender_render_props, plan, report)
+    return None
+
 class GenerateBlenderCommand(bpy.types.Operator):
     bl_idname = "render.generate_blender_command"
     bl_label = "Gerar Comando de Render"
@@ -177,158 +632,77 @@ class GenerateBlenderCommand(bpy.types.Operator):
                 self.report({'ERROR'}, "O arquivo .blend atual não foi salvo. Por favor, salve o arquivo ou defina o Caminho do Arquivo .blend manualmente.")
                 return {'CANCELLED'}
 
-        blender_path = props.blender_executable_path
-        blend_file_path = props.blend_file_path
-        output_format = props.output_format
-        custom_output_path = props.custom_output_path
-        output_file_name = props.output_file_name
-        video_codec = props.video_codec
-        fps = props.fps
-        render_engine = props.render_engine
-        use_custom_render_engine = props.use_custom_render_engine
-
-        if not blender_path:
-            self.report({'ERROR'}, "Por favor, defina o Caminho do Executável do Blender.")
-            return {'CANCELLED'}
-        if not blend_file_path:
-            self.report({'ERROR'}, "Por favor, defina o Caminho do Arquivo .blend.")
-            return {'CANCELLED'}
-
-        formatted_blender_path = f'"{blender_path}"' if ' ' in blender_path else blender_path
-        formatted_blend_file_path = f'"{blend_file_path}"' if ' ' in blend_file_path else blend_file_path
-        
-        formatted_custom_output_path = ""
-        if custom_output_path:
-            normalized_path = os.path.normpath(custom_output_path)
-            if not normalized_path.endswith(os.sep):
-                normalized_path += os.sep
-            formatted_custom_output_path = f'"{normalized_path}"' if ' ' in normalized_path else normalized_path
-
-
-        commands = []
-        engine_arg = f"-E {render_engine}" if use_custom_render_engine else ""
-
-        if props.use_camera_system:
-            if not props.cameras:
-                self.report({'ERROR'}, "Por favor, adicione pelo menos uma câmera para renderizar ao usar o Sistema de Múltiplas Câmeras.")
+        spec = spec_from_props(props)
+        if not props.detect_static_frames:
+            try:
+                plan = plan_render(spec)
+            except PlanningError as e:
+                self.report({'ERROR'}, str(e))
                 return {'CANCELLED'}
+            apply_plan_to_props(props, plan, self.report)
+            return {'FINISHED'}
 
-            for camera_prop in props.cameras:
-                if not camera_prop.name:
-                    self.report({'ERROR'}, f"O nome da câmera é obrigatório para a câmera com Frame Inicial {camera_prop.start_frame}.")
-                    commands = []
-                    return {'CANCELLED'}
-                if camera_prop.start_frame < 1:
-                    self.report({'ERROR'}, f"Frame Inicial inválido para a câmera '{camera_prop.name}'.")
-                    commands = []
-                    return {'CANCELLED'}
-                if camera_prop.end_frame < camera_prop.start_frame:
-                    self.report({'ERROR'}, f"Frame Final inválido para a câmera '{camera_prop.name}'.")
-                    commands = []
-                    return {'CANCELLED'}
-
-                command_base = f"{formatted_blender_path} -b {formatted_blend_file_path} -c {camera_prop.name}"
-                output_path_arg = ""
-                frame_args = ""
-                video_args = ""
-
-                if output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]:
-                    output_path_arg = f"-o {formatted_custom_output_path}render_{camera_prop.name}_####" if custom_output_path else f"-o //render_{camera_prop.name}_####"
-                    frame_args = f"-s {camera_prop.start_frame} -e {camera_prop.end_frame} -a"
-                else:
-                    if not output_file_name:
-                        self.report({'ERROR'}, "Nome do Arquivo de Saída é obrigatório para renderização de vídeo (configuração global).")
-                        commands = []
-                        return {'CANCELLED'}
-                    
-                    output_path_arg = f"-o {formatted_custom_output_path}{output_file_name}_{camera_prop.name}" if custom_output_path else f"-o //{output_file_name}_{camera_prop.name}"
-                    frame_args = f"-s {camera_prop.start_frame} -e {camera_prop.end_frame} -a"
-                    
-                    if video_codec:
-                        video_args += f" -vcodec {video_codec}"
-                    if fps:
-                        video_args += f" -fps {fps}"
-                
-                commands.append(f"{command_base} {output_path_arg} -F {output_format} {frame_args}{video_args} {engine_arg}".strip())
+        # A detecção de quadros parados abre um Blender que percorre todos os frames: roda numa thread para não travar a interface
+        if _parallel_render_state["running"]:
+            self.report({'ERROR'}, "Aguarde o processo em segundo plano terminar.")
+            return {'CANCELLED'}
 
-        elif props.use_scene_system:
-            if not props.scenes:
-                self.report({'ERROR'}, "Por favor, adicione pelo menos uma cena para renderizar ao usar o Sistema de Cenas.")
-                return {'CANCELLED'}
+        def run_planning():
+            try:
+                _parallel_render_state["plan_result"] = plan_render(spec)
+            except PlanningError as e:
+                _parallel_render_state["status"] = str(e)
+                print(f"Render4Me: {e}")
+            finally:
+                _parallel_render_state["running"] = False
+
+        _parallel_render_state["running"] = True
+        _parallel_render_state["status"] = "Procurando quadros parados..."
+        threading.Thread(target=run_planning, daemon=True).start()
+        bpy.app.timers.register(_apply_planned_commands, first_interval=0.5)
+        bpy.app.timers.register(_redraw_render_panels, first_interval=1.0)
+        self.report({'INFO'}, "Procurando quadros parados; os comandos aparecem no painel ao terminar.")
+        return {'FINISHED'}
 
-            for scene_prop in props.scenes:
-                if not scene_prop.name:
-                    self.report({'ERROR'}, f"O nome da cena é obrigatório para a cena com Frame Inicial {scene_prop.start_frame}.")
-                    commands = []
-                    return {'CANCELLED'}
-                if scene_prop.start_frame < 1:
-                    self.report({'ERROR'}, f"Frame Inicial inválido para a cena '{scene_prop.name}'.")
-                    commands = []
-                    return {'CANCELLED'}
-                if scene_prop.end_frame < scene_prop.start_frame:
-                    self.report({'ERROR'}, f"Frame Final inválido para a cena '{scene_prop.name}'.")
-                    commands = []
-                    return {'CANCELLED'}
-
-                command_base = f"{formatted_blender_path} -b {formatted_blend_file_path} -S {scene_prop.name}"
-                output_path_arg = ""
-                frame_args = ""
-                video_args = ""
-
-                if output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]:
-                    output_path_arg = f"-o {formatted_custom_output_path}render_{scene_prop.name}_####" if custom_output_path else f"-o //render_{scene_prop.name}_####"
-                    frame_args = f"-s {scene_prop.start_frame} -e {scene_prop.end_frame} -a"
-                else:
-                    if not output_file_name:
-                        self.report({'ERROR'}, "Nome do Arquivo de Saída é obrigatório para renderização de vídeo (configuração global).")
-                        commands = []
-                        return {'CANCELLED'}
-                    
-                    output_path_arg = f"-o {formatted_custom_output_path}{output_file_name}_{scene_prop.name}" if custom_output_path else f"-o //{output_file_name}_{scene_prop.name}"
-                    frame_args = f"-s {scene_prop.start_frame} -e {scene_prop.end_frame} -a"
-                    
-                    if video_codec:
-                        video_args += f" -vcodec {video_codec}"
-                    if fps:
-                        video_args += f" -fps {fps}"
-                
-                commands.append(f"{command_base} {output_path_arg} -F {output_format} {frame_args}{video_args} {engine_arg}".strip())
+def jobs_from_props(props):
+    # O texto do painel é só uma apresentação dos jobs; se foi editado à mão, vale o texto editado
+    jobs = jobs_from_json(props.generated_jobs) if props.generated_jobs else []
+    if format_jobs(jobs) != props.generated_command:
+        jobs = jobs_from_text(props.generated_command)
+    return jobs
+
+# --- Previsão da Duração do Lote pelo Histórico ---
+def plan_history_order(props, chunks, history):
+    # Mesma ordem (e divisão) usada pelo render paralelo; no lote de vários .blend, a partilha justa entre os arquivos
+    if props.balance_chunks_by_history:
+        chunks = balance_chunks(chunks, history, props.parallel_workers)
+    if any(chunk.get("batch") for chunk in chunks):
+        return fair_share_order(chunks, history)
+    return order_longest_first(chunks, history)
+
+def predict_batch_from_props(props):
+    if not props.use_render_history or not props.generated_command:
+        return ""
+    try:
+        history = RenderHistory()
+        chunks = plan_history_order(props, build_render_chunks(jobs_from_props(props), props.frames_per_chunk), history)
+    except (ValueError, OSError, sqlite3.Error):
+        return ""
+    return format_batch_prediction(*predict_batch_seconds(chunks, history, props.parallel_workers))
+
+class PredictBatchDuration(bpy.types.Operator):
+    bl_idname = "render.predict_batch_duration"
+    bl_label = "Prever Duração"
+    bl_description = "Estima a duração do lote com os tempos por frame gravados no histórico e o número de processos simultâneos"
 
-        else:
-            command_base = f"{formatted_blender_path} -b {formatted_blend_file_path}"
-            output_path_arg = ""
-            frame_args = ""
-            video_args = ""
-
-            if output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]:
-                if props.frame_number < 1:
-                    self.report({'ERROR'}, "Por favor, insira um Número de Frame válido (maior ou igual a 1) para a imagem.")
-                    return {'CANCELLED'}
-                output_path_arg = f"-o {formatted_custom_output_path}render_####" if custom_output_path else f"-o //render_####"
-                frame_args = f"-f {props.frame_number}"
-            else:
-                if not output_file_name:
-                    self.report({'ERROR'}, "Nome do Arquivo de Saída é obrigatório para renderização de vídeo.")
-                    return {'CANCELLED'}
-                if props.start_frame_global < 1:
-                    self.report({'ERROR'}, "Por favor, insira um Frame Inicial Global válido.")
-                    return {'CANCELLED'}
-                if props.end_frame_global < props.start_frame_global:
-                    self.report({'ERROR'}, "Por favor, insira um Frame Final Global válido (deve ser >= Frame Inicial).")
-                    return {'CANCELLED'}
-
-                output_path_arg = f"-o {formatted_custom_output_path}{output_file_name}" if custom_output_path else f"-o //{output_file_name}"
-                frame_args = f"-s {props.start_frame_global} -e {props.end_frame_global} -a"
-                
-                if video_codec:
-                    video_args += f" -vcodec {video_codec}"
-                if fps:
-                    video_args += f" -fps {fps}"
-            
-            commands.append(f"{command_base} {output_path_arg} -F {output_format} {frame_args}{video_args} {engine_arg}".strip())
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.generated_command)
 
-        props.generated_command = "\n\n".join(commands)
-        self.report({'INFO'}, "Comando(s) gerado(s) com sucesso!")
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        props.predicted_batch_duration = predict_batch_from_props(props)
+        self.report({'INFO'}, props.predicted_batch_duration or "Histórico de render desativado.")
         return {'FINISHED'}
 
 # --- Operador para Copiar Comando para a Área de Transferência ---
@@ -360,11 +734,34 @@ class ClearBlenderFields(bpy.types.Operator):
         props.output_file_name = ""
         props.video_codec = ""
         props.generated_command = ""
+        props.generated_jobs = ""
         props.scenes.clear()
         props.cameras.clear()
+        props.active_scene_index = 0
         props.use_scene_system = False
         props.use_camera_system = False
         props.use_custom_render_engine = False
+        props.resume_missing_frames = False
+        props.use_render_cache = False
+        props.use_persistent_worker = False
+        props.use_memory_admission = False
+        props.split_video_chunks = False
+        props.tile_columns = 1
+        props.tile_rows = 1
+        props.group_cameras_by_markers = False
+        props.detect_static_frames = False
+        props.use_output_staging = False
+        props.use_asset_staging = False
+        props.balance_chunks_by_history = False
+        props.predicted_batch_duration = ""
+        props.benchmark_summary = ""
+        props.performance_profile = ""
+        props.batch_files.clear()
+        props.batch_manifest_path = ""
+        props.farm_coordinator_url = ""
+        props.farm_pinned_worker = ""
+        props.farm_token = ""
+        _render_farm_state["status"] = []
         self.report({'INFO'}, "Campos de texto e listas limpos.")
         return {'FINISHED'}
 
@@ -416,6 +813,20 @@ class UpdateBlenderAddon(bpy.types.Operator):
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
 
+# Estado do render paralelo em andamento (lido pelo painel)
+_parallel_render_state = {"running": False, "status": "", "metrics": None}
+
+def metrics_path_from_props(props):
+    return bpy.path.abspath(props.metrics_file_path) if props.metrics_file_path else os.path.join(render4me_data_dir(), "metrics", "metrics.jsonl")
+
+def _redraw_render_panels():
+    # Atualiza o N-panel enquanto as métricas ao vivo mudam
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return 1.0 if _parallel_render_state["running"] else None
+
 # --- NOVO: Operador para Iniciar Render e Fechar Blender ---
 class StartBlenderRenderAndQuit(bpy.types.Operator):
     bl_idname = "render.start_and_quit"
@@ -438,27 +849,41 @@ class StartBlenderRenderAndQuit(bpy.types.Operator):
             self.report({'ERROR'}, "Nenhum comando de renderização gerado. Por favor, gere o comando primeiro.")
             return {'CANCELLED'}
 
-        # Divide os comandos em linhas individuais
-        commands = props.generated_command.split("\n\n")
-
-        # Determina o SO e a forma de encadear e executar os comandos
+        # Os jobs são executados pelo lançador do render4me, que inicia cada processo direto pela lista
+        # de argumentos, lê a saída e grava as métricas (frames, tempo por frame, ETA) em JSON Lines
+        try:
+            launches_dir = os.path.join(render4me_data_dir(), "launches")
+            os.makedirs(launches_dir, exist_ok=True)
+            jobs_file = write_jobs_file(jobs_from_props(props), os.path.join(launches_dir, f"jobs_{int(time.time())}.json"))
+        except ValueError as e:
+            self.report({'ERROR'}, f"Não foi possível interpretar o(s) comando(s) gerado(s): {e}")
+            return {'CANCELLED'}
+        except OSError as e:
+            self.report({'ERROR'}, f"Não foi possível gravar o arquivo de jobs: {e}")
+            return {'CANCELLED'}
+        launcher_argv = [sys.executable, "-m", "render4me", "run", jobs_file, "--metrics", metrics_path_from_props(props), "--pause"]
+        if not props.use_render_history:
+            launcher_argv.append("--no-history")
+        launcher_argv += ["--max-retries", str(props.max_render_retries)]
+        if props.verify_saved_frames:
+            launcher_argv.append("--verify-frames")
+        if props.tile_columns * props.tile_rows > 1 and props.output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]:
+            launcher_argv += ["-j", str(props.parallel_workers), "--tiles", f"{props.tile_columns}x{props.tile_rows}", "--tile-overlap", str(props.tile_overlap)]
+
+        # Determina o SO e a forma de abrir o terminal
+        popen_kwargs = {"cwd": ADDON_DIR}
         if sys.platform.startswith('win'):
-            # Windows: usa '&&' para encadear comandos no CMD
-            # 'start cmd /k' abre uma nova janela do CMD e a mantém aberta após o comando
-            chained_command = " && ".join(commands)
-            # Adiciona um pause no final para o usuário ver a saída antes da janela fechar
-            full_cmd = f'start cmd /k "{chained_command} & echo. & pause"'
-            shell_exec = True # Precisa de shell=True para usar 'start'
-        elif sys.platform.startswith('linux') or sys.platform.startswith('darwin'):
-            # Linux/macOS: usa ';' para encadear comandos em bash
-            chained_command = "; ".join(commands)
-            if sys.platform.startswith('linux'):
-                # Tenta abrir o gnome-terminal. Pode precisar de ajuste para outras distros/DEs
-                full_cmd = f"gnome-terminal -- /bin/bash -c '{chained_command}; echo \"\\nRenderização concluída. Pressione Enter para fechar.\"; read -p \"\"'"
-            else: # macOS
-                # Usa osascript para abrir o Terminal.app
-                full_cmd = f"osascript -e 'tell application \"Terminal\" to do script \"{chained_command}; echo \\\"\\nRenderização concluída. Pressione Enter para fechar.\\\"; read -p \\\"\\\"\"\"\"' & tell application \"Terminal\" to activate"
-            shell_exec = True # Precisa de shell=True para osascript ou gnome-terminal serem encontrados no PATH
+            # Windows: abre uma nova janela do console diretamente, sem passar pelo CMD
+            full_cmd = launcher_argv
+            popen_kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+        elif sys.platform.startswith('linux'):
+            # Tenta abrir o gnome-terminal. Pode precisar de ajuste para outras distros/DEs
+            full_cmd = ["gnome-terminal", f"--working-directory={ADDON_DIR}", "--"] + launcher_argv
+        elif sys.platform.startswith('darwin'):
+            # macOS: usa osascript para abrir o Terminal.app
+            shell_line = f"cd {shlex.quote(ADDON_DIR)} && " + " ".join(shlex.quote(arg) for arg in launcher_argv)
+            apple_script_line = shell_line.replace("\\", "\\\\").replace('"', '\\"')
+            full_cmd = ["osascript", "-e", f'tell application "Terminal" to do script "{apple_script_line}"', "-e", 'tell application "Terminal" to activate']
         else:
             self.report({'ERROR'}, "Sistema operacional não suportado para execução automática no terminal.")
             return {'CANCELLED'}
@@ -468,7 +893,7 @@ class StartBlenderRenderAndQuit(bpy.types.Operator):
             self.report({'INFO'}, "ATENÇÃO: Fechando o Blender e iniciando a renderização. Salve seu trabalho se necessário!")
             
             # Inicia o comando em um novo processo (não bloqueia o Blender)
-            subprocess.Popen(full_cmd, shell=shell_exec)
+            subprocess.Popen(full_cmd, **popen_kwargs)
             
             # Fecha o Blender (irá perguntar para salvar se houver mudanças não salvas)
             bpy.ops.wm.quit_blender()
@@ -479,8 +904,550 @@ class StartBlenderRenderAndQuit(bpy.types.Operator):
 
         return {'FINISHED'}
 
+# --- Operador para Iniciar Render Paralelo Local ---
+class StartBlenderRenderParallel(bpy.types.Operator):
+    bl_idname = "render.start_parallel"
+    bl_label = "Iniciar Render Paralelo"
+    bl_description = "Divide os ranges de frames em pedaços e mantém vários processos do Blender em segundo plano renderizando ao mesmo tempo"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.generated_command) and not _parallel_render_state["running"]
+
+    def plan_chunks(self, props):
+        # Devolve (pedaços, vídeos para unir, stills para montar, ffmpeg)
+        jobs = jobs_from_props(props)
+        split_video = props.split_video_chunks and props.output_format not in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]
+        tiled_still = props.tile_columns * props.tile_rows > 1 and props.output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]
+        if split_video:
+            # Falha antes de renderizar se não houver ffmpeg para unir os pedaços
+            ffmpeg_path = find_ffmpeg(props.ffmpeg_path)
+            chunks, assemblies = plan_video_chunks(jobs, props.frames_per_chunk, props.video_chunk_mode)
+            return chunks, assemblies, [], ffmpeg_path
+        if tiled_still:
+            chunks, stitches = plan_tile_chunks(jobs, props.tile_columns, props.tile_rows, props.tile_overlap)
+            return chunks, [], stitches, props.ffmpeg_path
+        return build_render_chunks(jobs, props.frames_per_chunk), [], [], props.ffmpeg_path
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            chunks, assemblies, stitches, ffmpeg_path = self.plan_chunks(props)
+        except VideoAssemblyError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except ValueError as e:
+            self.report({'ERROR'}, f"Não foi possível interpretar o(s) comando(s) gerado(s): {e}")
+            return {'CANCELLED'}
+
+        history = None
+        if props.use_render_history:
+            try:
+                history = RenderHistory()
+                chunks = plan_history_order(props, chunks, history)
+            except (OSError, sqlite3.Error) as e:
+                self.report({'WARNING'}, f"Histórico de render indisponível: {e}")
+                history = None
+
+        mover = None
+        if props.use_output_staging:
+            chunks = stage_chunks(chunks, bpy.path.abspath(props.staging_dir) if props.staging_dir else default_staging_dir())
+            mover = OutputMover(props.mover_threads)
+
+        metrics = BatchMetrics(metrics_path_from_props(props))
+        threads, cpu_slots = plan_cpu_layout(props.parallel_workers, props.partition_threads, props.use_cpu_affinity, props.numa_aware)
+        governor = None
+        if props.use_memory_admission:
+            governor = MemoryGovernor(int(props.memory_headroom_gb * GB), int(props.default_job_memory_gb * GB), props.memory_pressure_action)
+        retry_policy = RetryPolicy(props.max_render_retries) if props.max_render_retries > 0 else None
+        verifier = FrameVerifier() if props.verify_saved_frames else None
+        scheduler = ParallelRenderScheduler(chunks, props.parallel_workers, metrics=metrics, threads_per_process=threads, cpu_slots=cpu_slots, memory_governor=governor, output_mover=mover, history=history, retry_policy=retry_policy, frame_verifier=verifier)
+        use_render_cache = props.use_render_cache
+        cache_dir = props.render_cache_dir or os.path.join(render4me_data_dir(), "cache")
+        cache_max_bytes = int(props.render_cache_size_gb * 1024 ** 3)
+
+        asset_cache = AssetCache(bpy.path.abspath(props.asset_cache_dir) if props.asset_cache_dir else None) if props.use_asset_staging else None
+
+        def run_scheduler():
+            try:
+                if asset_cache is not None:
+                    # A cópia lê da rede: fica nesta thread para não travar a interface
+                    _parallel_render_state["status"] = "Copiando o .blend e as dependências para o cache local..."
+                    try:
+                        scheduler.chunks = stage_blend_assets(scheduler.chunks, asset_cache)
+                        for line in format_asset_report(asset_cache, scheduler.chunks):
+                            print(f"Render4Me: {line}")
+                    except OSError as e:
+                        print(f"Render4Me: cópia local das dependências falhou, renderizando da pasta original: {e}")
+                _parallel_render_state["status"] = f"Renderizando {len(chunks)} pedaço(s) com {scheduler.max_workers} processo(s)..."
+                summary = scheduler.run()
+                if mover is not None:
+                    for line in format_staging_report(mover.stats, metrics.snapshots()):
+                        print(f"Render4Me: {line}")
+                if verifier is not None:
+                    print(f"Render4Me: {format_verify_report(verifier.stats)}")
+                if use_render_cache:
+                    cache = RenderCache(cache_dir, cache_max_bytes)
+                    cache.store_pending()
+                    cache.save()
+                for line in format_quarantine_report(summary["quarantined"]):
+                    print(f"Render4Me: {line}")
+                _parallel_render_state["status"] = (
+                    f"{summary['chunks']} pedaço(s) em {summary['wall_time']:.1f}s "
+                    f"(sequencial: {summary['serial_time']:.1f}s, speedup {summary['speedup']:.2f}x, falhas: {summary['failed']}, novas tentativas: {summary['retries']})"
+                )
+                if assemblies:
+                    _parallel_render_state["status"] = "Unindo os pedaços de vídeo..."
+                    try:
+                        outputs, assembly_seconds = assemble_videos(assemblies, scheduler.results, ffmpeg_path)
+                        _parallel_render_state["status"] = format_video_report(summary, assembly_seconds, len(outputs))
+                    except VideoAssemblyError as e:
+                        _parallel_render_state["status"] = str(e)
+                if stitches:
+                    _parallel_render_state["status"] = "Montando os tiles do still..."
+                    try:
+                        reports, stitch_seconds = stitch_stills(stitches, scheduler.results)
+                        _parallel_render_state["status"] = format_tile_report(summary, stitch_seconds, len(reports), *single_process_seconds(stitches, summary, history))
+                    except (TileStitchError, OSError) as e:
+                        _parallel_render_state["status"] = str(e)
+            finally:
+                _parallel_render_state["running"] = False
+            print(f"Render4Me: {_parallel_render_state['status']}")
+
+        _parallel_render_state["running"] = True
+        _parallel_render_state["metrics"] = metrics
+        threading.Thread(target=run_scheduler, daemon=True).start()
+        bpy.app.timers.register(_redraw_render_panels, first_interval=1.0)
+        self.report({'INFO'}, f"Render paralelo iniciado: {len(chunks)} pedaço(s), {scheduler.max_workers} processo(s) simultâneo(s).")
+        return {'FINISHED'}
+
+
+# --- Operador para Auto-Ajustar a Quantidade de Processos Simultâneos ---
+def _apply_autotune_result():
+    # Executado na thread principal: só ela pode alterar as propriedades
+    result = _parallel_render_state.pop("autotune_result", None)
+    if result is None:
+        return 0.5 if _parallel_render_state["running"] else None
+    bpy.context.scene.blender_render_props.parallel_workers = result["best"]
+    return None
+
+class AutoTuneRenderConcurrency(bpy.types.Operator):
+    bl_idname = "render.autotune_concurrency"
+    bl_label = "Auto-Ajustar Processos"
+    bl_description = "Renderiza um frame de amostra com 1, 2, 4... processos simultâneos e escolhe o nível com maior vazão"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.generated_command) and not _parallel_render_state["running"]
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            job = parse_render_command(jobs_from_props(props)[0])
+        except ValueError as e:
+            self.report({'ERROR'}, f"Não foi possível interpretar o comando gerado: {e}")
+            return {'CANCELLED'}
+        sample_frame = job["start"] if job["start"] is not None else (job.get("frames") or [props.frame_number])[0]
+        numa_aware = props.numa_aware
+
+        def log(message):
+            _parallel_render_state["status"] = message
+            print(f"Render4Me: {message}")
+
+        def run_autotune():
+            try:
+                result = autotune_concurrency(job["argv"], sample_frame, numa_aware=numa_aware, log=log)
+                _parallel_render_state["autotune_result"] = result
+                log(f"Auto-ajuste concluído: {result['best']} processo(s) simultâneo(s).")
+            finally:
+                _parallel_render_state["running"] = False
+
+        _parallel_render_state["running"] = True
+        threading.Thread(target=run_autotune, daemon=True).start()
+        bpy.app.timers.register(_apply_autotune_result, first_interval=0.5)
+        bpy.app.timers.register(_redraw_render_panels, first_interval=1.0)
+        self.report({'INFO'}, f"Auto-ajuste iniciado com o frame de amostra {sample_frame}.")
+        return {'FINISHED'}
+
+# --- Operador para Estimar a Duração por Amostragem ---
+def _apply_benchmark_result():
+    result = _parallel_render_state.pop("benchmark_result", None)
+    if result is None:
+        return 0.5 if _parallel_render_state["running"] else None
+    bpy.context.scene.blender_render_props.benchmark_summary = result
+    return None
+
+class SampleRenderBenchmark(bpy.types.Operator):
+    bl_idname = "render.sample_benchmark"
+    bl_label = "Estimar por Amostragem"
+    bl_description = "Renderiza o primeiro, o último e frames espaçados de cada job numa pasta temporária e prevê a duração total com intervalo de confiança de 95%"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.generated_command) and not _parallel_render_state["running"]
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            jobs = jobs_from_props(props)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Não foi possível interpretar o(s) comando(s) gerado(s): {e}")
+            return {'CANCELLED'}
+        samples = props.benchmark_samples
+        engines = list(ENGINE_IDS) if props.benchmark_compare_engines else None
+
+        def log(message):
+            _parallel_render_state["status"] = message
+            print(f"Render4Me: {message}")
+
+        def run_sampling():
+            try:
+                report = run_benchmark(jobs, samples, engines, log=log)
+                lines = format_benchmark_report(report)
+                for line in lines:
+                    print(f"Render4Me: {line}")
+                log(f"Relatório da amostragem gravado em {write_benchmark_report(report)}")
+                _parallel_render_state["benchmark_result"] = lines[0] if len(report["variants"]) == 1 else f"Mais rápida: {report['fastest'] or '--'}"
+            except (OSError, ValueError) as e:
+                log(f"Erro na amostragem: {e}")
+            finally:
+                _parallel_render_state["running"] = False
+
+        _parallel_render_state["running"] = True
+        threading.Thread(target=run_sampling, daemon=True).start()
+        bpy.app.timers.register(_apply_benchmark_result, first_interval=0.5)
+        bpy.app.timers.register(_redraw_render_panels, first_interval=1.0)
+        self.report({'INFO'}, f"Amostragem iniciada: {samples} frame(s) por job.")
+        return {'FINISHED'}
+
+# --- Operador para Guardar Frames Renderizados no Cache ---
+class StoreRenderCache(bpy.types.Operator):
+    bl_idname = "render.store_render_cache"
+    bl_label = "Guardar Renders no Cache"
+    bl_description = "Copia para o cache os frames pendentes que já terminaram de renderizar"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            cache = RenderCache(props.render_cache_dir or os.path.join(render4me_data_dir(), "cache"), int(props.render_cache_size_gb * 1024 ** 3))
+            stored = cache.store_pending()
+            cache.save()
+        except OSError as e:
+            self.report({'ERROR'}, f"Erro ao guardar os renders no cache: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{stored} frame(s) guardado(s) no cache.")
+        return {'FINISHED'}
+
+# --- Operador para Mostrar Estatísticas do Cache ---
+class ShowRenderCacheStats(bpy.types.Operator):
+    bl_idname = "render.show_render_cache_stats"
+    bl_label = "Estatísticas do Cache"
+    bl_description = "Mostra acertos, falhas e o tamanho atual do cache de renders"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            stats = RenderCache(props.render_cache_dir or os.path.join(render4me_data_dir(), "cache"), int(props.render_cache_size_gb * 1024 ** 3)).stats()
+        except OSError as e:
+            self.report({'ERROR'}, f"Erro ao abrir o cache de renders: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, (
+            f"Cache: {stats['hits']} acerto(s), {stats['misses']} falha(s) ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} frame(s), {stats['bytes'] / 1024 ** 3:.2f} GB, {stats['pending']} pendente(s)."
+        ))
+        return {'FINISHED'}
+
 
 # --- Grupo de Propriedades Principal para o Addon ---
+# --- Lote de Vários .blend (uma fila, partilha justa por prioridade) ---
+class AddBatchFile(bpy.types.Operator):
+    bl_idname = "render.add_batch_file"
+    bl_label = "Adicionar ao Lote"
+    bl_description = "Adiciona o .blend do painel ao lote, com as cenas, câmeras, frames e ajustes atuais"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.blend_file_path)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        entry = props.batch_files.add()
+        entry.blend_file_path = props.blend_file_path
+        entry.name = os.path.splitext(os.path.basename(bpy.path.abspath(props.blend_file_path)))[0]
+        entry.spec_json = json.dumps(spec_from_props(props))
+        props.active_batch_index = len(props.batch_files) - 1
+        self.report({'INFO'}, f"{entry.name} adicionado ao lote ({len(props.batch_files)} arquivo(s)).")
+        return {'FINISHED'}
+
+class UpdateBatchFile(bpy.types.Operator):
+    bl_idname = "render.update_batch_file"
+    bl_label = "Atualizar Arquivo do Lote"
+    bl_description = "Substitui os ajustes do arquivo selecionado no lote pelos ajustes atuais do painel"
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.blender_render_props
+        return 0 <= props.active_batch_index < len(props.batch_files)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        entry = props.batch_files[props.active_batch_index]
+        entry.blend_file_path = props.blend_file_path
+        entry.spec_json = json.dumps(spec_from_props(props))
+        self.report({'INFO'}, f"Ajustes de {entry.name} atualizados.")
+        return {'FINISHED'}
+
+class LoadBatchFileSettings(bpy.types.Operator):
+    bl_idname = "render.load_batch_file_settings"
+    bl_label = "Editar no Painel"
+    bl_description = "Carrega no painel os ajustes do arquivo selecionado no lote"
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.blender_render_props
+        return 0 <= props.active_batch_index < len(props.batch_files)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        entry = props.batch_files[props.active_batch_index]
+        try:
+            apply_spec_to_props(props, json.loads(entry.spec_json))
+        except (ValueError, TypeError, KeyError) as e:
+            self.report({'ERROR'}, f"Ajustes inválidos em {entry.name}: {e}")
+            return {'CANCELLED'}
+        props.blend_file_path = entry.blend_file_path
+        self.report({'INFO'}, f"Ajustes de {entry.name} carregados no painel.")
+        return {'FINISHED'}
+
+class RemoveBatchFile(bpy.types.Operator):
+    bl_idname = "render.remove_batch_file"
+    bl_label = "Remover do Lote"
+    bl_description = "Remove o arquivo selecionado do lote"
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        index = props.active_batch_index
+        if 0 <= index < len(props.batch_files):
+            props.batch_files.remove(index)
+            if index > 0 and index == len(props.batch_files):
+                props.active_batch_index -= 1
+        else:
+            self.report({'WARNING'}, "Nenhum arquivo do lote selecionado para remover.")
+        return {'FINISHED'}
+
+class SaveBatchManifest(bpy.types.Operator):
+    bl_idname = "render.save_batch_manifest"
+    bl_label = "Salvar Manifesto"
+    bl_description = "Salva o lote num manifesto JSON, que pode ser recarregado ou renderizado com \"python -m render4me batch\""
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.blender_render_props
+        return bool(props.batch_manifest_path) and len(props.batch_files) > 0
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            path = write_batch_manifest(manifest_from_props(props), bpy.path.abspath(props.batch_manifest_path))
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Erro ao salvar o manifesto: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Lote com {len(props.batch_files)} arquivo(s) salvo em {path}.")
+        return {'FINISHED'}
+
+class LoadBatchManifest(bpy.types.Operator):
+    bl_idname = "render.load_batch_manifest"
+    bl_label = "Carregar Manifesto"
+    bl_description = "Substitui o lote pelos arquivos do manifesto"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.batch_manifest_path)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            manifest = load_batch_manifest(bpy.path.abspath(props.batch_manifest_path))
+        except (OSError, ValueError, PlanningError) as e:
+            self.report({'ERROR'}, f"Erro ao carregar o manifesto: {e}")
+            return {'CANCELLED'}
+        props.batch_files.clear()
+        for item in manifest["files"]:
+            spec = dict(manifest["defaults"])
+            spec.update({key: value for key, value in item.items() if key not in ("label", "priority", "enabled")})
+            entry = props.batch_files.add()
+            entry.blend_file_path = spec.get("blend_file_path", "")
+            entry.name = item.get("label") or os.path.splitext(os.path.basename(entry.blend_file_path))[0]
+            entry.priority = int(item.get("priority", 1))
+            entry.enabled = bool(item.get("enabled", True))
+            entry.spec_json = json.dumps(spec)
+        props.active_batch_index = 0
+        self.report({'INFO'}, f"{len(props.batch_files)} arquivo(s) carregado(s) do manifesto.")
+        return {'FINISHED'}
+
+class StartBatchRender(StartBlenderRenderParallel):
+    bl_idname = "render.start_batch"
+    bl_label = "Renderizar Lote"
+    bl_description = "Renderiza todos os arquivos ativos do lote numa única fila de processos, intercalando os arquivos pela prioridade"
+
+    @classmethod
+    def poll(cls, context):
+        return any(entry.enabled for entry in context.scene.blender_render_props.batch_files) and not _parallel_render_state["running"]
+
+    def plan_chunks(self, props):
+        return build_batch_chunks(self.batch_files, props.frames_per_chunk), [], [], props.ffmpeg_path
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        batch = plan_batch(manifest_from_props(props))
+        for message in batch["messages"]:
+            print(f"Render4Me: {message}")
+        if not batch["files"]:
+            self.report({'ERROR'}, "Nenhum arquivo do lote pôde ser planejado (veja o console).")
+            return {'CANCELLED'}
+        self.batch_files = batch["files"]
+        return super().execute(context)
+
+# --- Render Distribuído: Envio ao Coordenador ---
+# O coordenador e os agentes rodam fora do Blender ("python -m render4me coordinator" e "... agent")
+_render_farm_state = {"status": []}
+
+class SubmitToRenderFarm(bpy.types.Operator):
+    bl_idname = "render.submit_to_farm"
+    bl_label = "Enviar ao Coordenador"
+    bl_description = "Envia os comandos gerados ao coordenador, que divide os frames em pedaços e os entrega aos agentes das outras máquinas"
+
+    @classmethod
+    def poll(cls, context):
+        props = context.scene.blender_render_props
+        return bool(props.generated_command) and bool(props.farm_coordinator_url)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        job_name = os.path.splitext(os.path.basename(props.blend_file_path))[0]
+        try:
+            result = submit_to_farm(props.farm_coordinator_url, jobs_from_props(props), props.frames_per_chunk, props.farm_pinned_worker.strip(), job_name, props.farm_token)
+        except (FarmError, ValueError) as e:
+            self.report({'ERROR'}, f"Erro ao enviar ao coordenador: {e}")
+            return {'CANCELLED'}
+        pinned = f" (fixado no agente {props.farm_pinned_worker.strip()})" if props.farm_pinned_worker.strip() else ""
+        self.report({'INFO'}, f"Job {result['job']} enviado ao coordenador: {result['chunks']} pedaço(s){pinned}.")
+        return {'FINISHED'}
+
+class ShowRenderFarmStatus(bpy.types.Operator):
+    bl_idname = "render.show_farm_status"
+    bl_label = "Atualizar Estado"
+    bl_description = "Consulta o coordenador e mostra o progresso dos jobs e os agentes vivos ou mortos"
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.blender_render_props.farm_coordinator_url)
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            status = farm_status(props.farm_coordinator_url, token=props.farm_token)
+        except FarmError as e:
+            self.report({'ERROR'}, f"Erro ao consultar o coordenador: {e}")
+            return {'CANCELLED'}
+        _render_farm_state["status"] = format_farm_status(status)
+        for line in _render_farm_state["status"]:
+            print(f"Render4Me: {line}")
+        self.report({'INFO'}, f"{len(status['jobs'])} job(s), {sum(1 for worker in status['workers'] if worker['state'] == 'ALIVE')} agente(s) vivo(s).")
+        return {'FINISHED'}
+
+# --- Fila de Render dentro do Blender (sem bloquear a interface) ---
+# A fila é consultada por um bpy.app.timers na thread principal; nenhuma chamada espera pelos processos
+_render_queue_state = {"queue": None, "store_cache": None}
+
+def _poll_render_queue():
+    render_queue = _render_queue_state["queue"]
+    if render_queue is None:
+        return None
+    active = render_queue.poll()
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    if active:
+        return 0.5
+    if _render_queue_state["store_cache"] is not None:
+        # Erros aqui iriam para o mecanismo de timers do Blender: são só informados no console
+        try:
+            cache = RenderCache(*_render_queue_state["store_cache"])
+            cache.store_pending()
+            cache.save()
+        except OSError as e:
+            print(f"Render4Me: Erro ao guardar os renders no cache: {e}")
+        finally:
+            _render_queue_state["store_cache"] = None
+    return None
+
+class StartBlenderRenderQueue(bpy.types.Operator):
+    bl_idname = "render.queue_start"
+    bl_label = "Renderizar em Segundo Plano"
+    bl_description = "Coloca os comandos gerados em uma fila que renderiza em processos com prioridade baixa, sem fechar nem travar o Blender"
+
+    @classmethod
+    def poll(cls, context):
+        render_queue = _render_queue_state["queue"]
+        return bool(context.scene.blender_render_props.generated_command) and (render_queue is None or not render_queue.is_active())
+
+    def execute(self, context):
+        props = context.scene.blender_render_props
+        try:
+            chunks = build_render_chunks(jobs_from_props(props), props.frames_per_chunk)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Não foi possível interpretar o(s) comando(s) gerado(s): {e}")
+            return {'CANCELLED'}
+
+        threads, _ = plan_cpu_layout(props.parallel_workers, props.partition_threads)
+        metrics = BatchMetrics(metrics_path_from_props(props))
+        _render_queue_state["queue"] = RenderQueue(chunks, props.parallel_workers, props.queue_nice, threads, metrics)
+        _render_queue_state["store_cache"] = None
+        if props.use_render_cache:
+            _render_queue_state["store_cache"] = (props.render_cache_dir or os.path.join(render4me_data_dir(), "cache"), int(props.render_cache_size_gb * 1024 ** 3))
+        if not bpy.app.timers.is_registered(_poll_render_queue):
+            bpy.app.timers.register(_poll_render_queue)
+        self.report({'INFO'}, f"{len(chunks)} job(s) na fila, até {props.parallel_workers} ao mesmo tempo.")
+        return {'FINISHED'}
+
+class CancelBlenderRenderQueueJob(bpy.types.Operator):
+    bl_idname = "render.queue_cancel"
+    bl_label = "Cancelar Job"
+    bl_description = "Cancela o job (encerra o processo se já estiver renderizando). Com ID 0, cancela a fila inteira"
+
+    job_id: bpy.props.IntProperty(default=0)
+
+    def execute(self, context):
+        render_queue = _render_queue_state["queue"]
+        if render_queue is None:
+            return {'CANCELLED'}
+        if self.job_id == 0:
+            render_queue.cancel_all()
+            self.report({'INFO'}, "Fila de render cancelada.")
+        elif not render_queue.cancel(self.job_id):
+            self.report({'WARNING'}, "O job já terminou.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class MoveBlenderRenderQueueJob(bpy.types.Operator):
+    bl_idname = "render.queue_move"
+    bl_label = "Mudar Prioridade"
+    bl_description = "Move o job para cima ou para baixo entre os jobs que ainda estão na fila"
+
+    job_id: bpy.props.IntProperty(default=0)
+    direction: bpy.props.EnumProperty(items=[
+        ('UP', "Para Cima", "Renderizar antes"),
+        ('DOWN', "Para Baixo", "Renderizar depois"),
+    ])
+
+    def execute(self, context):
+        render_queue = _render_queue_state["queue"]
+        if render_queue is None or not render_queue.move(self.job_id, -1 if self.direction == 'UP' else 1):
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
 class BlenderRenderProperties(bpy.types.PropertyGroup):
     blender_executable_path: bpy.props.StringProperty(
         name="Caminho do Executável do Blender",
@@ -566,12 +1533,37 @@ class BlenderRenderProperties(bpy.types.PropertyGroup):
         default=0,
         min=0
     )
+    active_scene_index: bpy.props.IntProperty(
+        name="Índice da Cena Ativa",
+        default=0,
+        min=0
+    )
+    performance_profiles: bpy.props.CollectionProperty(type=BlenderPerformanceProfile)
+    batch_files: bpy.props.CollectionProperty(type=BlenderBatchFile)
+    active_batch_index: bpy.props.IntProperty(
+        name="Índice do Arquivo Ativo do Lote",
+        default=0,
+        min=0
+    )
+    batch_manifest_path: bpy.props.StringProperty(
+        name="Manifesto do Lote",
+        description="Arquivo JSON onde o lote é salvo e de onde é carregado (também usado por \"python -m render4me batch\")",
+        subtype='FILE_PATH',
+        default=""
+    )
+    performance_profile: bpy.props.StringProperty(
+        name="Perfil de Desempenho",
+        description="Resolução, samples, denoiser e outros ajustes aplicados a todos os comandos gerados (vazio = ajustes do .blend)",
+        default=""
+    )
     generated_command: bpy.props.StringProperty(
         name="Comando(s) Gerado(s)",
         description="O(s) comando(s) de linha gerado(s) para renderização",
         default="",
         subtype='NONE'
     )
+    # Os mesmos jobs em JSON (argumentos, frames, saída), usados para iniciar os processos sem shell
+    generated_jobs: bpy.props.StringProperty(default="")
     use_custom_render_engine: bpy.props.BoolProperty(
         name="Usar Motor de Render Personalizado",
         description="Ativar para especificar o motor de renderização (Cycles, Eevee, Workbench)",
@@ -588,6 +1580,232 @@ class BlenderRenderProperties(bpy.types.PropertyGroup):
         ],
         default='CYCLES'
     )
+    resume_missing_frames: bpy.props.BoolProperty(
+        name="Retomar (Apenas Frames Faltantes)",
+        description="Para formatos de imagem, verifica a pasta de saída e gera comandos somente para os frames ausentes, vazios ou truncados",
+        default=False
+    )
+    use_persistent_worker: bpy.props.BoolProperty(
+        name="Worker Persistente (Carregar o .blend Uma Vez)",
+        description="Nos sistemas de câmeras/cenas, gera um único processo do Blender que carrega o arquivo uma vez e renderiza todos os jobs em sequência",
+        default=False
+    )
+    use_render_cache: bpy.props.BoolProperty(
+        name="Usar Cache de Renders",
+        description="Reaproveita frames já renderizados quando o conteúdo do .blend, o motor, o formato, a cena/câmera e o frame não mudaram",
+        default=False
+    )
+    render_cache_dir: bpy.props.StringProperty(
+        name="Pasta do Cache (Opcional)",
+        description="Pasta onde os frames do cache são guardados (deixe em branco para usar ~/.render4me/cache)",
+        subtype='DIR_PATH'
+    )
+    render_cache_size_gb: bpy.props.FloatProperty(
+        name="Tamanho Máximo do Cache (GB)",
+        description="Ao passar deste limite, os frames usados há mais tempo são removidos",
+        default=20.0,
+        min=0.1
+    )
+    metrics_file_path: bpy.props.StringProperty(
+        name="Arquivo de Métricas (Opcional)",
+        description="Arquivo JSON Lines com as métricas de cada frame renderizado (deixe em branco para usar ~/.render4me/metrics/metrics.jsonl)",
+        subtype='FILE_PATH'
+    )
+    parallel_workers: bpy.props.IntProperty(
+        name="Processos Simultâneos",
+        description="Quantidade de processos do Blender em segundo plano renderizando ao mesmo tempo",
+        default=2,
+        min=1
+    )
+    partition_threads: bpy.props.BoolProperty(
+        name="Dividir Threads entre Processos",
+        description="Passa \"-t <threads>\" a cada processo para que juntos usem exatamente os núcleos disponíveis",
+        default=True
+    )
+    use_cpu_affinity: bpy.props.BoolProperty(
+        name="Fixar Processos em Núcleos (Linux)",
+        description="Fixa cada processo em um conjunto exclusivo de núcleos",
+        default=False
+    )
+    numa_aware: bpy.props.BoolProperty(
+        name="Agrupar por Nó NUMA",
+        description="Mantém os núcleos de cada processo dentro de um mesmo nó NUMA quando a máquina expõe essa informação",
+        default=True
+    )
+    frames_per_chunk: bpy.props.IntProperty(
+        name="Frames por Pedaço",
+        description="Quantidade de frames que cada processo renderiza antes de pegar o próximo pedaço da fila",
+        default=10,
+        min=1
+    )
+    farm_coordinator_url: bpy.props.StringProperty(
+        name="Coordenador",
+        description="Endereço do coordenador iniciado com \"python -m render4me coordinator\" (ex.: http://192.168.0.10:8765)",
+        default=""
+    )
+    farm_pinned_worker: bpy.props.StringProperty(
+        name="Agente Fixo (Opcional)",
+        description="Nome do agente que deve renderizar este job (deixe em branco para qualquer agente)",
+        default=""
+    )
+    farm_token: bpy.props.StringProperty(
+        name="Senha do Coordenador",
+        description="Senha compartilhada (--token) do coordenador, se houver",
+        subtype='PASSWORD',
+        default=""
+    )
+    queue_nice: bpy.props.IntProperty(
+        name="Prioridade Baixa (nice)",
+        description="Quanto a prioridade dos processos da fila é reduzida (0 = normal, 19 = mínima) para o Blender continuar responsivo",
+        default=10,
+        min=0,
+        max=19
+    )
+    split_video_chunks: bpy.props.BoolProperty(
+        name="Dividir Vídeo em Pedaços",
+        description="Renderiza o vídeo em pedaços paralelos e une o resultado com o ffmpeg no final",
+        default=False
+    )
+    video_chunk_mode: bpy.props.EnumProperty(
+        name="Pedaços de Vídeo",
+        description="Como cada pedaço do vídeo é renderizado",
+        items=[
+            ('SEGMENTS', "Segmentos de Vídeo", "Cada pedaço vira um vídeo curto; os segmentos são unidos sem recodificar quando o formato permite"),
+            ('IMAGES', "Sequência de Imagens", "Cada pedaço vira uma sequência PNG; o vídeo é codificado uma única vez no final (sem áudio)"),
+        ],
+        default='SEGMENTS'
+    )
+    tile_columns: bpy.props.IntProperty(
+        name="Colunas de Tiles",
+        description="Divide o still de frame único em colunas renderizadas por processos separados e montadas no final (1 = sem divisão)",
+        default=1,
+        min=1,
+        max=16
+    )
+    tile_rows: bpy.props.IntProperty(
+        name="Linhas de Tiles",
+        description="Divide o still de frame único em linhas renderizadas por processos separados e montadas no final (1 = sem divisão)",
+        default=1,
+        min=1,
+        max=16
+    )
+    tile_overlap: bpy.props.IntProperty(
+        name="Sobreposição dos Tiles (px)",
+        description="Pixels renderizados em comum por tiles vizinhos, usados para conferir as emendas na montagem",
+        default=8,
+        min=0,
+        max=64
+    )
+    ffmpeg_path: bpy.props.StringProperty(
+        name="Executável do ffmpeg (Opcional)",
+        description="Caminho do ffmpeg usado para unir os pedaços (deixe em branco para usar o ffmpeg do PATH)",
+        subtype='FILE_PATH'
+    )
+    use_output_staging: bpy.props.BoolProperty(
+        name="Gravar em Disco Local",
+        description="O Blender grava os frames numa pasta local rápida e threads em segundo plano os transferem (com checksum) para a pasta de saída",
+        default=False
+    )
+    staging_dir: bpy.props.StringProperty(
+        name="Pasta Local (Opcional)",
+        description="Pasta em disco rápido (NVMe/tmpfs) usada antes da transferência (deixe em branco para usar a pasta temporária do sistema)",
+        subtype='DIR_PATH'
+    )
+    mover_threads: bpy.props.IntProperty(
+        name="Threads de Transferência",
+        description="Quantos arquivos são transferidos ao mesmo tempo para a pasta de saída",
+        default=4,
+        min=1,
+        max=32
+    )
+    max_render_retries: bpy.props.IntProperty(
+        name="Tentativas por Frame",
+        description="Quando um processo falha, só os frames que faltam são renderizados de novo (ranges divididos ao meio até isolar o frame defeituoso); um frame que falha sozinho essas vezes vai para a quarentena. 0 desativa",
+        default=3,
+        min=0,
+        max=10
+    )
+    verify_saved_frames: bpy.props.BoolProperty(
+        name="Verificar Frames Salvos",
+        description="Confere cada frame assim que é salvo (cabeçalho, fim do arquivo e tamanho da imagem) e renderiza de novo os truncados ou corrompidos, até o limite de tentativas por frame",
+        default=False
+    )
+    use_render_history: bpy.props.BoolProperty(
+        name="Histórico de Tempos de Render",
+        description="Grava o tempo e o pico de memória de cada frame (~/.render4me/history.sqlite) e inicia primeiro os jobs mais longos",
+        default=True
+    )
+    balance_chunks_by_history: bpy.props.BoolProperty(
+        name="Dividir Jobs Longos pelo Histórico",
+        description="Divide os jobs previstos como longos em pedaços menores para todos os processos terminarem perto do mesmo momento",
+        default=False
+    )
+    predicted_batch_duration: bpy.props.StringProperty(
+        name="Duração Prevista",
+        default=""
+    )
+    benchmark_samples: bpy.props.IntProperty(
+        name="Frames da Amostra",
+        description="Frames renderizados por job na estimativa por amostragem, incluindo o primeiro e o último",
+        default=5,
+        min=2,
+        max=50
+    )
+    benchmark_compare_engines: bpy.props.BoolProperty(
+        name="Comparar Engines",
+        description="Renderiza a mesma amostra com Cycles, Eevee e Workbench e indica a mais rápida",
+        default=False
+    )
+    benchmark_summary: bpy.props.StringProperty(
+        name="Resultado da Amostragem",
+        default=""
+    )
+    use_asset_staging: bpy.props.BoolProperty(
+        name="Copiar Dependências para Cache Local",
+        description="Copia o .blend, as bibliotecas linkadas e as texturas uma vez por lote para um cache local (por conteúdo) e renderiza a partir dele",
+        default=False
+    )
+    asset_cache_dir: bpy.props.StringProperty(
+        name="Cache de Dependências (Opcional)",
+        description="Pasta local do cache de dependências (deixe em branco para usar ~/.render4me/assets)",
+        subtype='DIR_PATH'
+    )
+    group_cameras_by_markers: bpy.props.BoolProperty(
+        name="Agrupar Câmeras por Marcadores",
+        description="Câmeras que os marcadores da timeline já trocam dentro de uma cena são renderizadas num único processo da cena (saída render_<cena>_####)",
+        default=False
+    )
+    detect_static_frames: bpy.props.BoolProperty(
+        name="Detectar Quadros Parados",
+        description="Antes do render, compara o estado de cada cena/câmera frame a frame; frames consecutivos idênticos são renderizados uma vez e os demais recebem um hard link (ou cópia) do arquivo",
+        default=False
+    )
+    use_memory_admission: bpy.props.BoolProperty(
+        name="Controle de Memória",
+        description="Só inicia um novo processo quando o pico de memória previsto (aprendido dos renders anteriores) cabe na RAM livre",
+        default=False
+    )
+    memory_headroom_gb: bpy.props.FloatProperty(
+        name="Folga de Memória (GB)",
+        description="Memória mantida sempre livre para o sistema",
+        default=4.0,
+        min=0.0
+    )
+    default_job_memory_gb: bpy.props.FloatProperty(
+        name="Pico Previsto sem Histórico (GB)",
+        description="Memória assumida para um job que ainda não foi renderizado nesta máquina",
+        default=8.0,
+        min=0.1
+    )
+    memory_pressure_action: bpy.props.EnumProperty(
+        name="Com Pouca Memória",
+        description="O que fazer com o job mais novo quando a memória livre fica abaixo da folga",
+        items=[
+            ('PAUSE', "Pausar", "Pausa o processo (SIGSTOP) e o retoma quando houver memória"),
+            ('REQUEUE', "Devolver à Fila", "Encerra o processo e coloca o pedaço de volta na fila"),
+        ],
+        default='PAUSE'
+    )
 
 
 # --- Painel da Interface do Usuário (UI) ---
@@ -615,16 +1833,59 @@ class BlenderRenderPanel(bpy.types.Panel):
             row = layout.row()
             row.prop(props, "render_engine")
 
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop_search(props, "performance_profile", props, "performance_profiles", text="Perfil")
+        row.operator("render.add_performance_profile", text="", icon='ADD')
+        row.operator("render.remove_performance_profile", text="", icon='REMOVE')
+        if not props.performance_profiles:
+            box.operator("render.load_default_profiles", icon='PRESET')
+        profile = props.performance_profiles.get(props.performance_profile)
+        if profile is not None:
+            box.prop(profile, "name")
+            row = box.row()
+            row.prop(profile, "resolution_percentage")
+            row.prop(profile, "samples")
+            row = box.row()
+            row.prop(profile, "adaptive_threshold")
+            row.prop(profile, "tile_size")
+            box.prop(profile, "persistent_data")
+            box.prop(profile, "denoiser")
+
         selected_output_type = ('image' if props.output_format in ["PNG", "JPEG", "EXR", "TIFF", "BMP"] else 'video')
 
+        if selected_output_type == 'image':
+            row = layout.row()
+            row.prop(props, "resume_missing_frames")
+            row = layout.row()
+            row.prop(props, "use_render_cache")
+            if props.use_render_cache:
+                box = layout.box()
+                box.label(text="Cache de Renders")
+                box.prop(props, "render_cache_dir")
+                box.prop(props, "render_cache_size_gb")
+                row = box.row(align=True)
+                row.operator("render.store_render_cache", icon='FILE_TICK')
+                row.operator("render.show_render_cache_stats", icon='INFO')
+
         row = layout.row()
         row.prop(props, "use_scene_system")
         row = layout.row()
         row.prop(props, "use_camera_system")
+        if props.use_camera_system or props.use_scene_system:
+            row = layout.row()
+            row.prop(props, "use_persistent_worker")
+            if selected_output_type == 'image':
+                row = layout.row()
+                row.prop(props, "detect_static_frames")
+            row = layout.row()
+            row.operator("render.read_blend_contents", icon='FILE_REFRESH')
 
         if props.use_camera_system:
             box = layout.box()
             box.label(text="Câmeras para Renderizar")
+            if selected_output_type == 'image':
+                box.prop(props, "group_cameras_by_markers")
 
             row = box.row(align=True)
             col = row.column()
@@ -637,6 +1898,7 @@ class BlenderRenderPanel(bpy.types.Panel):
             col.separator()
             col.operator("render.cameras_move", icon='TRIA_UP', text="").direction = 'UP'
             col.operator("render.cameras_move", icon='TRIA_DOWN', text="").direction = 'DOWN'
+            draw_shot_list_tools(box, props, 'CAMERAS')
 
             if selected_output_type == 'video':
                 box = layout.box()
@@ -648,14 +1910,14 @@ class BlenderRenderPanel(bpy.types.Panel):
         elif props.use_scene_system:
             box = layout.box()
             box.label(text="Cenas para Renderizar")
-            for i, scene_prop in enumerate(props.scenes):
-                scene_box = box.box()
-                row = scene_box.row(align=True)
-                row.prop(scene_prop, "name")
-                row.operator("scene.remove_blender_scene", text="", icon='X').index = i
-                scene_box.prop(scene_prop, "start_frame")
-                scene_box.prop(scene_prop, "end_frame")
-            box.operator("scene.add_blender_scene", text="Adicionar Cena", icon='ADD')
+            row = box.row(align=True)
+            col = row.column()
+            col.template_list("BLENDER_RENDER_UL_scenes", "", props, "scenes", props, "active_scene_index", rows=5)
+
+            col = row.column(align=True)
+            col.operator("scene.add_blender_scene", icon='ADD', text="")
+            col.operator("scene.remove_blender_scene", icon='REMOVE', text="").index = props.active_scene_index
+            draw_shot_list_tools(box, props, 'SCENES')
 
             if selected_output_type == 'video':
                 box = layout.box()
@@ -691,6 +1953,113 @@ class BlenderRenderPanel(bpy.types.Panel):
         row.operator("render.start_and_quit", icon='PLAY') # Botão com ícone de Play
         # --- Fim do Botão NOVO ---
 
+        box = layout.box()
+        box.label(text="Renderização Paralela Local")
+        box.prop(props, "parallel_workers")
+        box.prop(props, "frames_per_chunk")
+        box.prop(props, "partition_threads")
+        box.prop(props, "use_cpu_affinity")
+        if props.use_cpu_affinity:
+            box.prop(props, "numa_aware")
+        if props.output_format not in ["PNG", "JPEG", "EXR", "TIFF", "BMP"]:
+            box.prop(props, "split_video_chunks")
+            if props.split_video_chunks:
+                box.prop(props, "video_chunk_mode")
+                box.prop(props, "ffmpeg_path")
+        elif not props.use_camera_system and not props.use_scene_system:
+            row = box.row()
+            row.prop(props, "tile_columns")
+            row.prop(props, "tile_rows")
+            if props.tile_columns * props.tile_rows > 1:
+                box.prop(props, "tile_overlap")
+        box.prop(props, "use_output_staging")
+        if props.use_output_staging:
+            box.prop(props, "staging_dir")
+            box.prop(props, "mover_threads")
+        box.prop(props, "use_asset_staging")
+        if props.use_asset_staging:
+            box.prop(props, "asset_cache_dir")
+        box.prop(props, "use_memory_admission")
+        if props.use_memory_admission:
+            box.prop(props, "memory_headroom_gb")
+            box.prop(props, "default_job_memory_gb")
+            box.prop(props, "memory_pressure_action")
+        box.prop(props, "max_render_retries")
+        box.prop(props, "verify_saved_frames")
+        box.prop(props, "use_render_history")
+        if props.use_render_history:
+            box.prop(props, "balance_chunks_by_history")
+            row = box.row()
+            row.label(text=props.predicted_batch_duration or "Duração prevista do lote: --", icon='TIME')
+            row.operator("render.predict_batch_duration", text="", icon='FILE_REFRESH')
+        box.operator("render.autotune_concurrency", icon='PREFERENCES')
+        row = box.row()
+        row.prop(props, "benchmark_samples")
+        row.prop(props, "benchmark_compare_engines")
+        box.operator("render.sample_benchmark", icon='SORTTIME')
+        if props.benchmark_summary:
+            box.label(text=props.benchmark_summary, icon='TIME')
+        box.operator("render.start_parallel", icon='RENDER_ANIMATION')
+        box.prop(props, "metrics_file_path")
+        if _parallel_render_state["status"]:
+            box.label(text=_parallel_render_state["status"])
+        if _parallel_render_state["metrics"] is not None:
+            for snapshot in _parallel_render_state["metrics"].snapshots():
+                job_box = box.box()
+                job_box.label(text=f"{snapshot['job']}: {snapshot['frames_done']}/{snapshot['total_frames']} frames", icon='RENDER_RESULT')
+                job_box.label(text=f"{snapshot['mean']:.1f}s/frame (p50 {snapshot['p50']:.1f}s, p95 {snapshot['p95']:.1f}s)")
+                job_box.label(text=f"{snapshot['frames_per_hour']:.0f} frames/h, ETA {format_eta(snapshot['eta_seconds'])}")
+
+        box = layout.box()
+        box.label(text="Lote de Vários .blend")
+        row = box.row()
+        row.template_list("BLENDER_RENDER_UL_batch_files", "", props, "batch_files", props, "active_batch_index", rows=4)
+        col = row.column(align=True)
+        col.operator("render.add_batch_file", icon='ADD', text="")
+        col.operator("render.remove_batch_file", icon='REMOVE', text="")
+        col.separator()
+        col.operator("render.update_batch_file", icon='FILE_REFRESH', text="")
+        col.operator("render.load_batch_file_settings", icon='PREFERENCES', text="")
+        if 0 <= props.active_batch_index < len(props.batch_files):
+            box.prop(props.batch_files[props.active_batch_index], "blend_file_path")
+        box.prop(props, "batch_manifest_path")
+        row = box.row(align=True)
+        row.operator("render.save_batch_manifest", icon='FILE_TICK')
+        row.operator("render.load_batch_manifest", icon='FILEBROWSER')
+        box.operator("render.start_batch", icon='RENDER_ANIMATION')
+
+        box = layout.box()
+        box.label(text="Fila de Render em Segundo Plano")
+        box.prop(props, "queue_nice")
+        row = box.row()
+        row.operator("render.queue_start", icon='SEQ_STRIP_DUPLICATE')
+        row.operator("render.queue_cancel", text="Cancelar Tudo", icon='CANCEL').job_id = 0
+        render_queue = _render_queue_state["queue"]
+        if render_queue is not None:
+            counts = render_queue.counts()
+            box.label(text=", ".join(f"{STATE_LABELS[state]}: {count}" for state, count in counts.items() if count))
+            for job in render_queue.jobs:
+                row = box.row(align=True)
+                row.label(text=f"{job['name']} {job['start']}-{job['end']}: {STATE_LABELS[job['state']]} ({render_queue.progress(job) * 100:.0f}%)")
+                if job["state"] == 'QUEUED':
+                    row.operator("render.queue_move", text="", icon='TRIA_UP').job_id = job["id"]
+                    op = row.operator("render.queue_move", text="", icon='TRIA_DOWN')
+                    op.job_id = job["id"]
+                    op.direction = 'DOWN'
+                if job["state"] in ('QUEUED', 'RUNNING'):
+                    row.operator("render.queue_cancel", text="", icon='X').job_id = job["id"]
+
+        box = layout.box()
+        box.label(text="Render Distribuído")
+        box.prop(props, "farm_coordinator_url")
+        box.prop(props, "farm_pinned_worker")
+        box.prop(props, "farm_token")
+        row = box.row()
+        row.operator("render.submit_to_farm", icon='NETWORK_DRIVE')
+        row.operator("render.show_farm_status", icon='FILE_REFRESH')
+        for line in _render_farm_state["status"]:
+            box.label(text=line)
+
         box = layout.box()
         box.label(text="Manutenção do Addon")
         box.operator("render.update_blender_addon", icon='FILE_FOLDER')
@@ -700,18 +2069,46 @@ class BlenderRenderPanel(bpy.types.Panel):
 classes = (
     BlenderSceneProperties,
     BlenderCameraProperties,
+    BlenderPerformanceProfile,
+    AddPerformanceProfile,
+    RemovePerformanceProfile,
+    LoadDefaultPerformanceProfiles,
     AddBlenderScene,
     RemoveBlenderScene,
     AddBlenderCamera,
     RemoveBlenderCamera,
+    ReadBlendContents,
     BLENDER_RENDER_OT_cameras_move,
     BLENDER_RENDER_UL_cameras,
+    BLENDER_RENDER_UL_scenes,
+    ImportShotList,
+    ExportShotList,
+    BlenderBatchFile,
+    BLENDER_RENDER_UL_batch_files,
     GenerateBlenderCommand,
     CopyBlenderCommand,
     ClearBlenderFields,
     DonateBlenderAddon,
     UpdateBlenderAddon,
     StartBlenderRenderAndQuit, # Adiciona o novo operador aqui!
+    StartBlenderRenderParallel,
+    PredictBatchDuration,
+    AutoTuneRenderConcurrency,
+    SampleRenderBenchmark,
+    StoreRenderCache,
+    ShowRenderCacheStats,
+    StartBlenderRenderQueue,
+    CancelBlenderRenderQueueJob,
+    MoveBlenderRenderQueueJob,
+    AddBatchFile,
+    UpdateBatchFile,
+    LoadBatchFileSettings,
+    RemoveBatchFile,
+    SaveBatchManifest,
+    LoadBatchManifest,
+    StartBatchRender,
+    SubmitToRenderFarm,
+    ShowRenderFarmStatus,
     BlenderRenderProperties,
     BlenderRenderPanel,
 )
@@ -723,6 +2120,11 @@ def register():
     bpy.types.Scene.blender_render_props = bpy.props.PointerProperty(type=BlenderRenderProperties)
 
 def unregister():
+    # Não deixa processos da fila rodando sem ninguém para acompanhá-los
+    if _render_queue_state["queue"] is not None:
+        _render_queue_state["queue"].cancel_all()
+    if bpy.app.timers.is_registered(_poll_render_queue):
+        bpy.app.timers.unregister(_poll_render_queue)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.blender_render_props
@@ -0,0 +1,2 @@
+# Núcleo do Render4Me ! Brasil ! sem dependência do bpy.
+# Usado pelo addon dentro do Blender e pela linha de comando "python -m render4me".
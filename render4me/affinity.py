@@ -0,0 +1,143 @@
+import glob
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+# --- Divisão de Núcleos entre Processos Simultâneos ---
+# Vários "blender -b" com o número padrão de threads disputam os mesmos núcleos.
+# Cada processo recebe "-t <threads>" e, opcionalmente, um conjunto exclusivo de núcleos.
+
+def parse_cpu_list(value):
+    # Formato do kernel: "0-3,8-11"
+    cpus = []
+    for part in value.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def numa_nodes(cpus=None):
+    # Núcleos de cada nó NUMA exposto em /sys; lista vazia quando a máquina não informa
+    cpus = set(cpus if cpus is not None else available_cpus())
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist"), key=lambda p: int(p.split("node")[-1].split("/")[0])):
+        try:
+            with open(path, "r", encoding="ascii") as handle:
+                node_cpus = [cpu for cpu in parse_cpu_list(handle.read()) if cpu in cpus]
+        except (OSError, ValueError):
+            continue
+        if node_cpus:
+            nodes.append(node_cpus)
+    return nodes
+
+def _split_evenly(cpus, parts):
+    size, extra = divmod(len(cpus), parts)
+    slots, position = [], 0
+    for i in range(parts):
+        count = size + (1 if i < extra else 0)
+        slots.append(cpus[position:position + count])
+        position += count
+    return slots
+
+def partition_cpus(concurrency, numa_aware=True, cpus=None):
+    # Um conjunto de núcleos disjunto por processo; com NUMA, cada processo fica dentro de um nó
+    cpus = cpus if cpus is not None else available_cpus()
+    concurrency = max(1, min(concurrency, len(cpus)))
+    nodes = numa_nodes(cpus) if numa_aware else []
+    if len(nodes) < 2 or concurrency < len(nodes):
+        return _split_evenly(cpus, concurrency)
+    # Distribui os processos entre os nós proporcionalmente ao número de núcleos de cada um
+    slots_per_node = [max(1, len(node) * concurrency // len(cpus)) for node in nodes]
+    while sum(slots_per_node) < concurrency:
+        index = max(range(len(nodes)), key=lambda i: len(nodes[i]) / slots_per_node[i])
+        slots_per_node[index] += 1
+    while sum(slots_per_node) > concurrency:
+        index = max(range(len(nodes)), key=lambda i: slots_per_node[i])
+        slots_per_node[index] -= 1
+    slots = []
+    for node, count in zip(nodes, slots_per_node):
+        slots.extend(_split_evenly(node, min(count, len(node))))
+    return slots
+
+def plan_cpu_layout(workers, partition_threads=True, use_affinity=False, numa_aware=True):
+    # Devolve (threads por processo, conjuntos de núcleos) para N processos simultâneos
+    cpus = available_cpus()
+    slots = partition_cpus(workers, numa_aware, cpus) if use_affinity else None
+    if not partition_threads:
+        return 0, slots
+    if slots:
+        return max(1, min(len(slot) for slot in slots)), slots
+    return max(1, len(cpus) // max(1, workers)), slots
+
+def with_thread_count(argv, threads):
+    # "-t" precisa vir antes de "-a"/"-f", que disparam o render assim que são lidos
+    argv = list(argv)
+    if "-t" in argv:
+        argv[argv.index("-t") + 1] = str(threads)
+        return argv
+    position = argv.index("-b") + 1 if "-b" in argv else 1
+    if position < len(argv) and not argv[position].startswith("-"):
+        position += 1
+    argv[position:position] = ["-t", str(threads)]
+    return argv
+
+def pin_process(pid, cpus):
+    # Fixa o processo recém-criado nos núcleos dados (somente Linux)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, cpus)
+        except OSError:
+            pass
+
+def autotune_concurrency(argv, sample_frame, levels=None, numa_aware=True, log=print):
+    # Mede a vazão (frames/s) renderizando o frame de amostra com vários níveis de concorrência
+    cpus = available_cpus()
+    if levels is None:
+        levels, level = [], 1
+        while level <= len(cpus):
+            levels.append(level)
+            level *= 2
+    levels = [level for level in levels if level <= len(cpus)] or [1]
+    sample_argv = [arg for arg in argv if arg not in ("-a",)]
+    for flag in ("-s", "-e", "-f"):
+        while flag in sample_argv:
+            index = sample_argv.index(flag)
+            del sample_argv[index:index + 2]
+    results = {}
+    scratch_dir = tempfile.mkdtemp(prefix="render4me_autotune_")
+    try:
+        for level in levels:
+            slots = partition_cpus(level, numa_aware, cpus)
+            threads = max(1, len(cpus) // level)
+            processes = []
+            started = time.perf_counter()
+            for i, slot in enumerate(slots):
+                run_argv = with_thread_count(sample_argv, threads)
+                if "-o" in run_argv:
+                    run_argv[run_argv.index("-o") + 1] = os.path.join(scratch_dir, f"level{level}_{i}_####")
+                process = subprocess.Popen(run_argv + ["-f", str(sample_frame)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                pin_process(process.pid, slot)
+                processes.append(process)
+            returncodes = [process.wait() for process in processes]
+            failed = any(returncode != 0 for returncode in returncodes)
+            elapsed = time.perf_counter() - started
+            if failed:
+                log(f"Auto-ajuste: {level} processo(s) falharam, nível ignorado.")
+                continue
+            results[level] = len(slots) / elapsed
+            log(f"Auto-ajuste: {level} processo(s) x {threads} thread(s): {results[level] * 3600:.0f} frames/h")
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    best = max(results, key=results.get) if results else 1
+    return {"best": best, "frames_per_second": results}
@@ -0,0 +1,205 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+from .paths import render4me_data_dir
+
+# --- Cópia Local do .blend e das Dependências (Cache por Conteúdo) ---
+# Cada processo de render lê o .blend, as bibliotecas linkadas e as texturas do armazenamento compartilhado.
+# Aqui tudo é copiado uma única vez por lote para um cache local endereçado pelo sha256 do conteúdo:
+#   objects/<sha256>  o conteúdo de cada arquivo (reaproveitado entre lotes e projetos)
+#   trees/<id>/...    a mesma estrutura de pastas do projeto, com hard links para objects/,
+#                     então os caminhos relativos ("//") gravados no .blend continuam válidos.
+# Caminhos absolutos não podem ser redirecionados sem alterar o .blend e continuam sendo lidos da rede.
+COPY_BLOCK = 4 * 1024 * 1024
+SEQUENCE_TOKENS = re.compile(r"<UDIM>|<UVTILE>")
+LAST_DIGITS = re.compile(r"\d+(?=\D*$)")
+
+def default_asset_cache_dir():
+    return os.path.join(render4me_data_dir(), "assets")
+
+def _resolve(path, referencing_file):
+    if path.startswith("//"):
+        return os.path.normpath(os.path.join(os.path.dirname(referencing_file), path[2:]))
+    return None
+
+def _expand_sequence(path):
+    # Sequências e tiles UDIM: o caminho gravado aponta para um único arquivo do conjunto
+    directory, name = os.path.split(path)
+    if SEQUENCE_TOKENS.search(name):
+        pattern = SEQUENCE_TOKENS.sub("*", glob.escape(name))
+    else:
+        match = LAST_DIGITS.search(name)
+        if match is None:
+            return [path]
+        pattern = glob.escape(name[:match.start()]) + "[0-9]" * len(match.group()) + "*" + glob.escape(name[match.end():])
+    return sorted(glob.glob(os.path.join(glob.escape(directory), pattern))) or [path]
+
+def collect_blend_dependencies(blend_file_path):
+    # Devolve (arquivos a copiar, caminhos absolutos mantidos na rede, arquivos não encontrados).
+    # Bibliotecas com caminho relativo são lidas também: as dependências delas são relativas a elas.
+    from .blendfile import read_blend_info
+
+    blend_file = os.path.abspath(blend_file_path)
+    files, absolute, missing = [blend_file], [], []
+    pending, visited = [blend_file], {blend_file}
+    while pending:
+        current = pending.pop()
+        for dependency in read_blend_info(current)["dependencies"]:
+            resolved = _resolve(dependency["path"], current)
+            if resolved is None:
+                absolute.append(dependency["path"])
+                continue
+            for path in _expand_sequence(resolved) if dependency["sequence"] else [resolved]:
+                if path in visited:
+                    continue
+                visited.add(path)
+                if not os.path.isfile(path):
+                    missing.append(path)
+                    continue
+                files.append(path)
+                if dependency["kind"] == "library":
+                    pending.append(path)
+    return files, sorted(set(absolute)), missing
+
+class AssetCache:
+    def __init__(self, cache_dir=None, log=print):
+        self.cache_dir = cache_dir or default_asset_cache_dir()
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.log = log
+        # Caminho de origem -> (tamanho, mtime, sha256): arquivos que não mudaram nem são lidos de novo
+        self.index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as handle:
+                    self.index = json.load(handle)
+            except (OSError, ValueError):
+                self.index = {}
+        self.staged = {}
+        self.stats = {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store(self, source):
+        # Guarda o conteúdo em objects/; devolve (sha256, bytes lidos da origem)
+        stat = os.stat(source)
+        known = self.index.get(source)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns and os.path.exists(self._object_path(known[2])):
+            return known[2], 0
+        os.makedirs(self.objects_dir, exist_ok=True)
+        temp_path = os.path.join(self.objects_dir, f"incoming_{os.getpid()}_{os.path.basename(source)}.part")
+        digest = hashlib.sha256()
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            for block in iter(lambda: src.read(COPY_BLOCK), b""):
+                digest.update(block)
+                dst.write(block)
+        object_path = self._object_path(digest.hexdigest())
+        if os.path.exists(object_path):
+            # Mesmo conteúdo já veio de outro caminho
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(temp_path, object_path)
+        self.index[source] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest(), stat.st_size
+
+    def _link(self, object_path, target):
+        if os.path.exists(target) and os.path.samefile(object_path, target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.link"
+        try:
+            os.link(object_path, temp_path)
+        except OSError:
+            # Sistema de arquivos sem hard links
+            shutil.copyfile(object_path, temp_path)
+        os.replace(temp_path, target)
+
+    def stage_blend(self, blend_file_path):
+        # Copia o .blend e as dependências para o cache; devolve o caminho do .blend local
+        blend_file = os.path.abspath(blend_file_path)
+        if blend_file in self.staged:
+            return self.staged[blend_file]
+        started = time.perf_counter()
+        files, absolute, missing = collect_blend_dependencies(blend_file)
+        root = os.path.commonpath([os.path.dirname(path) for path in files])
+        tree = os.path.join(self.cache_dir, "trees", hashlib.sha1(root.encode("utf-8")).hexdigest()[:12])
+        stats = {"files": len(files), "bytes": 0, "transferred_files": 0, "transferred_bytes": 0, "absolute": absolute, "missing": missing}
+        for path in files:
+            digest, transferred = self._store(path)
+            self._link(self._object_path(digest), os.path.join(tree, os.path.relpath(path, root)))
+            stats["bytes"] += os.path.getsize(path)
+            if transferred:
+                stats["transferred_files"] += 1
+                stats["transferred_bytes"] += transferred
+        stats["seconds"] = time.perf_counter() - started
+        for path in missing:
+            self.log(f"Dependência não encontrada (o Blender também não vai achá-la): {path}")
+        self.save()
+        self.staged[blend_file] = os.path.join(tree, os.path.relpath(blend_file, root))
+        self.stats[blend_file] = stats
+        return self.staged[blend_file]
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.index, handle)
+        os.replace(temp_path, self.index_path)
+
+def stage_blend_assets(chunks, asset_cache):
+    # Troca o "-b" de cada pedaço pelo .blend local; saídas "//" continuam relativas ao .blend original.
+    # Se alguma dependência não puder ser listada, o .blend é renderizado da pasta original.
+    from .blendfile import BlendFileError
+
+    staged, unreadable = [], set()
+    for chunk in chunks:
+        argv = list(chunk["argv"])
+        position = argv.index("-b") + 1 if "-b" in argv else len(argv)
+        # "-b --python script.py" (worker persistente) não tem .blend na linha de comando
+        if position >= len(argv) or argv[position].startswith("-") or not os.path.isfile(argv[position]):
+            staged.append(chunk)
+            continue
+        blend_file = os.path.abspath(argv[position])
+        if blend_file in unreadable:
+            staged.append(chunk)
+            continue
+        try:
+            argv[position] = asset_cache.stage_blend(blend_file)
+        except BlendFileError as e:
+            asset_cache.log(f"{os.path.basename(blend_file)} não foi copiado para o cache local: {e}")
+            unreadable.add(blend_file)
+            staged.append(chunk)
+            continue
+        if "-o" in argv and argv[argv.index("-o") + 1].startswith("//"):
+            argv[argv.index("-o") + 1] = os.path.join(os.path.dirname(blend_file), argv[argv.index("-o") + 1][2:])
+        staged.append(dict(chunk, argv=argv, blend_file=blend_file))
+    return staged
+
+def format_asset_report(asset_cache, chunks):
+    # Sem a cópia local, cada processo leria todas as dependências da rede
+    lines = []
+    for blend_file, stats in asset_cache.stats.items():
+        processes = sum(1 for chunk in chunks if chunk.get("blend_file") == blend_file)
+        avoided = max(0, stats["bytes"] * processes - stats["transferred_bytes"])
+        if stats["transferred_bytes"] and stats["seconds"] > 0:
+            rate, origin = stats["transferred_bytes"] / stats["seconds"], "medido"
+        else:
+            from .planner import LOAD_BYTES_PER_SECOND
+
+            rate, origin = LOAD_BYTES_PER_SECOND, "estimado"
+        line = (
+            f"{os.path.basename(blend_file)}: {stats['files']} arquivo(s), {stats['bytes'] / 1024 ** 2:.1f} MB; "
+            f"transferidos {stats['transferred_files']} arquivo(s), {stats['transferred_bytes'] / 1024 ** 2:.1f} MB em {stats['seconds']:.1f}s; "
+            f"{processes} processo(s) lendo do cache local: {avoided / 1024 ** 2:.1f} MB a menos na rede (~{avoided / rate:.0f}s, {origin})"
+        )
+        if stats["absolute"]:
+            line += f"; {len(stats['absolute'])} caminho(s) absoluto(s) continuam na rede"
+        lines.append(line)
+    return lines
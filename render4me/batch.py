@@ -0,0 +1,129 @@
+import json
+import os
+
+from .core import SPEC_DEFAULTS, PlanningError, load_shot_lists, plan_render
+from .scheduler import build_render_chunks
+
+# --- Lote de Vários .blend: Um Manifesto, Uma Fila ---
+# O manifesto lista os arquivos do lote, cada um com a própria especificação (cenas, câmeras, frames...).
+# Os campos de "defaults" valem para todos os arquivos que não os redefinem:
+#   {"defaults": {"blender_executable_path": "...", "output_format": "PNG"},
+#    "files": [{"blend_file_path": "shot010.blend", "priority": 2, "use_camera_system": true, "cameras": [...]}]}
+# Todos os pedaços vão para a mesma fila. A ordem é de partilha justa ponderada: o próximo pedaço é sempre
+# do arquivo com menos trabalho entregue em relação à sua prioridade, então um arquivo de prioridade 2
+# recebe o dobro dos processos de um de prioridade 1 e nenhum arquivo espera o anterior terminar.
+BATCH_ENTRY_KEYS = ("label", "priority", "enabled")
+
+def load_batch_manifest(path):
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise PlanningError("Arquivos TOML exigem Python 3.11 ou mais recente. Use JSON.")
+        with open(path, "rb") as handle:
+            data = tomllib.load(handle)
+    else:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    unknown = sorted(set(data) - {"defaults", "files"})
+    if unknown:
+        raise PlanningError(f"Campo(s) desconhecido(s) no manifesto: {', '.join(unknown)}")
+    manifest = {"defaults": data.get("defaults", {}), "files": data.get("files", [])}
+    unknown = sorted(set(manifest["defaults"]) - set(SPEC_DEFAULTS))
+    if unknown:
+        raise PlanningError(f"Campo(s) desconhecido(s) em defaults: {', '.join(unknown)}")
+    for i, entry in enumerate(manifest["files"], 1):
+        unknown = sorted(set(entry) - set(SPEC_DEFAULTS) - set(BATCH_ENTRY_KEYS))
+        if unknown:
+            raise PlanningError(f"Campo(s) desconhecido(s) no arquivo {i} do manifesto: {', '.join(unknown)}")
+        if int(entry.get("priority", 1)) < 1:
+            raise PlanningError(f"A prioridade do arquivo {i} do manifesto deve ser 1 ou mais.")
+    # Caminhos relativos são relativos ao manifesto, para o lote poder ser movido junto com os .blend
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for spec in [manifest["defaults"]] + manifest["files"]:
+        for key in ("blend_file_path", "custom_output_path"):
+            value = spec.get(key)
+            if value and not value.startswith("//") and not os.path.isabs(value):
+                spec[key] = os.path.normpath(os.path.join(base_dir, value))
+        load_shot_lists(spec, base_dir)
+    return manifest
+
+def write_batch_manifest(manifest, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, ensure_ascii=False)
+    return path
+
+def batch_entry_label(entry, used):
+    # Nome do arquivo sem extensão; repetidos ganham um sufixo
+    label = entry.get("label") or os.path.splitext(os.path.basename(entry.get("blend_file_path", "")))[0] or "blend"
+    candidate, suffix = label, 2
+    while candidate in used:
+        candidate = f"{label}_{suffix}"
+        suffix += 1
+    used.add(candidate)
+    return candidate
+
+def plan_batch(manifest):
+    # Planeja cada arquivo como uma especificação independente; um arquivo com erro não impede os outros
+    files, messages, used = [], [], set()
+    for entry in manifest["files"]:
+        if not entry.get("enabled", True):
+            continue
+        label = batch_entry_label(entry, used)
+        spec = dict(SPEC_DEFAULTS)
+        spec.update(manifest["defaults"])
+        spec.update({key: value for key, value in entry.items() if key not in BATCH_ENTRY_KEYS})
+        if not os.path.isfile(spec["blend_file_path"]):
+            messages.append(f"{label}: arquivo não encontrado: {spec['blend_file_path']} (arquivo ignorado)")
+            continue
+        try:
+            plan = plan_render(spec)
+        except (OSError, PlanningError) as e:
+            messages.append(f"{label}: {e} (arquivo ignorado)")
+            continue
+        messages.extend(f"{label}: {message}" for message in plan["messages"])
+        if not plan["jobs"]:
+            messages.append(f"{label}: nada para renderizar.")
+            continue
+        files.append({"label": label, "priority": int(entry.get("priority", 1)), "spec": spec, "jobs": plan["jobs"]})
+    return {"files": files, "messages": messages}
+
+def build_batch_chunks(files, frames_per_chunk):
+    chunks = []
+    for batch_file in files:
+        for chunk in build_render_chunks(batch_file["jobs"], frames_per_chunk):
+            chunks.append(dict(chunk, batch=batch_file["label"], priority=batch_file["priority"]))
+    return fair_share_order(chunks)
+
+def fair_share_order(chunks, history=None):
+    # Intercala os pedaços dos arquivos pela prioridade. Dentro de cada arquivo, com histórico, os mais
+    # longos vão primeiro; o custo de cada pedaço é o tempo previsto (se o histórico conhece todos) ou os frames.
+    groups = {}
+    for chunk in chunks:
+        groups.setdefault(chunk.get("batch", ""), []).append(chunk)
+    costs = None
+    if history is not None:
+        from .history import order_longest_first
+
+        groups = {label: order_longest_first(group, history) for label, group in groups.items()}
+        predictions = {id(chunk): history.predict_chunk_seconds(chunk) for chunk in chunks}
+        if all(seconds is not None for seconds in predictions.values()):
+            costs = predictions
+    served = {label: 0.0 for label in groups}
+    order = list(groups)
+    ordered = []
+    while any(groups.values()):
+        label = min((label for label in order if groups[label]), key=lambda label: (served[label] / groups[label][0].get("priority", 1), -groups[label][0].get("priority", 1), order.index(label)))
+        chunk = groups[label].pop(0)
+        served[label] += costs[id(chunk)] if costs is not None else chunk["frame_count"]
+        ordered.append(chunk)
+    return ordered
+
+def format_batch_plan(files, chunks):
+    lines = []
+    for batch_file in files:
+        file_chunks = [chunk for chunk in chunks if chunk.get("batch") == batch_file["label"]]
+        frames = sum(chunk["frame_count"] for chunk in file_chunks)
+        lines.append(f"Lote {batch_file['label']} (prioridade {batch_file['priority']}): {len(file_chunks)} pedaço(s), {frames} frame(s) - {batch_file['spec']['blend_file_path']}")
+    return lines
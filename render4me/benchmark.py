@@ -0,0 +1,201 @@
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from .affinity import with_thread_count
+from .frames import IMAGE_FORMATS, format_frame_list
+from .metrics import FrameEventParser, format_eta
+from .paths import render4me_data_dir
+from .scheduler import parse_render_command
+
+# --- Estimativa por Amostragem: Prever a Duração Antes de Renderizar Tudo ---
+# Cada job renderiza só uma amostra estratificada dos seus frames (primeiro, último e frames espaçados
+# igualmente entre eles) num único processo. O tempo total do job é extrapolado pela média da amostra
+# mais a inicialização medida, com intervalo de confiança de 95% (t de Student e correção de população finita).
+# A mesma amostra pode ser renderizada com outras engines ou outras quantidades de threads para comparar.
+DEFAULT_SAMPLES = 5
+
+# Nomes internos das engines; o Eevee mudou de nome entre as versões do Blender
+ENGINE_IDS = {"CYCLES": ["CYCLES"], "EEVEE": ["BLENDER_EEVEE_NEXT", "BLENDER_EEVEE"], "WORKBENCH": ["BLENDER_WORKBENCH"]}
+
+# t de Student bicaudal para 95% por graus de liberdade; acima de 30, a normal
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131,
+        2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+def t_critical(degrees_of_freedom):
+    return T_95[degrees_of_freedom - 1] if degrees_of_freedom <= len(T_95) else 1.960
+
+def sample_frames(frames, samples):
+    # Primeiro, último e frames igualmente espaçados entre eles
+    if samples >= len(frames):
+        return list(frames)
+    if samples <= 1:
+        return [frames[0]]
+    return sorted({frames[round(i * (len(frames) - 1) / (samples - 1))] for i in range(samples)})
+
+def job_frames(job):
+    if "frames" in job:
+        return job["frames"]
+    if job["start"] is None or job["end"] is None:
+        return []
+    return list(range(job["start"], job["end"] + 1))
+
+def engine_expression(engine):
+    # "-E" falha com nomes de outra versão; pelo Python a primeira engine aceita é usada
+    return "\n".join([
+        "import bpy",
+        f"for engine in {ENGINE_IDS[engine]!r}:",
+        "    try:",
+        "        bpy.context.scene.render.engine = engine",
+        "        break",
+        "    except TypeError:",
+        "        pass",
+    ])
+
+def sample_argv(argv, frames, output_path, engine="", threads=0):
+    # Mesmo comando, com a saída numa pasta temporária e só os frames da amostra
+    argv = [arg for arg in argv if arg != "-a"]
+    for flag in ("-s", "-e", "-f", "-vcodec") + (("-E",) if engine else ()):
+        while flag in argv:
+            del argv[argv.index(flag):argv.index(flag) + 2]
+    if "-o" in argv:
+        argv[argv.index("-o") + 1] = output_path
+    # Vídeos são amostrados como PNG: um vídeo com frames salteados não serve para nada
+    if "-F" in argv and argv[argv.index("-F") + 1] not in IMAGE_FORMATS:
+        argv[argv.index("-F") + 1] = "PNG"
+    if threads:
+        argv = with_thread_count(argv, threads)
+    if engine:
+        argv += ["--python-expr", engine_expression(engine)]
+    return argv + ["-f", format_frame_list(frames)]
+
+def estimate_total(frame_seconds, total_frames, startup_seconds):
+    # Devolve (previsto, limite inferior, limite superior); sem variância medida não há intervalo
+    n = len(frame_seconds)
+    mean = sum(frame_seconds) / n
+    predicted = startup_seconds + mean * total_frames
+    if n < 2 or n >= total_frames:
+        return predicted, None, None
+    variance = sum((seconds - mean) ** 2 for seconds in frame_seconds) / (n - 1)
+    margin = t_critical(n - 1) * total_frames * math.sqrt(variance / n) * math.sqrt((total_frames - n) / (total_frames - 1))
+    return predicted, max(startup_seconds, predicted - margin), predicted + margin
+
+def run_sample(argv, log=print, label=""):
+    parser = FrameEventParser()
+    events = []
+    started = time.perf_counter()
+    process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace", bufsize=1)
+    for line in process.stdout:
+        event = parser.feed(line.rstrip("\n"))
+        if event is not None:
+            events.append(event)
+            log(f"Amostragem {label}: frame {event['frame']} em {event['seconds']:.2f}s")
+    process.stdout.close()
+    return process.wait(), events, time.perf_counter() - started
+
+def build_variants(engines=None, threads=None):
+    # Combinações de engine x threads; sem nenhuma das duas, só o comando como foi gerado
+    variants = []
+    for engine in engines or [""]:
+        for thread_count in threads or [0]:
+            label = "/".join(part for part in (engine, f"{thread_count}t" if thread_count else "") if part) or "padrão"
+            variants.append({"label": label, "engine": engine, "threads": thread_count})
+    return variants
+
+def run_benchmark(commands, samples=DEFAULT_SAMPLES, engines=None, threads=None, log=print):
+    for engine in engines or []:
+        if engine not in ENGINE_IDS:
+            raise ValueError(f"Engine desconhecida: {engine} (use {', '.join(ENGINE_IDS)})")
+    jobs = []
+    for command in commands:
+        job = parse_render_command(command)
+        frames = job_frames(job)
+        if not frames:
+            # Ex.: "-b --python script.py" do worker persistente
+            log(f"Amostragem: comando sem frames na linha de comando ignorado: {job['command']}")
+            continue
+        jobs.append((job, frames, sample_frames(frames, samples)))
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "samples": samples, "confidence": 0.95, "variants": []}
+    scratch_dir = tempfile.mkdtemp(prefix="render4me_benchmark_")
+    try:
+        for v, variant in enumerate(build_variants(engines, threads)):
+            results = []
+            for j, (job, frames, sampled) in enumerate(jobs):
+                label = f"{variant['label']} {job['name'] or 'render'}"
+                argv = sample_argv(job["argv"], sampled, os.path.join(scratch_dir, f"v{v}_j{j}_####"), variant["engine"], variant["threads"])
+                try:
+                    returncode, events, wall_seconds = run_sample(argv, log, label)
+                except OSError as e:
+                    log(f"Amostragem {label}: falha ao iniciar o Blender: {e}")
+                    returncode, events, wall_seconds = -1, [], 0.0
+                frame_seconds = [event["seconds"] for event in events]
+                result = {
+                    "job": job["name"] or "render",
+                    "total_frames": len(frames),
+                    "sampled_frames": sampled,
+                    "frame_seconds": frame_seconds,
+                    "returncode": returncode,
+                    "wall_seconds": wall_seconds,
+                }
+                if returncode == 0 and frame_seconds:
+                    startup_seconds = max(0.0, wall_seconds - sum(frame_seconds))
+                    predicted, low, high = estimate_total(frame_seconds, len(frames), startup_seconds)
+                    result.update(mean_frame_seconds=sum(frame_seconds) / len(frame_seconds), startup_seconds=startup_seconds, predicted_seconds=predicted, ci_low=low, ci_high=high)
+                    log(f"Amostragem {label}: {len(frames)} frame(s) previstos em {format_eta(predicted)}")
+                else:
+                    log(f"Amostragem {label}: a amostra falhou (código {returncode}), job sem previsão.")
+                results.append(result)
+            report["variants"].append(dict(variant, jobs=results, batch=_batch_estimate(results)))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    complete = [variant for variant in report["variants"] if variant["batch"]["complete"]]
+    report["fastest"] = min(complete, key=lambda variant: variant["batch"]["predicted_seconds"])["label"] if complete else None
+    return report
+
+def _batch_estimate(results):
+    # Soma dos jobs renderizados um depois do outro; as margens são combinadas como variâncias independentes
+    predicted = [result for result in results if "predicted_seconds" in result]
+    total = sum(result["predicted_seconds"] for result in predicted)
+    margins = [(result["ci_high"] - result["predicted_seconds"]) if result["ci_high"] is not None else 0.0 for result in predicted]
+    margin = math.sqrt(sum(value ** 2 for value in margins))
+    return {
+        "predicted_seconds": total,
+        "ci_low": max(0.0, total - margin),
+        "ci_high": total + margin,
+        "complete": bool(results) and len(predicted) == len(results),
+    }
+
+def default_report_path():
+    return os.path.join(render4me_data_dir(), "benchmarks", f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+def write_benchmark_report(report, path=None):
+    path = path or default_report_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+    return path
+
+def format_benchmark_report(report):
+    lines = []
+    for variant in report["variants"]:
+        batch = variant["batch"]
+        text = f"{variant['label']}: lote em {format_eta(batch['predicted_seconds'])} (95%: {format_eta(batch['ci_low'])} a {format_eta(batch['ci_high'])})"
+        if not batch["complete"]:
+            text += ", incompleto: alguma amostra falhou"
+        lines.append(text)
+        for result in variant["jobs"]:
+            if "predicted_seconds" not in result:
+                lines.append(f"  {result['job']}: sem previsão (código {result['returncode']})")
+                continue
+            interval = f", 95%: {format_eta(result['ci_low'])} a {format_eta(result['ci_high'])}" if result["ci_low"] is not None else ""
+            lines.append(
+                f"  {result['job']}: {len(result['sampled_frames'])}/{result['total_frames']} frame(s) amostrados, "
+                f"{result['mean_frame_seconds']:.2f}s/frame + {result['startup_seconds']:.1f}s de inicialização -> {format_eta(result['predicted_seconds'])}{interval}"
+            )
+    if len(report["variants"]) > 1 and report["fastest"]:
+        lines.append(f"Mais rápida: {report['fastest']}")
+    return lines
@@ -0,0 +1,296 @@
+import gzip
+import mmap
+import os
+import re
+import struct
+
+# --- Leitura Rápida do .blend sem Abrir o Blender ---
+# Lê apenas os cabeçalhos dos blocos e o catálogo SDNA (a descrição das structs gravada no próprio arquivo),
+# então funciona com arquivos de qualquer versão sem depender de offsets fixos.
+# Arquivos sem compressão são mapeados com mmap; .blend com gzip (até 2.9x) ou zstd (3.0+) são descompactados em memória.
+OB_CAMERA = 11
+# RenderData.mode: "Render Region" (R_BORDER) e "Crop to Render Region" (R_CROP)
+R_BORDER = 1 << 9
+R_CROP = 1 << 11
+# Blocos de dados que apontam para arquivos externos: código do bloco -> (struct, tipo)
+DEPENDENCY_BLOCKS = {
+    b"LI\0\0": ("Library", "library"),
+    b"IM\0\0": ("Image", "image"),
+    b"MC\0\0": ("MovieClip", "movieclip"),
+    b"SO\0\0": ("bSound", "sound"),
+    b"VF\0\0": ("VFont", "font"),
+    b"CF\0\0": ("CacheFile", "cachefile"),
+    b"VO\0\0": ("Volume", "volume"),
+}
+# Valores de "source" que indicam sequência de imagens ou tiles UDIM (vários arquivos para um único caminho)
+SEQUENCE_SOURCES = {"Image": (2, 6), "MovieClip": (1,)}
+SDNA_STRUCTS = {"ID", "Object", "Scene", "RenderData", "TimeMarker"} | {name for name, _ in DEPENDENCY_BLOCKS.values()}
+INT_FORMATS = {"char": "b", "short": "h", "int": "i"}
+ARRAY_RE = re.compile(r"\[(\d+)\]")
+
+_blend_info_memo = {}
+
+class BlendFileError(Exception):
+    pass
+
+def _decompress_zstd(handle):
+    try:
+        from compression import zstd
+        return zstd.decompress(handle.read())
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise BlendFileError("Este .blend é compactado com zstd: use o Python do Blender, Python 3.14+ ou instale o pacote 'zstandard'.")
+    with zstandard.ZstdDecompressor().stream_reader(handle, read_across_frames=True) as reader:
+        return reader.read()
+
+def _load_buffer(path):
+    handle = open(path, "rb")
+    try:
+        magic = handle.read(4)
+        handle.seek(0)
+        if magic[:2] == b"\x1f\x8b":
+            with gzip.GzipFile(fileobj=handle) as gz:
+                return gz.read()
+        if magic == b"\x28\xb5\x2f\xfd":
+            return _decompress_zstd(handle)
+        if magic != b"BLEN":
+            raise BlendFileError(f"{os.path.basename(path)} não é um arquivo .blend.")
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        handle.close()
+
+def _parse_header(data):
+    if data[:7] != b"BLENDER":
+        raise BlendFileError("Cabeçalho .blend inválido.")
+    if data[7:9].isdigit():
+        # Formato novo (Blender 5.0+): "BLENDER17-01v0500" com cabeçalhos de bloco de 64 bits
+        header_size = int(data[7:9])
+        endian = "<" if data[12:13] == b"v" else ">"
+        return header_size, endian, 8, data[13:header_size].decode("ascii"), endian + "4siQqq", True
+    pointer_size = 8 if data[7:8] == b"-" else 4
+    endian = "<" if data[8:9] == b"v" else ">"
+    pointer_format = "Q" if pointer_size == 8 else "I"
+    return 12, endian, pointer_size, data[9:12].decode("ascii"), endian + "4si" + pointer_format + "ii", False
+
+def _parse_sdna(data, offset, endian, pointer_size, wanted):
+    # Catálogo SDNA: nomes dos campos, tipos, tamanho de cada tipo e a lista de campos de cada struct.
+    # As seções são alinhadas em 4 bytes a partir do início do bloco (não do arquivo).
+    # Só os campos das structs em "wanted" são decodificados: o catálogo tem quase mil structs.
+    def align(position):
+        return offset + ((position - offset + 3) & ~3)
+
+    def read_strings(position, count):
+        strings = []
+        for _ in range(count):
+            end = data.find(b"\0", position)
+            if end < 0:
+                raise ValueError("catálogo SDNA truncado")
+            strings.append(data[position:end].decode("ascii", "replace"))
+            position = end + 1
+        return strings, align(position)
+
+    if data[offset:offset + 8] != b"SDNANAME":
+        raise BlendFileError("Catálogo SDNA inválido.")
+    (name_count,) = struct.unpack_from(endian + "i", data, offset + 8)
+    names, position = read_strings(offset + 12, name_count)
+    (type_count,) = struct.unpack_from(endian + "i", data, position + 4)
+    types, position = read_strings(position + 8, type_count)
+    type_lengths = struct.unpack_from(f"{endian}{type_count}h", data, position + 4)
+    position = align(position + 4 + 2 * type_count)
+    (struct_count,) = struct.unpack_from(endian + "i", data, position + 4)
+    position += 8
+    structs = {}
+    for _ in range(struct_count):
+        type_index, field_count = struct.unpack_from(endian + "hh", data, position)
+        position += 4 + 4 * field_count
+        if types[type_index] not in wanted:
+            continue
+        raw_fields = struct.unpack_from(f"{endian}{2 * field_count}h", data, position - 4 * field_count)
+        fields, field_offset = {}, 0
+        for field_type, field_name in zip(raw_fields[0::2], raw_fields[1::2]):
+            name = names[field_name]
+            count = 1
+            for size in ARRAY_RE.findall(name):
+                count *= int(size)
+            is_pointer = name.startswith("*") or name.startswith("(*")
+            key = ARRAY_RE.sub("", name).lstrip("*").strip("()*")
+            field_size = (pointer_size if is_pointer else type_lengths[field_type]) * count
+            fields[key] = (field_offset, types[field_type], field_size)
+            field_offset += field_size
+        structs[types[type_index]] = fields
+    return structs
+
+class _Reader:
+    def __init__(self, data, endian, pointer_size, structs):
+        self.data = data
+        self.endian = endian
+        self.pointer_format = endian + ("Q" if pointer_size == 8 else "I")
+        self.structs = structs
+
+    def offset(self, struct_name, *path):
+        # Offset de um campo (possivelmente aninhado, ex.: Scene.r.sfra) a partir do início da struct
+        total = 0
+        for field in path:
+            field_offset, field_type, _ = self.structs[struct_name][field]
+            total += field_offset
+            struct_name = field_type
+        return total
+
+    def size(self, struct_name, field):
+        return self.structs[struct_name][field][2]
+
+    def has(self, struct_name, field):
+        return field in self.structs.get(struct_name, {})
+
+    def field(self, struct_name, *candidates):
+        # Alguns campos mudaram de nome entre versões (ex.: "name" -> "filepath"); usa o primeiro que existir
+        for candidate in candidates:
+            if self.has(struct_name, candidate):
+                return candidate
+        return None
+
+    def int(self, base, relative, fmt="i"):
+        return struct.unpack_from(self.endian + fmt, self.data, base + relative)[0]
+
+    def pointer(self, base, relative):
+        return struct.unpack_from(self.pointer_format, self.data, base + relative)[0]
+
+    def string(self, base, relative, length):
+        raw = bytes(self.data[base + relative:base + relative + length])
+        return raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+def read_blend_info(path):
+    # Cenas (com range de frames, câmera ativa e marcadores), objetos de câmera e arquivos externos de um .blend
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _blend_info_memo:
+        return _blend_info_memo[memo_key]
+    data = _load_buffer(path)
+    try:
+        info = _read_blocks(data)
+    except (struct.error, ValueError, IndexError, KeyError) as e:
+        raise BlendFileError(f"Não foi possível ler {os.path.basename(path)}: {e}")
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    _blend_info_memo[memo_key] = info
+    return info
+
+def _read_blocks(data):
+    header_size, endian, pointer_size, version, bhead_format, large_bhead = _parse_header(data)
+    bhead_size = struct.calcsize(bhead_format)
+    scenes, objects, blocks, sdna_offset = [], [], {}, None
+    dependency_blocks = []
+    position, size = header_size, len(data)
+    while position + bhead_size <= size:
+        if large_bhead:
+            code, sdna_index, old, length, _ = struct.unpack_from(bhead_format, data, position)
+        else:
+            code, length, old, sdna_index, _ = struct.unpack_from(bhead_format, data, position)
+        data_offset = position + bhead_size
+        if code == b"ENDB":
+            break
+        if code == b"SC\0\0":
+            scenes.append(data_offset)
+        elif code == b"OB\0\0":
+            objects.append(data_offset)
+            blocks[old] = data_offset
+        elif code == b"DATA":
+            blocks[old] = data_offset
+        elif code in DEPENDENCY_BLOCKS:
+            dependency_blocks.append((code, data_offset))
+        elif code == b"DNA1":
+            sdna_offset = data_offset
+        position = data_offset + length
+    if sdna_offset is None:
+        raise BlendFileError("O .blend não contém o catálogo SDNA.")
+    structs = _parse_sdna(data, sdna_offset, endian, pointer_size, SDNA_STRUCTS)
+    reader = _Reader(data, endian, pointer_size, structs)
+
+    id_name = reader.offset("ID", "name")
+    id_name_length = reader.size("ID", "name")
+    object_name = reader.offset("Object", "id") + id_name
+    object_type = reader.offset("Object", "type")
+    object_names = {}
+    cameras = []
+    for base in objects:
+        name = reader.string(base, object_name, id_name_length)[2:]
+        object_names[base] = name
+        if reader.int(base, object_type, "h") == OB_CAMERA:
+            cameras.append(name)
+
+    def object_at(pointer):
+        base = blocks.get(pointer)
+        return object_names.get(base, "") if pointer else ""
+
+    scene_name = reader.offset("Scene", "id") + id_name
+    scene_start = reader.offset("Scene", "r", "sfra")
+    scene_end = reader.offset("Scene", "r", "efra")
+    scene_camera = reader.offset("Scene", "camera")
+    # Resolução e porcentagem (resolution_percentage): usadas para conferir o tamanho dos frames salvos
+    scene_width = reader.offset("Scene", "r", "xsch")
+    scene_height = reader.offset("Scene", "r", "ysch")
+    scene_percentage = reader.offset("Scene", "r", "size")
+    scene_mode = reader.offset("Scene", "r", "mode") if reader.has("RenderData", "mode") else None
+    scene_markers = reader.offset("Scene", "markers")
+    marker_next = reader.offset("TimeMarker", "next")
+    marker_frame = reader.offset("TimeMarker", "frame")
+    marker_name = reader.offset("TimeMarker", "name")
+    marker_name_length = reader.size("TimeMarker", "name")
+    marker_camera = reader.offset("TimeMarker", "camera") if reader.has("TimeMarker", "camera") else None
+    result_scenes = []
+    for base in scenes:
+        markers, pointer, seen = [], reader.pointer(base, scene_markers), set()
+        while pointer and pointer in blocks and pointer not in seen:
+            seen.add(pointer)
+            marker = blocks[pointer]
+            markers.append({
+                "name": reader.string(marker, marker_name, marker_name_length),
+                "frame": reader.int(marker, marker_frame),
+                "camera": object_at(reader.pointer(marker, marker_camera)) if marker_camera is not None else "",
+            })
+            pointer = reader.pointer(marker, marker_next)
+        result_scenes.append({
+            "name": reader.string(base, scene_name, id_name_length)[2:],
+            "start_frame": reader.int(base, scene_start),
+            "end_frame": reader.int(base, scene_end),
+            "camera": object_at(reader.pointer(base, scene_camera)),
+            "resolution": [reader.int(base, scene_width), reader.int(base, scene_height), reader.int(base, scene_percentage, "h")],
+            # Com região de render recortada, o frame salvo tem o tamanho da região, não o da resolução
+            "crop_to_border": scene_mode is not None and reader.int(base, scene_mode) & (R_BORDER | R_CROP) == R_BORDER | R_CROP,
+            "markers": sorted(markers, key=lambda marker: marker["frame"]),
+        })
+    return {
+        "version": f"{version[:-2].lstrip('0')}.{version[-2:].lstrip('0') or '0'}",
+        "scenes": result_scenes,
+        "cameras": cameras,
+        "dependencies": _read_dependencies(reader, dependency_blocks, reader.offset("ID", "lib")),
+    }
+
+def _read_dependencies(reader, dependency_blocks, id_lib):
+    # Caminhos como gravados no .blend ("//" = relativo ao arquivo). Ficam de fora os dados empacotados
+    # e os vindos de bibliotecas linkadas (esses são lidos no .blend da própria biblioteca).
+    dependencies, seen = [], set()
+    for code, base in dependency_blocks:
+        struct_name, kind = DEPENDENCY_BLOCKS[code]
+        path_field = reader.field(struct_name, "filepath", "name")
+        if path_field is None or (kind != "library" and reader.pointer(base, id_lib)):
+            continue
+        if reader.has(struct_name, "packedfile") and reader.pointer(base, reader.offset(struct_name, "packedfile")):
+            continue
+        if reader.has(struct_name, "packedfiles") and reader.pointer(base, reader.offset(struct_name, "packedfiles")):
+            continue
+        path = reader.string(base, reader.offset(struct_name, path_field), reader.size(struct_name, path_field))
+        if not path or path.startswith("<"):
+            continue
+        sequence = False
+        if struct_name in SEQUENCE_SOURCES:
+            source_type = reader.structs[struct_name]["source"][1]
+            sequence = reader.int(base, reader.offset(struct_name, "source"), INT_FORMATS.get(source_type, "i")) in SEQUENCE_SOURCES[struct_name]
+        if (kind, path) not in seen:
+            seen.add((kind, path))
+            dependencies.append({"kind": kind, "path": path, "sequence": sequence})
+    return dependencies
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from .frames import FORMAT_EXTENSIONS, frame_file_is_complete
+
+# --- Cache de Renders por Conteúdo do .blend ---
+_blend_hash_memo = {}
+
+def blend_content_hash(path):
+    # O hash só é recalculado quando o tamanho ou a data de modificação do arquivo mudam
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _blend_hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+        _blend_hash_memo[memo_key] = digest.hexdigest()
+    return _blend_hash_memo[memo_key]
+
+def place_file(src, dest):
+    # Prefere hard link (instantâneo, sem espaço extra); copia se estiver em outro disco
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+class RenderCache:
+    # Índice JSON com os frames guardados; o uso mais antigo é o primeiro a ser removido (LRU)
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = {"entries": {}, "pending": {}, "hits": 0, "misses": 0}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as handle:
+                    self.index.update(json.load(handle))
+            except (OSError, ValueError):
+                pass
+        self.session_hits = 0
+        self.session_misses = 0
+
+    @staticmethod
+    def make_key(blend_hash, engine, output_format, name, frame):
+        return hashlib.sha256(f"{blend_hash}|{engine}|{output_format}|{name}|{frame}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], key + extension)
+
+    def fetch(self, key, dest, output_format):
+        entry = self.index["entries"].get(key)
+        path = self._entry_path(key, FORMAT_EXTENSIONS[output_format])
+        # Um frame sobrescrito através de um hard link invalida a entrada
+        if entry and os.path.exists(path) and os.path.getsize(path) == entry["size"] and frame_file_is_complete(path, output_format):
+            place_file(path, dest)
+            entry["last_used"] = time.time()
+            self.index["hits"] += 1
+            self.session_hits += 1
+            return True
+        if entry:
+            self._remove(key, path)
+        self.index["misses"] += 1
+        self.session_misses += 1
+        return False
+
+    def expect(self, key, dest, output_format):
+        # Registra um frame que será renderizado para guardá-lo no cache depois.
+        # Uma nova geração de comandos substitui a anterior para o mesmo arquivo de saída.
+        self.index["pending"][dest] = {"key": key, "format": output_format, "since": time.time()}
+
+    def store_pending(self):
+        stored = 0
+        for dest, pending in list(self.index["pending"].items()):
+            # Só conta arquivos escritos depois que o comando foi gerado
+            if not os.path.exists(dest) or os.path.getmtime(dest) < pending["since"] or not frame_file_is_complete(dest, pending["format"]):
+                continue
+            extension = FORMAT_EXTENSIONS[pending["format"]]
+            path = self._entry_path(pending["key"], extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(dest, path)
+            self.index["entries"][pending["key"]] = {"size": os.path.getsize(path), "ext": extension, "last_used": time.time()}
+            del self.index["pending"][dest]
+            stored += 1
+        self.evict()
+        return stored
+
+    def _remove(self, key, path):
+        self.index["entries"].pop(key, None)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.index["entries"].values())
+
+    def evict(self):
+        total = self.total_bytes()
+        for key, entry in sorted(self.index["entries"].items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._remove(key, self._entry_path(key, entry["ext"]))
+
+    def stats(self):
+        lookups = self.index["hits"] + self.index["misses"]
+        return {
+            "hits": self.index["hits"],
+            "misses": self.index["misses"],
+            "hit_rate": self.index["hits"] / lookups if lookups else 0.0,
+            "entries": len(self.index["entries"]),
+            "pending": len(self.index["pending"]),
+            "bytes": self.total_bytes(),
+        }
+
+    def save(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.index, handle)
+        os.replace(temp_path, self.index_path)
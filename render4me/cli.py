@@ -0,0 +1,440 @@
+import argparse
+import os
+import sys
+import time
+
+from .core import PlanningError, load_spec, plan_render
+from .jobs import format_jobs, read_jobs_file
+
+# --- Linha de Comando: python -m render4me ---
+# Os módulos do agendador só são importados quando algo vai ser renderizado,
+# para que "plan" continue iniciando rápido.
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="render4me", description="Planeja e executa renders do Blender em linha de comando.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan = subparsers.add_parser("plan", help="Mostra os comandos de render gerados pela especificação")
+    plan.add_argument("spec", help="Especificação de jobs em JSON ou TOML")
+    plan.add_argument("--json", action="store_true", help="Imprime os comandos como uma lista JSON")
+
+    render = subparsers.add_parser("render", help="Renderiza a especificação com processos do Blender em paralelo")
+    render.add_argument("spec", help="Especificação de jobs em JSON ou TOML")
+    render.add_argument("-j", "--workers", type=int, default=2, help="Processos do Blender simultâneos (padrão: 2)")
+    render.add_argument("--frames-per-chunk", type=int, default=10, help="Frames por pedaço da fila (padrão: 10)")
+    render.add_argument("--metrics", help="Arquivo JSON Lines onde as métricas de cada frame são gravadas")
+    add_cpu_arguments(render)
+    add_memory_arguments(render)
+    add_video_arguments(render)
+    add_tile_arguments(render)
+    add_staging_arguments(render)
+    add_history_arguments(render)
+    add_retry_arguments(render)
+    add_verify_arguments(render)
+
+    run = subparsers.add_parser("run", help="Executa jobs já gerados pelo addon (arquivo JSON de jobs ou comandos separados por linha em branco)")
+    run.add_argument("commands_file", help="Arquivo de jobs (JSON) ou de texto com os comandos gerados")
+    run.add_argument("-j", "--workers", type=int, default=1, help="Processos do Blender simultâneos (padrão: 1)")
+    run.add_argument("--frames-per-chunk", type=int, default=0, help="Frames por pedaço; 0 mantém cada comando inteiro (padrão: 0)")
+    run.add_argument("--metrics", help="Arquivo JSON Lines onde as métricas de cada frame são gravadas")
+    run.add_argument("--pause", action="store_true", help="Espera Enter no final (usado no terminal aberto pelo addon)")
+    add_cpu_arguments(run)
+    add_memory_arguments(run)
+    add_video_arguments(run)
+    add_tile_arguments(run)
+    add_staging_arguments(run)
+    add_history_arguments(run)
+    add_retry_arguments(run)
+    add_verify_arguments(run)
+
+    inspect = subparsers.add_parser("inspect", help="Lista cenas, câmeras, ranges de frames e marcadores de um .blend sem abrir o Blender")
+    inspect.add_argument("blend", help="Arquivo .blend (com ou sem compressão)")
+    inspect.add_argument("--json", action="store_true", help="Imprime o resultado em formato JSON")
+
+    autotune = subparsers.add_parser("autotune", help="Mede a vazão com vários níveis de concorrência e indica o melhor")
+    autotune.add_argument("spec", help="Especificação de jobs em JSON ou TOML")
+    autotune.add_argument("--levels", help="Níveis de concorrência separados por vírgula (padrão: 1,2,4,... até o número de núcleos)")
+    autotune.add_argument("--no-numa", action="store_true", help="Ignora a topologia NUMA ao dividir os núcleos")
+
+    benchmark = subparsers.add_parser("benchmark", help="Renderiza uma amostra dos frames de cada job e prevê a duração total, com intervalo de confiança")
+    benchmark.add_argument("spec", help="Especificação de jobs em JSON ou TOML")
+    benchmark.add_argument("--samples", type=int, default=5, help="Frames amostrados por job, incluindo o primeiro e o último (padrão: 5)")
+    benchmark.add_argument("--engines", help="Engines a comparar na mesma amostra, separadas por vírgula (ex.: CYCLES,EEVEE,WORKBENCH)")
+    benchmark.add_argument("--threads", help="Quantidades de threads (\"-t\") a comparar, separadas por vírgula (ex.: 4,8,16)")
+    benchmark.add_argument("--report", help="Arquivo JSON do relatório (padrão: ~/.render4me/benchmarks/benchmark_<data>.json)")
+
+    batch = subparsers.add_parser("batch", help="Renderiza um manifesto com vários .blend numa única fila, com partilha justa por prioridade")
+    batch.add_argument("manifest", help="Manifesto do lote em JSON ou TOML")
+    batch.add_argument("-j", "--workers", type=int, default=2, help="Processos do Blender simultâneos (padrão: 2)")
+    batch.add_argument("--frames-per-chunk", type=int, default=10, help="Frames por pedaço da fila (padrão: 10)")
+    batch.add_argument("--metrics", help="Arquivo JSON Lines onde as métricas de cada frame são gravadas")
+    batch.add_argument("--plan", action="store_true", help="Só mostra os comandos e a ordem da fila, sem renderizar")
+    batch.add_argument("--pause", action="store_true", help="Espera Enter no final (usado no terminal aberto pelo addon)")
+    add_cpu_arguments(batch)
+    add_memory_arguments(batch)
+    add_staging_arguments(batch)
+    add_history_arguments(batch)
+    add_retry_arguments(batch)
+    add_verify_arguments(batch)
+    # Vídeo em pedaços e tiles dependem de um passo final por arquivo, fora do lote
+    batch.set_defaults(split_video=False, tiles=None)
+
+    coordinator = subparsers.add_parser("coordinator", help="Inicia o coordenador que distribui pedaços de render para agentes em outras máquinas")
+    coordinator.add_argument("--host", default="127.0.0.1", help="Endereço onde ouvir (padrão: 127.0.0.1; para aceitar outras máquinas, ex.: 0.0.0.0, --token é obrigatório)")
+    coordinator.add_argument("--port", type=int, default=8765, help="Porta HTTP (padrão: 8765)")
+    coordinator.add_argument("--heartbeat-timeout", type=float, default=30.0, help="Segundos sem heartbeat até um agente ser considerado morto (padrão: 30)")
+    add_retry_arguments(coordinator)
+    add_farm_token_argument(coordinator)
+
+    agent = subparsers.add_parser("agent", help="Pede pedaços ao coordenador e os renderiza com o Blender desta máquina")
+    agent.add_argument("url", help="Endereço do coordenador (ex.: http://192.168.0.10:8765)")
+    agent.add_argument("--name", default="", help="Nome do agente, usado nos jobs fixados (padrão: <máquina>-<pid>)")
+    agent.add_argument("--blender", default="blender", help="Executável do Blender nesta máquina (padrão: blender)")
+    agent.add_argument("--heartbeat", type=float, default=5.0, help="Intervalo entre heartbeats em segundos (padrão: 5)")
+    add_farm_token_argument(agent)
+
+    submit = subparsers.add_parser("submit", help="Envia jobs já gerados pelo addon ao coordenador")
+    submit.add_argument("commands_file", help="Arquivo de jobs (JSON) ou de texto com os comandos gerados")
+    submit.add_argument("url", help="Endereço do coordenador")
+    submit.add_argument("--frames-per-chunk", type=int, default=10, help="Frames por pedaço entregue a cada agente (padrão: 10)")
+    submit.add_argument("--worker", default="", help="Fixa o job num agente pelo nome (padrão: qualquer agente)")
+    submit.add_argument("--name", default="", help="Nome do job no coordenador")
+    submit.add_argument("--wait", action="store_true", help="Acompanha o job até o fim")
+    add_farm_token_argument(submit)
+
+    status = subparsers.add_parser("status", help="Mostra os jobs e os agentes de um coordenador")
+    status.add_argument("url", help="Endereço do coordenador")
+    status.add_argument("--json", action="store_true", help="Imprime o estado em formato JSON")
+    add_farm_token_argument(status)
+    return parser
+
+def add_cpu_arguments(parser):
+    parser.add_argument("--no-thread-split", action="store_true", help="Não passa \"-t\" para dividir os núcleos entre os processos")
+    parser.add_argument("--pin", action="store_true", help="Fixa cada processo em um conjunto exclusivo de núcleos (Linux)")
+    parser.add_argument("--no-numa", action="store_true", help="Ignora a topologia NUMA ao dividir os núcleos")
+
+def add_memory_arguments(parser):
+    parser.add_argument("--memory-admission", action="store_true", help="Só inicia um processo quando o pico de memória previsto cabe na RAM livre")
+    parser.add_argument("--memory-headroom-gb", type=float, default=4.0, help="Folga de memória mantida livre, em GB (padrão: 4)")
+    parser.add_argument("--default-job-memory-gb", type=float, default=8.0, help="Pico previsto para jobs sem histórico, em GB (padrão: 8)")
+    parser.add_argument("--on-pressure", choices=("pause", "requeue"), default="pause", help="Com pouca memória: pausa ou devolve à fila o job mais novo (padrão: pause)")
+
+def add_video_arguments(parser):
+    parser.add_argument("--split-video", action="store_true", help="Divide vídeos em pedaços paralelos e une o resultado com o ffmpeg no final")
+    parser.add_argument("--video-mode", choices=("segments", "images"), default="segments", help="segments: vídeos curtos unidos sem recodificar; images: sequência PNG codificada uma vez (padrão: segments)")
+    parser.add_argument("--ffmpeg", default="", help="Caminho do ffmpeg (padrão: RENDER4ME_FFMPEG ou o ffmpeg do PATH)")
+
+def add_tile_arguments(parser):
+    parser.add_argument("--tiles", help="Divide stills de frame único numa grade de regiões (ex.: 4x4) renderizadas em paralelo e montadas no final")
+    parser.add_argument("--tile-overlap", type=int, default=8, help="Pixels de sobreposição entre tiles vizinhos, usados para conferir as emendas (padrão: 8)")
+
+def add_staging_arguments(parser):
+    parser.add_argument("--stage-dir", nargs="?", const="", default=None, help="Grava os frames numa pasta local (padrão: pasta temporária) e os transfere para a saída final em segundo plano")
+    parser.add_argument("--mover-threads", type=int, default=4, help="Threads que transferem os arquivos da pasta local (padrão: 4)")
+    parser.add_argument("--stage-assets", nargs="?", const="", default=None, help="Copia o .blend e as dependências uma vez para um cache local por conteúdo (padrão: ~/.render4me/assets) e renderiza a partir dele")
+
+def add_history_arguments(parser):
+    parser.add_argument("--no-history", action="store_true", help="Não grava nem usa o histórico de tempos de render (~/.render4me/history.sqlite)")
+    parser.add_argument("--balance-chunks", action="store_true", help="Divide os jobs longos pelo tempo previsto no histórico para todos os processos terminarem juntos")
+
+def add_retry_arguments(parser):
+    parser.add_argument("--max-retries", type=int, default=3, help="Tentativas de um frame que falha sozinho antes da quarentena; 0 desativa as novas tentativas (padrão: 3)")
+    parser.add_argument("--retry-backoff", type=float, default=2.0, help="Espera antes da primeira nova tentativa, dobrada a cada tentativa, em segundos (padrão: 2)")
+
+def add_verify_arguments(parser):
+    parser.add_argument("--verify-frames", action="store_true", help="Confere cada frame assim que é salvo (arquivo truncado, corrompido ou com tamanho errado) e o renderiza de novo")
+    parser.add_argument("--verify-processes", type=int, default=0, help="Processos que conferem os frames (padrão: núcleos da CPU, até 8)")
+
+def add_farm_token_argument(parser):
+    parser.add_argument("--token", default=os.environ.get("RENDER4ME_FARM_TOKEN", ""), help="Senha compartilhada entre coordenador e agentes (padrão: $RENDER4ME_FARM_TOKEN)")
+
+def run_render(spec, jobs, args, batch_files=None):
+    from .affinity import plan_cpu_layout
+    from .metrics import BatchMetrics
+    from .retry import RetryPolicy, format_quarantine_report
+    from .scheduler import ParallelRenderScheduler, build_render_chunks
+
+    assemblies, stitches = [], []
+    if args.split_video:
+        from .video import plan_video_chunks
+
+        chunks, assemblies = plan_video_chunks(jobs, args.frames_per_chunk, args.video_mode.upper())
+    elif args.tiles:
+        from .tiling import parse_tile_grid, plan_tile_chunks
+
+        try:
+            columns, rows = parse_tile_grid(args.tiles)
+        except ValueError as e:
+            print(f"render4me: {e}", file=sys.stderr)
+            return 2
+        chunks, stitches = plan_tile_chunks(jobs, columns, rows, args.tile_overlap)
+    elif batch_files is not None:
+        from .batch import build_batch_chunks
+
+        chunks = build_batch_chunks(batch_files, args.frames_per_chunk)
+    else:
+        chunks = build_render_chunks(jobs, args.frames_per_chunk)
+    if args.stage_assets is not None:
+        from .assets import AssetCache, format_asset_report, stage_blend_assets
+
+        asset_cache = AssetCache(args.stage_assets or None)
+        try:
+            chunks = stage_blend_assets(chunks, asset_cache)
+        except OSError as e:
+            print(f"render4me: não foi possível copiar os arquivos para o cache local: {e}", file=sys.stderr)
+            return 2
+        for line in format_asset_report(asset_cache, chunks):
+            print(line)
+    history = None
+    if not args.no_history:
+        from .history import RenderHistory, balance_chunks, format_batch_prediction, order_longest_first, predict_batch_seconds
+
+        history = RenderHistory()
+        if args.balance_chunks:
+            chunks = balance_chunks(chunks, history, args.workers)
+        if batch_files is not None:
+            from .batch import fair_share_order
+
+            chunks = fair_share_order(chunks, history)
+        else:
+            chunks = order_longest_first(chunks, history)
+        print(format_batch_prediction(*predict_batch_seconds(chunks, history, args.workers)))
+    echo = args.command == "run"
+    mover = None
+    if args.stage_dir is not None:
+        from .staging import OutputMover, default_staging_dir, stage_chunks
+
+        chunks = stage_chunks(chunks, args.stage_dir or default_staging_dir())
+        mover = OutputMover(args.mover_threads)
+    threads, slots = plan_cpu_layout(args.workers, not args.no_thread_split, args.pin, not args.no_numa)
+    governor = None
+    if args.memory_admission:
+        from .memory import GB, MemoryGovernor
+
+        governor = MemoryGovernor(int(args.memory_headroom_gb * GB), int(args.default_job_memory_gb * GB), args.on_pressure.upper())
+    retry_policy = RetryPolicy(args.max_retries, args.retry_backoff) if args.max_retries > 0 else None
+    verifier = None
+    if args.verify_frames:
+        from .integrity import FrameVerifier
+
+        verifier = FrameVerifier(args.verify_processes)
+    scheduler = ParallelRenderScheduler(chunks, args.workers, metrics=BatchMetrics(args.metrics), echo=echo, threads_per_process=threads, cpu_slots=slots, memory_governor=governor, output_mover=mover, history=history, retry_policy=retry_policy, frame_verifier=verifier)
+    summary = scheduler.run()
+    if verifier is not None:
+        from .integrity import format_verify_report
+
+        print(format_verify_report(verifier.stats))
+    if mover is not None:
+        from .staging import format_staging_report
+
+        for line in format_staging_report(mover.stats, scheduler.metrics.snapshots()):
+            print(line)
+    # No lote, cada arquivo pode usar outro cache
+    cache_dirs = {}
+    for cached_spec in [spec] if spec is not None else [batch_file["spec"] for batch_file in batch_files or []]:
+        if cached_spec["use_render_cache"]:
+            cache_dirs.setdefault(cached_spec["render_cache_dir"], cached_spec["render_cache_size_gb"])
+    if cache_dirs:
+        from .cache import RenderCache
+        from .paths import render4me_data_dir
+
+        for cache_dir, cache_size_gb in cache_dirs.items():
+            cache = RenderCache(cache_dir or os.path.join(render4me_data_dir(), "cache"), int(cache_size_gb * 1024 ** 3))
+            print(f"{cache.store_pending()} frame(s) guardado(s) no cache.")
+            cache.save()
+    print(
+        f"{summary['chunks']} pedaço(s) em {summary['wall_time']:.1f}s "
+        f"(sequencial: {summary['serial_time']:.1f}s, speedup {summary['speedup']:.2f}x, falhas: {summary['failed']}, novas tentativas: {summary['retries']})"
+    )
+    for line in format_quarantine_report(summary["quarantined"]):
+        print(line)
+    if assemblies:
+        from .video import VideoAssemblyError, assemble_videos, format_video_report
+
+        try:
+            outputs, assembly_seconds = assemble_videos(assemblies, scheduler.results, args.ffmpeg)
+        except VideoAssemblyError as e:
+            print(f"render4me: {e}", file=sys.stderr)
+            return 1
+        print(format_video_report(summary, assembly_seconds, len(outputs)))
+    if stitches:
+        from .tiling import TileStitchError, format_tile_report, single_process_seconds, stitch_stills
+
+        try:
+            reports, stitch_seconds = stitch_stills(stitches, scheduler.results)
+        except (TileStitchError, OSError) as e:
+            print(f"render4me: {e}", file=sys.stderr)
+            return 1
+        print(format_tile_report(summary, stitch_seconds, len(reports), *single_process_seconds(stitches, summary, history)))
+    return 1 if summary["failed"] else 0
+
+def run_autotune(jobs, args):
+    from .affinity import autotune_concurrency
+    from .scheduler import parse_render_command
+
+    if not jobs:
+        print("render4me: nenhum comando para medir.", file=sys.stderr)
+        return 2
+    job = parse_render_command(jobs[0])
+    sample_frame = job["start"] if job["start"] is not None else (job.get("frames") or [1])[0]
+    levels = [int(level) for level in args.levels.split(",")] if args.levels else None
+    result = autotune_concurrency(job["argv"], sample_frame, levels, not args.no_numa)
+    print(f"Melhor concorrência: {result['best']} processo(s)")
+    return 0
+
+def run_sample_benchmark(jobs, args):
+    from .benchmark import format_benchmark_report, run_benchmark, write_benchmark_report
+
+    if not jobs:
+        print("render4me: nenhum comando para amostrar.", file=sys.stderr)
+        return 2
+    engines = [engine.strip().upper() for engine in args.engines.split(",")] if args.engines else None
+    threads = [int(value) for value in args.threads.split(",")] if args.threads else None
+    report = run_benchmark(jobs, max(1, args.samples), engines, threads)
+    for line in format_benchmark_report(report):
+        print(line)
+    print(f"Relatório gravado em {write_benchmark_report(report, args.report)}")
+    return 0 if all(variant["batch"]["complete"] for variant in report["variants"]) else 1
+
+def run_commands_file(args):
+    try:
+        returncode = run_render(None, read_jobs_file(args.commands_file), args)
+    except (OSError, ValueError) as e:
+        print(f"render4me: {e}", file=sys.stderr)
+        returncode = 2
+    if args.pause:
+        input("\nRenderização concluída. Pressione Enter para fechar.")
+    return returncode
+
+def run_batch(args):
+    from .batch import build_batch_chunks, format_batch_plan, load_batch_manifest, plan_batch
+    from .scheduler import chunk_label
+
+    try:
+        batch = plan_batch(load_batch_manifest(args.manifest))
+    except (OSError, ValueError, PlanningError) as e:
+        print(f"render4me: {e}", file=sys.stderr)
+        returncode = 2
+    else:
+        for message in batch["messages"]:
+            print(message, file=sys.stderr)
+        if not batch["files"]:
+            print("render4me: nenhum arquivo do lote para renderizar.", file=sys.stderr)
+            returncode = 2
+        elif args.plan:
+            chunks = build_batch_chunks(batch["files"], args.frames_per_chunk)
+            for line in format_batch_plan(batch["files"], chunks):
+                print(line)
+            print("Ordem da fila: " + ", ".join(f"{chunk_label(chunk)} {chunk['start']}-{chunk['end']}" for chunk in chunks))
+            returncode = 0
+        else:
+            returncode = run_render(None, [], args, batch["files"])
+    if args.pause:
+        input("\nRenderização concluída. Pressione Enter para fechar.")
+    return returncode
+
+def run_farm(args):
+    from .farm import FarmAgent, FarmError, farm_status, format_farm_status, serve_coordinator, submit_to_farm, wait_for_farm_job
+    from .retry import RetryPolicy
+
+    if args.command == "coordinator":
+        try:
+            server, _ = serve_coordinator(args.host, args.port, args.heartbeat_timeout, args.token, RetryPolicy(args.max_retries, args.retry_backoff) if args.max_retries > 0 else None)
+        except OSError as e:
+            print(f"render4me: não foi possível abrir {args.host}:{args.port}: {e}", file=sys.stderr)
+            return 2
+        except FarmError as e:
+            print(f"render4me: {e}", file=sys.stderr)
+            return 2
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+    if args.command == "agent":
+        try:
+            FarmAgent(args.url, args.name, args.blender, args.token, args.heartbeat).run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    try:
+        if args.command == "submit":
+            result = submit_to_farm(args.url, read_jobs_file(args.commands_file), args.frames_per_chunk, args.worker, args.name, args.token)
+            print(f"Job {result['job']} enviado: {result['chunks']} pedaço(s).")
+            if not args.wait:
+                return 0
+            job = wait_for_farm_job(args.url, result["job"], args.token)
+            return 1 if job["failed"] else 0
+        status = farm_status(args.url, token=args.token)
+    except (OSError, ValueError, FarmError) as e:
+        print(f"render4me: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        import json
+
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    else:
+        for line in format_farm_status(status) or ["Nenhum job ou agente no coordenador."]:
+            print(line)
+    return 0
+
+def run_inspect(args):
+    from .blendfile import BlendFileError, read_blend_info
+
+    try:
+        info = read_blend_info(args.blend)
+    except (OSError, BlendFileError) as e:
+        print(f"render4me: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        import json
+
+        print(json.dumps(info, indent=2, ensure_ascii=False))
+        return 0
+    print(f"Blender {info['version']}")
+    for scene in info["scenes"]:
+        print(f"Cena {scene['name']}: frames {scene['start_frame']}-{scene['end_frame']}, câmera {scene['camera'] or '-'}")
+        for marker in scene["markers"]:
+            print(f"  Marcador {marker['name']} no frame {marker['frame']}" + (f" (câmera {marker['camera']})" if marker["camera"] else ""))
+    print(f"Câmeras: {', '.join(info['cameras']) or '-'}")
+    for dependency in info["dependencies"]:
+        print(f"Dependência ({dependency['kind']}{', sequência' if dependency['sequence'] else ''}): {dependency['path']}")
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run_commands_file(args)
+    if args.command == "inspect":
+        return run_inspect(args)
+    if args.command == "batch":
+        return run_batch(args)
+    if args.command in ("coordinator", "agent", "submit", "status"):
+        return run_farm(args)
+    try:
+        spec = load_spec(args.spec)
+        plan = plan_render(spec)
+    except (OSError, ValueError, PlanningError) as e:
+        print(f"render4me: {e}", file=sys.stderr)
+        return 2
+    for message in plan["messages"]:
+        print(message, file=sys.stderr)
+
+    if args.command == "autotune":
+        return run_autotune(plan["jobs"], args)
+    if args.command == "benchmark":
+        try:
+            return run_sample_benchmark(plan["jobs"], args)
+        except (OSError, ValueError) as e:
+            print(f"render4me: {e}", file=sys.stderr)
+            return 2
+    if args.command == "plan":
+        if args.json:
+            import json
+
+            print(json.dumps({"jobs": [job.to_dict() for job in plan["jobs"]]}, indent=2, ensure_ascii=False))
+        else:
+            print(format_jobs(plan["jobs"]))
+        return 0
+    return run_render(spec, plan["jobs"], args)
@@ -0,0 +1,346 @@
+import json
+import os
+
+from .frames import IMAGE_FORMATS, format_frame_args, frames_to_ranges, resolve_output_dir, scan_output_dir, select_frames_to_render
+from .jobs import RenderJob
+
+# --- Núcleo de Planejamento dos Jobs (não importa o bpy) ---
+# A especificação usa os mesmos nomes das propriedades de BlenderRenderProperties,
+# então o addon e a linha de comando montam exatamente os mesmos comandos.
+# Cache e worker persistente só são importados quando ativados, para a CLI iniciar rápido.
+SPEC_DEFAULTS = {
+    "blender_executable_path": "",
+    "blend_file_path": "",
+    "custom_output_path": "",
+    "output_format": "PNG",
+    "frame_number": 1,
+    "use_scene_system": False,
+    "use_camera_system": False,
+    "output_file_name": "render",
+    "start_frame_global": 1,
+    "end_frame_global": 250,
+    "video_codec": "",
+    "fps": 0,
+    "scenes": [],
+    "cameras": [],
+    "use_custom_render_engine": False,
+    "render_engine": "CYCLES",
+    "resume_missing_frames": False,
+    "use_render_cache": False,
+    "render_cache_dir": "",
+    "render_cache_size_gb": 20.0,
+    "use_persistent_worker": False,
+    "group_cameras_by_markers": False,
+    "performance_profile": "",
+    "performance_profiles": {},
+    "detect_static_frames": False,
+}
+
+class PlanningError(Exception):
+    # Erro de validação da especificação; a mensagem é mostrada ao usuário
+    pass
+
+def load_spec(path):
+    # Lê uma especificação de jobs em JSON ou TOML (a extensão define o formato)
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise PlanningError("Arquivos TOML exigem Python 3.11 ou mais recente. Use JSON.")
+        with open(path, "rb") as handle:
+            data = tomllib.load(handle)
+    else:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    unknown = sorted(set(data) - set(SPEC_DEFAULTS))
+    if unknown:
+        raise PlanningError(f"Campo(s) desconhecido(s) na especificação: {', '.join(unknown)}")
+    spec = dict(SPEC_DEFAULTS)
+    spec.update(data)
+    load_shot_lists(spec, os.path.dirname(os.path.abspath(path)))
+    return spec
+
+def load_shot_lists(spec, base_dir):
+    # "cameras": "planos.csv" lê uma lista de planos (CSV ou JSON), relativa à pasta da especificação
+    for key in ("scenes", "cameras"):
+        if isinstance(spec.get(key), str):
+            from .shotlist import ShotListError, read_shot_list
+
+            try:
+                spec[key] = read_shot_list(os.path.join(base_dir, spec[key]))
+            except ShotListError as e:
+                raise PlanningError(str(e))
+
+def output_dir_prefix(path):
+    # Prefixo do "-o": a pasta normalizada com separador no fim, ou "//" (pasta do .blend)
+    if not path:
+        return "//"
+    normalized_path = os.path.normpath(path)
+    return normalized_path if normalized_path.endswith(os.sep) else normalized_path + os.sep
+
+def check_names_in_blend(blend_file_path, kind, names, messages):
+    # Nomes digitados errado falhariam só depois de abrir o .blend em cada processo de render
+    if not os.path.isfile(blend_file_path):
+        return None
+    from .blendfile import BlendFileError, read_blend_info
+
+    try:
+        info = read_blend_info(blend_file_path)
+    except (OSError, BlendFileError) as e:
+        messages.append(f"Não foi possível conferir os nomes no .blend: {e}")
+        return None
+    available = [scene["name"] for scene in info["scenes"]] if kind == "scene" else info["cameras"]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        label = "Cena(s)" if kind == "scene" else "Câmera(s)"
+        raise PlanningError(f"{label} não encontrada(s) em {os.path.basename(blend_file_path)}: {', '.join(unknown)}. Disponíveis: {', '.join(available) or 'nenhuma'}.")
+    return info
+
+def job_frame_size(blend_info, kind, name, profile):
+    # Tamanho esperado dos frames: resolução da cena × porcentagem (a do perfil, se houver); o Blender trunca
+    if blend_info is None:
+        return None
+    scenes = [scene for scene in blend_info["scenes"] if scene["name"] == name] if kind == "scene" else blend_info["scenes"]
+    sizes = set()
+    for scene in scenes:
+        if scene.get("crop_to_border"):
+            return None
+        width, height, percentage = scene["resolution"]
+        percentage = profile["resolution_percentage"] if profile and profile["resolution_percentage"] else percentage
+        sizes.add((width * percentage // 100, height * percentage // 100))
+    # Câmeras usam a cena ativa, que o .blend não informa: só há tamanho esperado se todas as cenas coincidem
+    return list(sizes.pop()) if len(sizes) == 1 else None
+
+def plan_render(spec):
+    # Valida a especificação e devolve os comandos de render e as mensagens informativas
+    spec = dict(SPEC_DEFAULTS, **spec)
+    blender_path = spec["blender_executable_path"]
+    blend_file_path = spec["blend_file_path"]
+    output_format = spec["output_format"]
+    custom_output_path = spec["custom_output_path"]
+    output_file_name = spec["output_file_name"]
+    video_codec = spec["video_codec"]
+    fps = spec["fps"]
+    render_engine = spec["render_engine"]
+    use_custom_render_engine = spec["use_custom_render_engine"]
+    messages = []
+
+    if not blender_path:
+        raise PlanningError("Por favor, defina o Caminho do Executável do Blender.")
+    if not blend_file_path:
+        raise PlanningError("Por favor, defina o Caminho do Arquivo .blend.")
+
+    # Cada processo vira um RenderJob com a lista de argumentos; o texto é gerado só para exibição
+    render_jobs = []
+    engine_args = ["-E", render_engine] if use_custom_render_engine else []
+    engine_key = render_engine if use_custom_render_engine else "DEFAULT"
+    profile_suffix = ""
+
+    # Perfil de desempenho: um script "--python" logo depois da cena/câmera, antes do render
+    profile = None
+    profile_args = []
+    if spec["performance_profile"]:
+        from .profiles import profile_key, resolve_profile, write_profile_script
+
+        try:
+            profile = resolve_profile(spec["performance_profile"], spec["performance_profiles"])
+            profile_script = write_profile_script(profile)
+        except ValueError as e:
+            raise PlanningError(str(e))
+        except OSError as e:
+            raise PlanningError(f"Não foi possível gravar o script do perfil de desempenho: {e}")
+        profile_args = ["--python", profile_script]
+        # Frames de perfis diferentes não são equivalentes no cache
+        profile_suffix = f"+{profile_key(['--python', profile_script])}"
+        engine_key += profile_suffix
+    # Jobs de câmeras/cenas para o worker persistente (um único processo carrega o .blend)
+    worker_jobs = []
+    output_prefix = output_dir_prefix(custom_output_path)
+
+    # Retomada: lista a pasta de saída uma única vez para todos os jobs
+    skipped_jobs = 0
+    output_dir = resolve_output_dir(custom_output_path, blend_file_path)
+    listing = scan_output_dir(output_dir) if spec["resume_missing_frames"] and output_format in IMAGE_FORMATS else None
+    listings = {output_dir: listing}
+
+    # Cache de renders: frames já renderizados com o mesmo conteúdo do .blend são reaproveitados
+    cache = None
+    cache_key_base = ()
+    if spec["use_render_cache"] and output_format in IMAGE_FORMATS:
+        from .cache import RenderCache, blend_content_hash
+        from .paths import render4me_data_dir
+
+        try:
+            cache = RenderCache(spec["render_cache_dir"] or os.path.join(render4me_data_dir(), "cache"), int(spec["render_cache_size_gb"] * 1024 ** 3))
+            cache_key_base = (blend_content_hash(blend_file_path), engine_key, output_format)
+        except OSError as e:
+            raise PlanningError(f"Não foi possível abrir o cache de renders: {e}")
+
+    video_args = []
+    if video_codec:
+        video_args += ["-vcodec", video_codec]
+    if fps:
+        video_args += ["-fps", str(fps)]
+
+    if spec["use_camera_system"] or spec["use_scene_system"]:
+        if spec["use_camera_system"]:
+            kind, label, flag, items = "camera", "câmera", "-c", spec["cameras"]
+            if not items:
+                raise PlanningError("Por favor, adicione pelo menos uma câmera para renderizar ao usar o Sistema de Múltiplas Câmeras.")
+        else:
+            kind, label, flag, items = "scene", "cena", "-S", spec["scenes"]
+            if not items:
+                raise PlanningError("Por favor, adicione pelo menos uma cena para renderizar ao usar o Sistema de Cenas.")
+        # A lista inteira é conferida de uma vez: todos os itens com problema aparecem na mesma mensagem
+        from .shotlist import format_shot_errors, validate_shots
+
+        errors = validate_shots(items, label)
+        if errors:
+            raise PlanningError(format_shot_errors(errors, f"na lista de {label}s"))
+        blend_info = check_names_in_blend(blend_file_path, kind, [item["name"] for item in items], messages)
+        if output_format not in IMAGE_FORMATS and not output_file_name:
+            raise PlanningError("Nome do Arquivo de Saída é obrigatório para renderização de vídeo (configuração global).")
+
+        # Otimização do plano: nomes repetidos viram um só processo e câmeras trocadas por marcadores dividem a cena
+        from .planner import format_plan_summary, group_cameras_by_markers, merge_items
+
+        jobs, duplicate_frames = merge_items(items, merge_ranges=output_format in IMAGE_FORMATS)
+        planned = [(kind, flag, job["name"], job["ranges"], job["render_engine"], job["output_path"]) for job in jobs]
+        if spec["group_cameras_by_markers"] and kind == "camera" and output_format in IMAGE_FORMATS and blend_info is not None:
+            jobs, marker_groups = group_cameras_by_markers(jobs, blend_info)
+            planned = [(kind, flag, job["name"], job["ranges"], job["render_engine"], job["output_path"]) for job in jobs]
+            for group in marker_groups:
+                planned.append(("scene", "-S", group["scene"], group["ranges"], "", ""))
+                messages.append(f"Câmeras {', '.join(group['cameras'])}: um único processo da cena {group['scene']} (troca pelos marcadores), saída render_{group['scene']}_####.")
+
+        # Quadros parados: um processo do Blender compara o estado da cena frame a frame antes do render
+        held = None
+        held_frames = 0
+        if spec["detect_static_frames"] and output_format in IMAGE_FORMATS:
+            from .holds import HoldAnalysisError, analyze_held_frames, collapse_held_frames, format_hold_summary, write_hold_script
+
+            analysis_jobs = [{"kind": job_kind, "name": name, "frames": [frame for start, end in ranges for frame in range(start, end + 1)]} for job_kind, _, name, ranges, _, _ in planned]
+            try:
+                held = analyze_held_frames(blender_path, blend_file_path, analysis_jobs)
+            except HoldAnalysisError as e:
+                messages.append(f"Detecção de quadros parados indisponível, todos os frames serão renderizados: {e}")
+            else:
+                for name, analysis in held.items():
+                    if analysis["reason"]:
+                        messages.append(f"{name}: quadros parados não verificados ({analysis['reason']}).")
+
+        for job_kind, job_flag, name, ranges, job_engine, job_output_path in planned:
+            command_base = [blender_path, "-b", blend_file_path, job_flag, name] + profile_args
+            links = {}
+            # Motor e pasta de saída próprios do item (lista de planos) substituem os gerais
+            job_engine_args = ["-E", job_engine] if job_engine else engine_args
+            job_prefix = output_dir_prefix(job_output_path) if job_output_path else output_prefix
+            resolution = job_frame_size(blend_info, job_kind, name, profile)
+
+            if output_format in IMAGE_FORMATS:
+                output = f"{job_prefix}render_{name}_####"
+                all_frames = [frame for start, end in ranges for frame in range(start, end + 1)]
+                frame_args = ["-s", str(ranges[0][0]), "-e", str(ranges[0][1]), "-a"] if len(ranges) == 1 else format_frame_args(all_frames)
+                job_ranges = ranges
+                frames = all_frames
+                if listing is not None or cache:
+                    job_output_dir = resolve_output_dir(job_output_path, blend_file_path) if job_output_path else output_dir
+                    if listing is not None and job_output_dir not in listings:
+                        listings[job_output_dir] = scan_output_dir(job_output_dir)
+                    job_key_base = (cache_key_base[0], job_engine + profile_suffix, output_format) if cache and job_engine else cache_key_base
+                    frames = []
+                    for start, end in ranges:
+                        frames.extend(select_frames_to_render(listings.get(job_output_dir), job_output_dir, f"render_{name}_", start, end, output_format, cache, job_key_base + (name,)))
+                    if not frames:
+                        skipped_jobs += 1
+                        continue
+                if held is not None and held.get(name, {}).get("groups"):
+                    requested = len(frames)
+                    frames, links = collapse_held_frames(frames, held[name]["groups"])
+                    if links:
+                        # O script registra um handler que liga cada frame renderizado às suas repetições
+                        command_base += ["--python", write_hold_script(links)]
+                        held_frames += requested - len(frames)
+                        messages.append(format_hold_summary(name, links, requested))
+                if len(frames) != len(all_frames):
+                    frame_args = format_frame_args(frames)
+                    job_ranges = frames_to_ranges(frames)
+                render_jobs.append(RenderJob(command_base + ["-o", output, "-F", output_format] + frame_args + job_engine_args, name, job_kind, frames, output, output_format, resolution=resolution))
+            else:
+                # Cada range de vídeo gera um arquivo próprio, então continua sendo um processo por range
+                output = f"{job_prefix}{output_file_name}_{name}"
+                job_ranges = ranges
+                for start, end in ranges:
+                    render_jobs.append(RenderJob(command_base + ["-o", output, "-F", output_format, "-s", str(start), "-e", str(end), "-a"] + video_args + job_engine_args, name, job_kind, range(start, end + 1), output, output_format))
+
+            worker_jobs.append({
+                "kind": job_kind,
+                "name": name,
+                "ranges": job_ranges,
+                "output": output,
+                "render_engine": job_engine,
+                "holds": {str(frame): targets for frame, targets in links.items()},
+            })
+
+        if render_jobs:
+            launches = 1 if spec["use_persistent_worker"] else len(render_jobs)
+            messages.append(format_plan_summary(len(items), launches, duplicate_frames, blend_file_path))
+        if held is not None:
+            messages.append(f"Quadros parados: {held_frames} frame(s) ligado(s) ao frame renderizado em vez de renderizados.")
+
+    else:
+        command_base = [blender_path, "-b", blend_file_path] + profile_args
+
+        if output_format in IMAGE_FORMATS:
+            if spec["frame_number"] < 1:
+                raise PlanningError("Por favor, insira um Número de Frame válido (maior ou igual a 1) para a imagem.")
+            output = f"{output_prefix}render_####"
+            frame_args = ["-f", str(spec["frame_number"])]
+            frames = [spec["frame_number"]]
+            job_video_args = []
+            if (listing is not None or cache) and not select_frames_to_render(listing, output_dir, "render_", spec["frame_number"], spec["frame_number"], output_format, cache, cache_key_base + ("",)):
+                if cache:
+                    cache.save()
+                messages.append(f"O frame {spec['frame_number']} já foi renderizado ou estava no cache. Nada para renderizar.")
+                return {"jobs": [], "messages": messages}
+        else:
+            if not output_file_name:
+                raise PlanningError("Nome do Arquivo de Saída é obrigatório para renderização de vídeo.")
+            if spec["start_frame_global"] < 1:
+                raise PlanningError("Por favor, insira um Frame Inicial Global válido.")
+            if spec["end_frame_global"] < spec["start_frame_global"]:
+                raise PlanningError("Por favor, insira um Frame Final Global válido (deve ser >= Frame Inicial).")
+            output = f"{output_prefix}{output_file_name}"
+            frame_args = ["-s", str(spec["start_frame_global"]), "-e", str(spec["end_frame_global"]), "-a"]
+            frames = range(spec["start_frame_global"], spec["end_frame_global"] + 1)
+            job_video_args = video_args
+
+        resolution = None
+        if output_format in IMAGE_FORMATS and os.path.isfile(blend_file_path):
+            from .blendfile import BlendFileError, read_blend_info
+
+            try:
+                resolution = job_frame_size(read_blend_info(blend_file_path), "render", "", profile)
+            except (OSError, BlendFileError):
+                # Sem tamanho esperado, a verificação confere só a estrutura do arquivo
+                pass
+        render_jobs.append(RenderJob(command_base + ["-o", output, "-F", output_format] + frame_args + job_video_args + engine_args, "", "render", frames, output, output_format, resolution=resolution))
+
+    if spec["use_persistent_worker"] and (spec["use_camera_system"] or spec["use_scene_system"]) and worker_jobs:
+        from .worker import write_persistent_worker_script
+
+        try:
+            script_path = write_persistent_worker_script(blend_file_path, worker_jobs, output_format, render_engine if use_custom_render_engine else "", video_codec, fps, profile)
+        except OSError as e:
+            raise PlanningError(f"Não foi possível gravar o script do worker persistente: {e}")
+        render_jobs = [RenderJob([blender_path, "-b", "--python", script_path], kind="worker")]
+        messages.append(f"Worker persistente: {len(worker_jobs)} job(s) em um único processo (o .blend é carregado uma só vez).")
+
+    if cache:
+        cache.save()
+        messages.append(f"Cache de renders: {cache.session_hits} frame(s) reaproveitado(s), {cache.session_misses} a renderizar.")
+    if skipped_jobs and not render_jobs:
+        messages.append("Todos os frames já foram renderizados. Nada para retomar.")
+    elif skipped_jobs:
+        messages.append(f"{skipped_jobs} job(s) já completo(s) foram ignorados.")
+    return {"jobs": render_jobs, "messages": messages}
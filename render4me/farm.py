@@ -0,0 +1,443 @@
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .frames import IMAGE_FORMATS
+from .jobs import RenderJob
+from .metrics import FrameEventParser
+from .retry import chunk_frames, describe_exit, frames_chunk, plan_retry
+from .scheduler import build_render_chunks
+
+# --- Render Distribuído: Coordenador e Agentes por HTTP ---
+# O coordenador recebe os jobs gerados pelo addon (jobs.py), divide-os em pedaços (como o agendador local)
+# e os entrega aos agentes que pedem trabalho. Cada agente renderiza um pedaço por vez com o Blender da
+# própria máquina e manda um heartbeat com os frames já salvos. Um agente sem heartbeat por mais de
+# heartbeat_timeout segundos é considerado morto: os frames que ele não terminou voltam para a fila.
+# Jobs "fixados" só são entregues ao agente com aquele nome; os outros vão para qualquer agente.
+# O .blend, os scripts gerados e a pasta de saída precisam estar no mesmo caminho em todas as máquinas.
+DEFAULT_PORT = 8765
+DEFAULT_HEARTBEAT_SECONDS = 5.0
+DEFAULT_HEARTBEAT_TIMEOUT = 30.0
+TOKEN_HEADER = "X-Render4Me-Token"
+
+class FarmError(Exception):
+    pass
+
+def _is_loopback(host):
+    # Só o próprio computador alcança o coordenador: aí dá para dispensar o token
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+class FarmCoordinator:
+    def __init__(self, heartbeat_timeout=DEFAULT_HEARTBEAT_TIMEOUT, retry_policy=None, log=print):
+        self.heartbeat_timeout = heartbeat_timeout
+        # Sem política, um pedaço com erro não volta para a fila (como no agendador local)
+        self.retry_policy = retry_policy
+        self.log = log
+        self.jobs = {}
+        self.chunks = {}
+        self.workers = {}
+        # Pedaços na fila em ordem de chegada; os de um agente morto voltam para o começo
+        self.queue = []
+        self.next_job_id = 1
+        self.next_chunk_id = 1
+        self.next_lease = 1
+        self.lock = threading.Lock()
+
+    def submit(self, jobs, frames_per_chunk=10, worker="", name=""):
+        chunks = build_render_chunks(jobs, frames_per_chunk)
+        if not chunks:
+            raise ValueError("Nenhum comando de render para enviar.")
+        with self.lock:
+            job = {
+                "id": self.next_job_id,
+                "name": name or chunks[0]["name"] or "render",
+                "worker": worker,
+                "submitted": time.time(),
+                "quarantined": [],
+            }
+            self.next_job_id += 1
+            self.jobs[job["id"]] = job
+            for chunk in chunks:
+                self._enqueue(job["id"], chunk)
+        pinned = f" (fixado no agente {worker})" if worker else ""
+        self.log(f"Job {job['id']} {job['name']}: {len(chunks)} pedaço(s) na fila{pinned}.")
+        return {"job": job["id"], "chunks": len(chunks)}
+
+    def _enqueue(self, job_id, chunk, front=False):
+        entry = {"id": self.next_chunk_id, "job": job_id, "chunk": chunk, "state": "QUEUED", "worker": "", "lease": 0, "done_frames": [], "retry_at": chunk.get("retry_at", 0.0)}
+        self.next_chunk_id += 1
+        self.chunks[entry["id"]] = entry
+        if front:
+            self.queue.insert(0, entry["id"])
+        else:
+            self.queue.append(entry["id"])
+        return entry
+
+    def _touch(self, worker, host=""):
+        state = self.workers.setdefault(worker, {"name": worker, "host": host, "state": "ALIVE", "chunk": None, "last_seen": 0.0, "completed": 0})
+        if state["state"] == "DEAD":
+            self.log(f"Agente {worker} voltou a responder.")
+        state["state"] = "ALIVE"
+        state["last_seen"] = time.time()
+        if host:
+            state["host"] = host
+        return state
+
+    def lease(self, worker, host=""):
+        # Próximo pedaço que este agente pode pegar: sem agente fixado ou fixado nele
+        with self.lock:
+            state = self._touch(worker, host)
+            now = time.time()
+            for chunk_id in self.queue:
+                entry = self.chunks[chunk_id]
+                pinned = self.jobs[entry["job"]]["worker"]
+                if entry["retry_at"] > now or (pinned and pinned != worker):
+                    continue
+                self.queue.remove(chunk_id)
+                entry.update(state="RUNNING", worker=worker, lease=self.next_lease, done_frames=[], started=now)
+                self.next_lease += 1
+                state["chunk"] = chunk_id
+                chunk = entry["chunk"]
+                self.log(f"Pedaço {chunk_id} ({chunk['name'] or 'render'} {chunk['start']}-{chunk['end']}) entregue ao agente {worker}.")
+                return {"lease": entry["lease"], "chunk": chunk_id, "argv": chunk["argv"], "name": chunk["name"], "start": chunk["start"], "end": chunk["end"], "env": chunk.get("env", {})}
+        return {"lease": None}
+
+    def _leased_entry(self, worker, lease):
+        state = self.workers.get(worker)
+        entry = self.chunks.get(state["chunk"]) if state and state["chunk"] else None
+        if entry is None or entry["lease"] != lease or entry["state"] != "RUNNING":
+            return None
+        return entry
+
+    def heartbeat(self, worker, lease=None, frames=None):
+        # Devolve cancel=True se o pedaço deste agente já foi entregue a outro
+        with self.lock:
+            self._touch(worker)
+            if lease is None:
+                return {"cancel": False}
+            entry = self._leased_entry(worker, lease)
+            if entry is None:
+                return {"cancel": True}
+            entry["done_frames"] = sorted(set(entry["done_frames"]) | set(frames or []))
+            return {"cancel": False}
+
+    def complete(self, worker, lease, returncode, seconds, frames=None):
+        with self.lock:
+            self._touch(worker)
+            entry = self._leased_entry(worker, lease)
+            if entry is None:
+                # Resultado atrasado de um pedaço que já voltou para a fila
+                return {"accepted": False}
+            state = self.workers[worker]
+            state["chunk"] = None
+            state["completed"] += 1
+            entry["done_frames"] = sorted(set(entry["done_frames"]) | set(frames or []))
+            entry.update(returncode=returncode, seconds=seconds)
+            chunk = entry["chunk"]
+            label = f"{chunk['name'] or 'render'} {chunk['start']}-{chunk['end']}"
+            if returncode == 0:
+                entry["state"] = "DONE"
+                self.log(f"Pedaço {entry['id']} ({label}) concluído pelo agente {worker} em {seconds:.1f}s.")
+                return {"accepted": True}
+            self.log(f"Pedaço {entry['id']} ({label}) falhou no agente {worker} ({describe_exit(returncode)}).")
+            if self.retry_policy is None:
+                entry["state"] = "FAILED"
+                return {"accepted": True}
+            retries, quarantined = plan_retry(chunk, entry["done_frames"], self.retry_policy)
+            entry["state"] = "RETRIED" if retries else ("FAILED" if quarantined else "DONE")
+            if retries:
+                delay = self.retry_policy.delay(max(retry["failures"] for retry in retries))
+                for retry in retries:
+                    self._enqueue(entry["job"], dict(retry, retry_at=time.time() + delay))
+            if quarantined:
+                job = self.jobs[entry["job"]]
+                job["quarantined"] = sorted(set(job["quarantined"]) | set(quarantined))
+                self.log(f"Frame(s) em quarentena: {chunk['name'] or 'render'} {', '.join(str(frame) for frame in quarantined)}")
+            return {"accepted": True}
+
+    def reap(self):
+        # Agentes sem heartbeat: o pedaço volta para o começo da fila só com os frames que faltam
+        with self.lock:
+            now = time.time()
+            for state in self.workers.values():
+                if state["state"] != "ALIVE" or now - state["last_seen"] <= self.heartbeat_timeout:
+                    continue
+                state["state"] = "DEAD"
+                self.log(f"Agente {state['name']} sem heartbeat há {now - state['last_seen']:.0f}s, considerado morto.")
+                entry = self.chunks.get(state["chunk"]) if state["chunk"] else None
+                state["chunk"] = None
+                if entry is None or entry["state"] != "RUNNING":
+                    continue
+                chunk = entry["chunk"]
+                done = set(entry["done_frames"])
+                remaining = [frame for frame in chunk_frames(chunk) if frame not in done]
+                output_format = chunk["argv"][chunk["argv"].index("-F") + 1] if "-F" in chunk["argv"] else ""
+                if not remaining or "video" in chunk or output_format not in IMAGE_FORMATS:
+                    # Vídeo não pode ser retomado no meio: o pedaço inteiro volta
+                    entry.update(state="DONE" if not remaining else "QUEUED", worker="", done_frames=entry["done_frames"] if not remaining else [])
+                    if remaining:
+                        self.queue.insert(0, entry["id"])
+                    continue
+                entry["state"] = "REASSIGNED"
+                self._enqueue(entry["job"], frames_chunk(chunk, remaining, chunk.get("attempt", 0), chunk.get("failures", 0)), front=True)
+                self.log(f"Frames {remaining[0]}-{remaining[-1]} de {chunk['name'] or 'render'} voltaram para a fila.")
+
+    def status(self, job_id=None):
+        with self.lock:
+            jobs = []
+            for job in self.jobs.values():
+                if job_id is not None and job["id"] != job_id:
+                    continue
+                entries = [entry for entry in self.chunks.values() if entry["job"] == job["id"]]
+                counts = {}
+                for entry in entries:
+                    counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+                active = counts.get("QUEUED", 0) + counts.get("RUNNING", 0)
+                jobs.append({
+                    "id": job["id"],
+                    "name": job["name"],
+                    "worker": job["worker"],
+                    "chunks": counts,
+                    "frames_done": sum(entry["chunk"]["frame_count"] if entry["state"] == "DONE" else len(entry["done_frames"]) for entry in entries),
+                    "finished": active == 0,
+                    "failed": active == 0 and (bool(job["quarantined"]) or counts.get("FAILED", 0) > 0),
+                    "quarantined": job["quarantined"],
+                })
+            workers = [dict(state, seen_seconds_ago=time.time() - state["last_seen"]) for state in self.workers.values()]
+        return {"jobs": jobs, "workers": workers}
+
+class _FarmRequestHandler(BaseHTTPRequestHandler):
+    server_version = "Render4MeFarm/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        token = self.server.token
+        # compare_digest: o tempo da comparação não revela quantos caracteres do token estão certos
+        if token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode("utf-8"), token.encode("utf-8")):
+            self._reply(403, {"error": "token inválido"})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        path, _, query = self.path.partition("?")
+        if path != "/status":
+            self._reply(404, {"error": f"caminho desconhecido: {path}"})
+            return
+        try:
+            params = dict(part.split("=", 1) for part in query.split("&") if "=" in part)
+            job_id = int(params["job"]) if "job" in params else None
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(200, self.server.coordinator.status(job_id))
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        coordinator = self.server.coordinator
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path == "/jobs":
+                result = coordinator.submit([RenderJob.from_dict(item) for item in payload["jobs"]], int(payload.get("frames_per_chunk", 10)), payload.get("worker", ""), payload.get("name", ""))
+            elif self.path == "/lease":
+                result = coordinator.lease(payload["worker"], payload.get("host", ""))
+            elif self.path == "/heartbeat":
+                result = coordinator.heartbeat(payload["worker"], payload.get("lease"), payload.get("frames"))
+            elif self.path == "/complete":
+                result = coordinator.complete(payload["worker"], payload["lease"], payload["returncode"], float(payload.get("seconds", 0.0)), payload.get("frames"))
+            else:
+                self._reply(404, {"error": f"caminho desconhecido: {self.path}"})
+                return
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(200, result)
+
+def serve_coordinator(host="127.0.0.1", port=DEFAULT_PORT, heartbeat_timeout=DEFAULT_HEARTBEAT_TIMEOUT, token="", retry_policy=None, log=print):
+    # Devolve (servidor, coordenador) já atendendo numa thread; server.shutdown() encerra
+    if not token and not _is_loopback(host):
+        # Os agentes executam os comandos recebidos: sem token, qualquer um na rede rodaria programas neles
+        raise FarmError(f"O coordenador em {host or 'todos os endereços'} aceita outras máquinas e precisa de um token (--token ou $RENDER4ME_FARM_TOKEN).")
+    coordinator = FarmCoordinator(heartbeat_timeout, retry_policy, log)
+    server = ThreadingHTTPServer((host, port), _FarmRequestHandler)
+    server.daemon_threads = True
+    server.coordinator = coordinator
+    server.token = token
+
+    def reap_loop():
+        while True:
+            coordinator.reap()
+            time.sleep(min(1.0, heartbeat_timeout / 4))
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=reap_loop, daemon=True).start()
+    log(f"Coordenador ouvindo em http://{server.server_address[0]}:{server.server_address[1]} (agente morto após {heartbeat_timeout:.0f}s sem heartbeat).")
+    return server, coordinator
+
+def farm_request(url, path, payload=None, token="", timeout=10.0):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url.rstrip("/") + path, data=data, headers={"Content-Type": "application/json", TOKEN_HEADER: token})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise FarmError(f"o coordenador recusou o pedido ({e.code}: {message})")
+    except (OSError, ValueError) as e:
+        raise FarmError(f"sem resposta do coordenador em {url}: {e}")
+
+def default_agent_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class FarmAgent:
+    # Pede pedaços ao coordenador e os renderiza um por vez com o Blender desta máquina.
+    # O executável dos comandos recebidos é sempre trocado pelo blender_path local.
+    def __init__(self, url, name="", blender_path="blender", token="", heartbeat_seconds=DEFAULT_HEARTBEAT_SECONDS, poll_seconds=2.0, log=print):
+        self.url = url
+        self.name = name or default_agent_name()
+        self.blender_path = blender_path
+        self.token = token
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.log = log
+        self.current = None
+        self.done_frames = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _request(self, path, payload):
+        return farm_request(self.url, path, dict(payload, worker=self.name), self.token)
+
+    def _heartbeat_loop(self):
+        while not self.stopped.wait(self.heartbeat_seconds):
+            with self.lock:
+                lease = self.current["lease"] if self.current else None
+                frames = list(self.done_frames)
+            try:
+                reply = self._request("/heartbeat", {"lease": lease, "frames": frames})
+            except FarmError as e:
+                self.log(f"Heartbeat falhou: {e}")
+                continue
+            with self.lock:
+                # O pedaço pode terminar enquanto o heartbeat espera a resposta: lê tudo de self.current aqui dentro
+                current = self.current if self.current and self.current["lease"] == lease else {}
+                process, chunk = current.get("process"), current.get("chunk")
+            if reply.get("cancel") and process is not None:
+                self.log(f"Pedaço {chunk} entregue a outro agente, cancelando.")
+                process.kill()
+
+    def _render(self, lease):
+        argv = [self.blender_path] + lease["argv"][1:]
+        parser = FrameEventParser()
+        started = time.perf_counter()
+        try:
+            env = dict(os.environ, **lease["env"]) if lease.get("env") else None
+            process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace", bufsize=1, env=env)
+        except OSError as e:
+            self.log(f"Falha ao iniciar o Blender ({self.blender_path}): {e}")
+            return -1, 0.0
+        with self.lock:
+            self.current["process"] = process
+        for line in process.stdout:
+            event = parser.feed(line.rstrip("\n"))
+            if event is not None:
+                with self.lock:
+                    self.done_frames.append(event["frame"])
+        process.stdout.close()
+        return process.wait(), time.perf_counter() - started
+
+    def run(self, max_chunks=0):
+        # max_chunks > 0 encerra o agente depois de tantos pedaços (usado em testes)
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        self.log(f"Agente {self.name} conectado a {self.url} (Blender: {self.blender_path}).")
+        completed = 0
+        try:
+            while not self.stopped.is_set() and (max_chunks <= 0 or completed < max_chunks):
+                try:
+                    lease = self._request("/lease", {"host": socket.gethostname()})
+                except FarmError as e:
+                    self.log(f"{e}; nova tentativa em {self.poll_seconds * 5:.0f}s.")
+                    self.stopped.wait(self.poll_seconds * 5)
+                    continue
+                if lease.get("lease") is None:
+                    self.stopped.wait(self.poll_seconds)
+                    continue
+                with self.lock:
+                    self.current = dict(lease)
+                    self.done_frames = []
+                self.log(f"Renderizando pedaço {lease['chunk']}: {lease['name'] or 'render'} {lease['start']}-{lease['end']}")
+                returncode, seconds = self._render(lease)
+                with self.lock:
+                    frames = list(self.done_frames)
+                    self.current = None
+                self.log(f"Pedaço {lease['chunk']}: {seconds:.1f}s ({describe_exit(returncode)})")
+                try:
+                    self._request("/complete", {"lease": lease["lease"], "returncode": returncode, "seconds": seconds, "frames": frames})
+                except FarmError as e:
+                    # Sem resposta, o coordenador acaba devolvendo o pedaço para a fila
+                    self.log(f"Resultado não entregue: {e}")
+                completed += 1
+        finally:
+            self.stopped.set()
+        return completed
+
+def submit_to_farm(url, jobs, frames_per_chunk=10, worker="", name="", token=""):
+    return farm_request(url, "/jobs", {"jobs": [job.to_dict() for job in jobs], "frames_per_chunk": frames_per_chunk, "worker": worker, "name": name}, token)
+
+def farm_status(url, job_id=None, token=""):
+    return farm_request(url, "/status" + (f"?job={job_id}" if job_id is not None else ""), token=token)
+
+def wait_for_farm_job(url, job_id, token="", poll_seconds=2.0, log=print):
+    last = None
+    while True:
+        job = farm_status(url, job_id, token)["jobs"][0]
+        progress = format_farm_job(job)
+        if progress != last:
+            log(progress)
+            last = progress
+        if job["finished"]:
+            return job
+        time.sleep(poll_seconds)
+
+def format_farm_job(job):
+    counts = ", ".join(f"{state.lower()}: {count}" for state, count in sorted(job["chunks"].items()))
+    pinned = f" [agente {job['worker']}]" if job["worker"] else ""
+    text = f"Job {job['id']} {job['name']}{pinned}: {job['frames_done']} frame(s) prontos ({counts})"
+    if job["quarantined"]:
+        text += f", quarentena: {', '.join(str(frame) for frame in job['quarantined'])}"
+    return text
+
+def format_farm_status(status):
+    lines = [format_farm_job(job) for job in status["jobs"]]
+    for worker in sorted(status["workers"], key=lambda worker: worker["name"]):
+        chunk = f", pedaço {worker['chunk']}" if worker["chunk"] else ""
+        lines.append(f"Agente {worker['name']} ({worker['host'] or '?'}): {'vivo' if worker['state'] == 'ALIVE' else 'morto'}, {worker['completed']} pedaço(s) concluído(s){chunk}, último heartbeat há {worker['seen_seconds_ago']:.0f}s")
+    return lines
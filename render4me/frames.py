@@ -0,0 +1,92 @@
+import os
+
+IMAGE_FORMATS = ["PNG", "JPEG", "EXR", "TIFF", "BMP"]
+
+# --- Retomada: Detecção de Frames Faltantes na Pasta de Saída ---
+FORMAT_EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "EXR": ".exr", "TIFF": ".tif", "BMP": ".bmp"}
+
+def resolve_output_dir(custom_output_path, blend_file_path):
+    # Sem pasta personalizada o Blender salva em "//", ou seja, na pasta do .blend
+    if custom_output_path:
+        return os.path.normpath(custom_output_path)
+    return os.path.dirname(os.path.abspath(blend_file_path))
+
+def scan_output_dir(output_dir):
+    # Uma única listagem do diretório, reaproveitada por todos os jobs que salvam nele
+    try:
+        with os.scandir(output_dir) as entries:
+            return {entry.name: entry for entry in entries if entry.is_file()}
+    except OSError:
+        return {}
+
+def frame_file_is_complete(path, output_format, size=None):
+    # Arquivos vazios ou truncados (processo morto, disco cheio) contam como faltantes
+    from .integrity import inspect_frame_file
+
+    return inspect_frame_file(path, output_format, size)["ok"]
+
+def find_missing_frames(listing, output_dir, prefix, start, end, output_format):
+    # "render_Cam_####" vira "render_Cam_0001.png" (o Blender usa no mínimo 4 dígitos)
+    extension = FORMAT_EXTENSIONS[output_format]
+    missing = []
+    for frame in range(start, end + 1):
+        entry = listing.get(f"{prefix}{frame:04d}{extension}")
+        if entry is None or not frame_file_is_complete(os.path.join(output_dir, entry.name), output_format, entry.stat().st_size):
+            missing.append(frame)
+    return missing
+
+def select_frames_to_render(listing, output_dir, prefix, start, end, output_format, cache=None, cache_key_base=()):
+    # Retomada (listing) e cache combinados: devolve só os frames que realmente precisam de render
+    if listing is not None:
+        frames = find_missing_frames(listing, output_dir, prefix, start, end, output_format)
+    else:
+        frames = list(range(start, end + 1))
+    if cache is None:
+        return frames
+    os.makedirs(output_dir, exist_ok=True)
+    to_render = []
+    for frame in frames:
+        key = cache.make_key(*cache_key_base, frame)
+        dest = os.path.join(output_dir, f"{prefix}{frame:04d}{FORMAT_EXTENSIONS[output_format]}")
+        if not cache.fetch(key, dest, output_format):
+            # Desfaz o hard link antes do render para o Blender não sobrescrever o arquivo do cache
+            if os.path.exists(dest) and os.stat(dest).st_nlink > 1:
+                os.remove(dest)
+            cache.expect(key, dest, output_format)
+            to_render.append(frame)
+    return to_render
+
+# --- Intervalos e Listas de Frames ---
+def parse_frame_list(value):
+    # Interpreta a lista aceita pelo "-f" do Blender (ex: "1..5,9,12")
+    frames = []
+    for part in value.split(","):
+        if ".." in part:
+            first, last = part.split("..")
+            frames.extend(range(int(first), int(last) + 1))
+        else:
+            frames.append(int(part))
+    return frames
+
+def frames_to_ranges(frames):
+    ranges = []
+    for frame in sorted(set(frames)):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return [tuple(frame_range) for frame_range in ranges]
+
+def format_frame_list(frames):
+    return ",".join(f"{first}..{last}" if last > first else str(first) for first, last in frames_to_ranges(frames))
+
+def format_frame_args(frames):
+    # Um único intervalo contínuo vira "-s/-e -a"; o resto vira uma lista "-f" num só processo
+    ranges = frames_to_ranges(frames)
+    if len(ranges) == 1 and ranges[0][1] > ranges[0][0]:
+        return ["-s", str(ranges[0][0]), "-e", str(ranges[0][1]), "-a"]
+    return ["-f", format_frame_list(frames)]
+
+def split_frame_range(start, end, frames_per_chunk):
+    frames_per_chunk = max(1, frames_per_chunk)
+    return [(chunk_start, min(chunk_start + frames_per_chunk - 1, end)) for chunk_start in range(start, end + 1, frames_per_chunk)]
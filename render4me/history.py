@@ -0,0 +1,209 @@
+import heapq
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from .frames import IMAGE_FORMATS, format_frame_list, parse_frame_list, split_frame_range
+from .metrics import format_eta, percentile
+from .paths import render4me_data_dir
+from .profiles import profile_key
+
+# --- Histórico de Tempos de Render (SQLite) ---
+# Cada frame renderizado e cada pedaço concluído ficam registrados por .blend (hash do conteúdo),
+# cena/câmera e engine. Com as previsões, os pedaços mais longos são iniciados primeiro e os jobs
+# longos são divididos em pedaços menores, para que todos os processos terminem perto do mesmo momento.
+HISTORY_SAMPLES = 50
+CHUNKS_PER_WORKER = 3
+# Um pedaço deve durar pelo menos algumas inicializações do Blender, senão a divisão custa mais do que ganha
+MIN_CHUNK_STARTUPS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    recorded REAL, blend_hash TEXT, blend_file TEXT, job TEXT, engine TEXT,
+    frame INTEGER, seconds REAL, peak_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS frames_job ON frames (job, engine, blend_hash);
+CREATE TABLE IF NOT EXISTS chunks (
+    recorded REAL, blend_hash TEXT, blend_file TEXT, job TEXT, engine TEXT,
+    frame_start INTEGER, frame_end INTEGER, frame_count INTEGER, frames_done INTEGER,
+    seconds REAL, render_seconds REAL, peak_bytes INTEGER, returncode INTEGER
+);
+"""
+
+def _option_value(argv, flag):
+    return argv[argv.index(flag) + 1] if flag in argv and argv.index(flag) + 1 < len(argv) else ""
+
+def chunk_identity(chunk):
+    # (.blend original, cena/câmera, engine); "DEFAULT" = engine gravada no .blend, como no cache de renders
+    blend_file = chunk.get("blend_file") or _option_value(chunk["argv"], "-b")
+    if blend_file.startswith("-"):
+        blend_file = ""
+    # Com perfil de desempenho, a engine ganha o perfil: "DEFAULT+profile_<id>"
+    engine = _option_value(chunk["argv"], "-E") or "DEFAULT"
+    if profile_key(chunk["argv"]):
+        engine += f"+{profile_key(chunk['argv'])}"
+    return os.path.abspath(blend_file) if blend_file else "", chunk["name"] or "render", engine
+
+def _blend_hash(blend_file):
+    from .cache import blend_content_hash
+
+    try:
+        return blend_content_hash(blend_file) if blend_file else ""
+    except OSError:
+        return ""
+
+class RenderHistory:
+    def __init__(self, db_path=None, log=print):
+        self.db_path = db_path or os.path.join(render4me_data_dir(), "history.sqlite")
+        self.log = log
+        self.lock = threading.Lock()
+        self.predictions = {}
+        self.overheads = {}
+        self._run(lambda db: db.executescript(SCHEMA))
+
+    def _run(self, action):
+        # Uma conexão por operação: o agendador grava a partir de várias threads
+        with self.lock:
+            db = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                with db:
+                    return action(db)
+            finally:
+                db.close()
+
+    def record_chunk(self, chunk, events, seconds, returncode, peak_bytes=0):
+        blend_file, job, engine = chunk_identity(chunk)
+        blend_hash = _blend_hash(blend_file)
+        now = time.time()
+        peak_bytes = max([peak_bytes] + [event.get("peak_bytes", 0) for event in events])
+        frames = [(now, blend_hash, blend_file, job, engine, event["frame"], event["seconds"], event.get("peak_bytes", 0)) for event in events]
+        render_seconds = sum(event["seconds"] for event in events)
+        chunk_row = (now, blend_hash, blend_file, job, engine, chunk["start"], chunk["end"], chunk["frame_count"], len(events), seconds, render_seconds, peak_bytes, returncode)
+
+        def insert(db):
+            db.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?, ?)", frames)
+            db.execute("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", chunk_row)
+
+        try:
+            self._run(insert)
+        except sqlite3.Error as e:
+            self.log(f"Não foi possível gravar o histórico de {job}: {e}")
+
+    def predict_frame_seconds(self, chunk):
+        # Mediana dos últimos frames do mesmo .blend; sem histórico desta versão, usa as versões anteriores do arquivo
+        blend_file, job, engine = chunk_identity(chunk)
+        key = (blend_file, job, engine)
+        if key not in self.predictions:
+            blend_hash = _blend_hash(blend_file)
+
+            def query(db):
+                for condition, value in (("blend_hash = ?", blend_hash), ("blend_file = ?", blend_file)):
+                    rows = db.execute(
+                        f"SELECT seconds FROM frames WHERE job = ? AND engine = ? AND {condition} ORDER BY recorded DESC LIMIT ?",
+                        (job, engine, value, HISTORY_SAMPLES),
+                    ).fetchall()
+                    if rows:
+                        return percentile(sorted(row[0] for row in rows), 0.5)
+                return None
+
+            try:
+                self.predictions[key] = self._run(query)
+            except sqlite3.Error:
+                self.predictions[key] = None
+        return self.predictions[key]
+
+    def predict_overhead_seconds(self, blend_file):
+        # Tempo de cada pedaço fora do render dos frames (inicialização, carregamento do .blend, encerramento)
+        if blend_file not in self.overheads:
+            from .planner import estimate_startup_seconds
+
+            def query(db):
+                rows = db.execute(
+                    "SELECT seconds - render_seconds FROM chunks WHERE blend_file = ? AND returncode = 0 AND frames_done > 0 ORDER BY recorded DESC LIMIT ?",
+                    (blend_file, HISTORY_SAMPLES),
+                ).fetchall()
+                return percentile(sorted(max(0.0, row[0]) for row in rows), 0.5) if rows else None
+
+            try:
+                overhead = self._run(query)
+            except sqlite3.Error:
+                overhead = None
+            if overhead is None:
+                overhead = estimate_startup_seconds(blend_file)[0] if blend_file else 0.0
+            self.overheads[blend_file] = overhead
+        return self.overheads[blend_file]
+
+    def predict_chunk_seconds(self, chunk):
+        frame_seconds = self.predict_frame_seconds(chunk)
+        if frame_seconds is None:
+            return None
+        return self.predict_overhead_seconds(chunk_identity(chunk)[0]) + frame_seconds * chunk["frame_count"]
+
+def _split_chunk(chunk, pieces):
+    # Só sequências de imagens podem ser divididas; vídeos e segmentos de vídeo ficam inteiros
+    argv = chunk["argv"]
+    if pieces <= 1 or "video" in chunk or _option_value(argv, "-F") not in IMAGE_FORMATS:
+        return [chunk]
+    size = math.ceil(chunk["frame_count"] / pieces)
+    if "-f" in argv:
+        frames = parse_frame_list(_option_value(argv, "-f"))
+        result = []
+        for i in range(0, len(frames), size):
+            piece_argv = list(argv)
+            piece_argv[piece_argv.index("-f") + 1] = format_frame_list(frames[i:i + size])
+            result.append(dict(chunk, argv=piece_argv, start=frames[i], end=frames[i:i + size][-1], frame_count=len(frames[i:i + size])))
+        return result
+    if "-s" not in argv or "-e" not in argv:
+        return [chunk]
+    result = []
+    for start, end in split_frame_range(chunk["start"], chunk["end"], size):
+        piece_argv = list(argv)
+        piece_argv[piece_argv.index("-s") + 1] = str(start)
+        piece_argv[piece_argv.index("-e") + 1] = str(end)
+        result.append(dict(chunk, argv=piece_argv, start=start, end=end, frame_count=end - start + 1))
+    return result
+
+def balance_chunks(chunks, history, workers):
+    # Divide os pedaços previstos como longos demais para a fila terminar por igual entre os processos
+    predictions = [history.predict_chunk_seconds(chunk) for chunk in chunks]
+    known = [seconds for seconds in predictions if seconds is not None]
+    if not known:
+        return chunks
+    blend_files = {chunk_identity(chunk)[0] for chunk in chunks} - {""}
+    startup_seconds = max((history.predict_overhead_seconds(blend_file) for blend_file in blend_files), default=0.0)
+    target = max(sum(known) / (max(1, workers) * CHUNKS_PER_WORKER), MIN_CHUNK_STARTUPS * startup_seconds)
+    balanced = []
+    for chunk, seconds in zip(chunks, predictions):
+        pieces = math.ceil(seconds / target) if seconds is not None and target > 0 else 1
+        balanced.extend(_split_chunk(chunk, min(pieces, chunk["frame_count"])))
+    return balanced
+
+def order_longest_first(chunks, history):
+    # Jobs sem histórico vão primeiro: podem ser longos e é melhor descobrir isso no início do lote
+    predictions = [history.predict_chunk_seconds(chunk) for chunk in chunks]
+    order = sorted(range(len(chunks)), key=lambda i: (predictions[i] is not None, -(predictions[i] or 0.0)))
+    return [chunks[i] for i in order]
+
+def predict_batch_seconds(chunks, history, workers):
+    # Simula a fila (cada pedaço vai para o processo que ficar livre primeiro); devolve (segundos, jobs sem histórico)
+    unknown = []
+    finish_times = [0.0] * max(1, min(workers, len(chunks)))
+    for chunk in chunks:
+        seconds = history.predict_chunk_seconds(chunk)
+        if seconds is None:
+            name = chunk["name"] or "render"
+            if name not in unknown:
+                unknown.append(name)
+            continue
+        heapq.heapreplace(finish_times, finish_times[0] + seconds)
+    return (max(finish_times) if len(unknown) < len({chunk["name"] or "render" for chunk in chunks}) else None), unknown
+
+def format_batch_prediction(seconds, unknown):
+    if seconds is None:
+        return "Duração prevista do lote: sem histórico para estes jobs."
+    text = f"Duração prevista do lote: {format_eta(seconds)}"
+    if unknown:
+        text += f" (sem histórico: {', '.join(unknown)})"
+    return text + "."
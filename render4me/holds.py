@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+from .paths import render4me_data_dir
+
+# --- Quadros Parados: Renderizar Uma Vez e Ligar as Repetições ---
+# Antes do render, um processo do Blender avança frame a frame por cada cena/câmera e calcula um hash do
+# que muda a imagem: transformações e geometria avaliada pelo depsgraph, partículas, valores animados
+# (fcurves e drivers de objetos, materiais, mundos, luzes...) e a câmera ativa. Frames consecutivos com o
+# mesmo hash formam um grupo: só o primeiro é renderizado e os outros recebem um hard link (ou cópia) do arquivo.
+# Com motion blur, a imagem depende também dos frames vizinhos, que entram no hash.
+HOLD_ANALYSIS_TEMPLATE = """import hashlib
+import json
+import bpy
+
+SPEC = json.loads(__SPEC__)
+
+ID_COLLECTIONS = ("objects", "meshes", "curves", "armatures", "shape_keys", "materials", "node_groups", "worlds", "lights", "cameras", "textures", "scenes")
+
+def action_curves(animation):
+    # Ações em camadas (Blender 4.4+) guardam as fcurves nos channelbags de cada slot
+    action = animation.action
+    if action is None:
+        return []
+    if getattr(action, "layers", None):
+        slot = getattr(animation, "action_slot", None)
+        return [curve for layer in action.layers for strip in layer.strips for bag in strip.channelbags if slot is None or bag.slot == slot for curve in bag.fcurves]
+    return list(getattr(action, "fcurves", []))
+
+def animated_values(scene, depsgraph):
+    # Valor de cada propriedade animada (fcurves) ou com driver (valor avaliado), inclusive nas árvores de nós embutidas
+    values = []
+    for collection in ID_COLLECTIONS:
+        for datablock in getattr(bpy.data, collection):
+            for owner in (datablock, getattr(datablock, "node_tree", None)):
+                animation = getattr(owner, "animation_data", None) if owner is not None else None
+                if animation is None:
+                    continue
+                for curve in action_curves(animation):
+                    values.append((owner.name, curve.data_path, curve.array_index, curve.evaluate(scene.frame_current)))
+                for curve in animation.drivers:
+                    try:
+                        value = owner.evaluated_get(depsgraph).path_resolve(curve.data_path)
+                        value = value[curve.array_index] if hasattr(value, "__len__") and not isinstance(value, str) else value
+                    except (ValueError, IndexError, TypeError, AttributeError):
+                        value = None
+                    values.append((owner.name, curve.data_path, curve.array_index, repr(value)))
+    return values
+
+def state_hash(scene):
+    digest = hashlib.sha1()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    digest.update(repr((scene.camera.name if scene.camera else "", animated_values(scene, depsgraph))).encode("utf-8"))
+    for instance in depsgraph.object_instances:
+        obj = instance.object
+        digest.update(repr((obj.name, [tuple(row) for row in instance.matrix_world])).encode("utf-8"))
+        original = obj.original
+        deformed = original.type == "MESH" and (original.modifiers or original.data.shape_keys or (original.parent is not None and original.parent.type == "ARMATURE"))
+        if deformed and not instance.is_instance:
+            mesh = obj.data
+            coordinates = [0.0] * (len(mesh.vertices) * 3)
+            mesh.vertices.foreach_get("co", coordinates)
+            digest.update(repr(coordinates).encode("utf-8"))
+        for system in getattr(obj, "particle_systems", []):
+            locations = [0.0] * (len(system.particles) * 3)
+            system.particles.foreach_get("location", locations)
+            digest.update(repr(locations).encode("utf-8"))
+    return digest.hexdigest()
+
+def varying_reason(scene):
+    # Casos em que todo frame é diferente, mesmo sem nada animado
+    cycles = getattr(scene, "cycles", None)
+    if scene.render.engine == "CYCLES" and cycles is not None and cycles.use_animated_seed:
+        return "seed animada do Cycles"
+    if any(image.users and image.source in ("SEQUENCE", "MOVIE") for image in bpy.data.images):
+        return "texturas de sequência ou vídeo"
+    return ""
+
+report = {"jobs": []}
+for job in SPEC["jobs"]:
+    if job["kind"] == "scene":
+        scene = bpy.data.scenes.get(job["name"])
+        if scene is None:
+            report["jobs"].append({"name": job["name"], "groups": [], "reason": "cena não encontrada"})
+            continue
+    else:
+        scene = bpy.context.scene
+        camera = bpy.data.objects.get(job["name"])
+        if camera is None or camera.type != "CAMERA":
+            report["jobs"].append({"name": job["name"], "groups": [], "reason": "câmera não encontrada"})
+            continue
+        scene.camera = camera
+    reason = varying_reason(scene)
+    if reason:
+        report["jobs"].append({"name": job["name"], "groups": [], "reason": reason})
+        continue
+    # Com motion blur, cada frame depende do anterior e do seguinte
+    blur = 1 if scene.render.use_motion_blur else 0
+    frames = set(job["frames"])
+    hashes = {}
+    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+        for frame in range(min(frames) - blur, max(frames) + blur + 1):
+            if blur or frame in frames:
+                scene.frame_set(frame)
+                hashes[frame] = state_hash(scene)
+    groups, previous = [], None
+    for frame in sorted(job["frames"]):
+        signature = tuple(hashes[neighbour] for neighbour in range(frame - blur, frame + blur + 1))
+        if groups and signature == previous and frame == groups[-1][-1] + 1:
+            groups[-1].append(frame)
+        else:
+            groups.append([frame])
+        previous = signature
+    report["jobs"].append({"name": job["name"], "groups": [group for group in groups if len(group) > 1], "reason": ""})
+
+with open(SPEC["report_path"], "w", encoding="utf-8") as handle:
+    json.dump(report, handle)
+"""
+
+# Executada dentro do processo de render depois de cada frame salvo (bpy.app.handlers.render_write)
+HOLD_LINK_FUNCTION = """def link_held_frames(scene, *args):
+    import os
+    import shutil
+    targets = HOLDS.get(str(scene.frame_current))
+    if not targets:
+        return
+    source = bpy.path.abspath(scene.render.frame_path(frame=scene.frame_current))
+    for target in targets:
+        path = bpy.path.abspath(scene.render.frame_path(frame=target))
+        # Numa nova tentativa o link pode já existir (e o rename entre links do mesmo arquivo não faz nada)
+        if os.path.exists(path) and os.path.samefile(source, path):
+            continue
+        temp_path = path + ".render4me"
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, path)
+    print(f"Render4Me: frame {scene.frame_current} repetido em {len(targets)} frame(s) parado(s)", flush=True)
+"""
+
+# Sem resposta nesse tempo, a análise é abandonada e todos os frames são renderizados
+HOLD_ANALYSIS_TIMEOUT = 600.0
+
+HOLD_SCRIPT_TEMPLATE = "import json\nimport bpy\n\nHOLDS = json.loads(__HOLDS__)\n\n" + HOLD_LINK_FUNCTION + "\nbpy.app.handlers.render_write.append(link_held_frames)\n"
+
+class HoldAnalysisError(Exception):
+    pass
+
+def analyze_held_frames(blender_path, blend_file_path, jobs, timeout=HOLD_ANALYSIS_TIMEOUT):
+    # jobs: [{"kind": "scene"|"camera", "name": ..., "frames": [...]}]; devolve {nome: {"groups": [[frames], ...], "reason": ...}}
+    work_dir = tempfile.mkdtemp(prefix="render4me_holds_")
+    report_path = os.path.join(work_dir, "report.json")
+    script_path = os.path.join(work_dir, "analyze.py")
+    with open(script_path, "w", encoding="utf-8") as handle:
+        handle.write(HOLD_ANALYSIS_TEMPLATE.replace("__SPEC__", repr(json.dumps({"jobs": jobs, "report_path": report_path}))))
+    try:
+        result = subprocess.run([blender_path, "-b", blend_file_path, "--python-exit-code", "1", "--python", script_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace", timeout=timeout)
+        if result.returncode != 0 or not os.path.exists(report_path):
+            errors = [line for line in result.stdout.splitlines() if "Error" in line]
+            raise HoldAnalysisError(f"a análise no Blender falhou ({errors[-1] if errors else f'código {result.returncode}'})")
+        with open(report_path, "r", encoding="utf-8") as handle:
+            report = json.load(handle)
+    except subprocess.TimeoutExpired:
+        raise HoldAnalysisError(f"a análise passou de {timeout:.0f}s")
+    except (OSError, ValueError) as e:
+        raise HoldAnalysisError(str(e))
+    finally:
+        for path in (report_path, script_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(work_dir)
+    return {job["name"]: job for job in report["jobs"]}
+
+def collapse_held_frames(frames, groups):
+    # Devolve (frames a renderizar, {frame renderizado: [frames ligados a ele]}).
+    # Só os frames pedidos contam: com a retomada, o primeiro frame que falta em cada grupo é o renderizado.
+    requested = set(frames)
+    links = {}
+    for group in groups:
+        pending = [frame for frame in group if frame in requested]
+        if len(pending) > 1:
+            links[pending[0]] = pending[1:]
+            requested.difference_update(pending[1:])
+    return sorted(requested), links
+
+def write_hold_script(links):
+    holds_dir = os.path.join(render4me_data_dir(), "holds")
+    os.makedirs(holds_dir, exist_ok=True)
+    holds = {str(frame): targets for frame, targets in sorted(links.items())}
+    hold_id = hashlib.sha1(json.dumps(holds, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    script_path = os.path.join(holds_dir, f"holds_{hold_id}.py")
+    if not os.path.exists(script_path):
+        with open(script_path, "w", encoding="utf-8") as handle:
+            handle.write(HOLD_SCRIPT_TEMPLATE.replace("__HOLDS__", repr(json.dumps(holds))))
+    return script_path
+
+def format_hold_summary(name, links, total_frames):
+    skipped = sum(len(targets) for targets in links.values())
+    ranges = ", ".join(f"{frame}-{targets[-1]}" for frame, targets in sorted(links.items()))
+    return f"{name or 'render'}: {skipped} de {total_frames} frame(s) parados serão ligados em vez de renderizados ({ranges})."
@@ -0,0 +1,233 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from .frames import FORMAT_EXTENSIONS
+
+# --- Verificação dos Frames Salvos: Cabeçalhos e Marcadores de Fim via mmap ---
+# Cada frame é conferido assim que o Blender informa que o salvou ("Saved:"), num grupo de processos
+# separado dos renders. Só o cabeçalho e o fim do arquivo são lidos (mmap carrega apenas essas páginas):
+# PNG (IHDR e IEND), JPEG (SOF e EOI), EXR (cabeçalho e tabela de offsets), TIFF (IFD e strips) e BMP.
+# Um frame truncado ou corrompido volta direto para a fila de render. O tamanho da imagem é comparado com a
+# resolução das configurações de render, mas um tamanho diferente só é informado: o arquivo é válido.
+EXTENSION_FORMATS = dict({extension: output_format for output_format, extension in FORMAT_EXTENSIONS.items()}, **{".jpeg": "JPEG", ".tiff": "TIFF"})
+# Número de linhas por bloco de cada compressão do OpenEXR (para calcular a tabela de offsets)
+EXR_LINES_PER_CHUNK = {0: 1, 1: 1, 2: 1, 3: 16, 4: 32, 5: 16, 6: 32, 7: 32, 8: 32, 9: 256}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+# Marcadores SOF do JPEG (os que trazem largura e altura); C4, C8 e CC são outros segmentos
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Tags do TIFF: largura, altura, offsets e tamanhos dos strips (ou tiles)
+TIFF_TAGS = {256: "width", 257: "height", 273: "offsets", 279: "counts", 324: "offsets", 325: "counts"}
+TIFF_VALUE_FORMATS = {3: "H", 4: "I"}
+
+class FrameCorrupt(Exception):
+    pass
+
+def _inspect_png(data):
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        raise FrameCorrupt("assinatura PNG inválida")
+    if not data[-12:].endswith(b"IEND\xaeB`\x82"):
+        raise FrameCorrupt("sem o bloco IEND (arquivo truncado)")
+    return struct.unpack_from(">II", data, 16)
+
+def _inspect_jpeg(data):
+    if data[:2] != b"\xff\xd8":
+        raise FrameCorrupt("assinatura JPEG inválida")
+    if not data[-16:].rstrip(b"\0").endswith(b"\xff\xd9"):
+        raise FrameCorrupt("sem o marcador EOI (arquivo truncado)")
+    # Percorre os segmentos até o SOF, que fica antes dos dados comprimidos
+    pos, size = 2, len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            raise FrameCorrupt(f"segmento inválido no byte {pos}")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", data, pos + 5)
+            return width, height
+        if marker == 0xDA:
+            break
+        pos += 2 + struct.unpack_from(">H", data, pos + 2)[0]
+    raise FrameCorrupt("cabeçalho SOF não encontrado")
+
+def _inspect_exr(data):
+    size = len(data)
+    if data[:4] != EXR_MAGIC:
+        raise FrameCorrupt("assinatura EXR inválida")
+    pos, data_window, compression = 8, None, None
+    while True:
+        end = data.find(b"\0", pos, pos + 256)
+        if end < 0:
+            raise FrameCorrupt("cabeçalho EXR incompleto")
+        if end == pos:
+            pos += 1
+            break
+        name = data[pos:end]
+        type_end = data.find(b"\0", end + 1, end + 257)
+        if type_end < 0 or type_end + 5 > size:
+            raise FrameCorrupt("cabeçalho EXR incompleto")
+        (attr_size,) = struct.unpack_from("<i", data, type_end + 1)
+        value_pos = type_end + 5
+        if name == b"dataWindow":
+            data_window = struct.unpack_from("<4i", data, value_pos)
+        elif name == b"compression":
+            compression = data[value_pos]
+        pos = value_pos + attr_size
+    if data_window is None:
+        raise FrameCorrupt("cabeçalho EXR sem dataWindow")
+    width, height = data_window[2] - data_window[0] + 1, data_window[3] - data_window[1] + 1
+    if data[5] & 0x1a:
+        # Arquivos em tiles, "deep" ou multipartes: só o cabeçalho é verificado
+        return width, height
+    if compression not in EXR_LINES_PER_CHUNK:
+        raise FrameCorrupt(f"compressão EXR desconhecida ({compression})")
+    lines = EXR_LINES_PER_CHUNK[compression]
+    chunk_count = (height + lines - 1) // lines
+    if pos + 8 * chunk_count > size:
+        raise FrameCorrupt("tabela de offsets incompleta (arquivo truncado)")
+    # O OpenEXR preenche a tabela ao fechar o arquivo: offsets zerados indicam um processo interrompido
+    offsets = struct.unpack_from(f"<{chunk_count}Q", data, pos)
+    last_offset = max(offsets)
+    if min(offsets) <= pos or last_offset + 8 > size:
+        raise FrameCorrupt("tabela de offsets inválida (arquivo truncado)")
+    (data_size,) = struct.unpack_from("<i", data, last_offset + 4)
+    if last_offset + 8 + data_size > size:
+        raise FrameCorrupt("último bloco de pixels incompleto (arquivo truncado)")
+    return width, height
+
+def _tiff_values(data, endian, value_type, count, pos):
+    value_format = TIFF_VALUE_FORMATS.get(value_type)
+    if value_format is None:
+        return ()
+    # Valores de até 4 bytes ficam na própria entrada; maiores, no offset indicado por ela
+    if struct.calcsize(value_format) * count > 4:
+        (pos,) = struct.unpack_from(endian + "I", data, pos)
+    return struct.unpack_from(f"{endian}{count}{value_format}", data, pos)
+
+def _inspect_tiff(data):
+    size = len(data)
+    if data[:4] == b"II*\0":
+        endian = "<"
+    elif data[:4] == b"MM\0*":
+        endian = ">"
+    else:
+        raise FrameCorrupt("assinatura TIFF inválida")
+    (ifd,) = struct.unpack_from(endian + "I", data, 4)
+    if ifd < 8 or ifd + 2 > size:
+        raise FrameCorrupt("IFD fora do arquivo (arquivo truncado)")
+    (entry_count,) = struct.unpack_from(endian + "H", data, ifd)
+    if ifd + 2 + 12 * entry_count + 4 > size:
+        raise FrameCorrupt("IFD incompleto (arquivo truncado)")
+    tags = {}
+    for entry in range(ifd + 2, ifd + 2 + 12 * entry_count, 12):
+        tag, value_type, count = struct.unpack_from(endian + "HHI", data, entry)
+        if tag in TIFF_TAGS:
+            tags[TIFF_TAGS[tag]] = _tiff_values(data, endian, value_type, count, entry + 8)
+    if not tags.get("width") or not tags.get("height"):
+        raise FrameCorrupt("IFD sem largura ou altura")
+    if tags.get("offsets") and tags.get("counts") and max(offset + count for offset, count in zip(tags["offsets"], tags["counts"])) > size:
+        raise FrameCorrupt("dados da imagem além do fim do arquivo (arquivo truncado)")
+    return tags["width"][0], tags["height"][0]
+
+def _inspect_bmp(data):
+    if data[:2] != b"BM":
+        raise FrameCorrupt("assinatura BMP inválida")
+    if struct.unpack_from("<I", data, 2)[0] != len(data):
+        raise FrameCorrupt("tamanho diferente do cabeçalho (arquivo truncado)")
+    width, height = struct.unpack_from("<ii", data, 18)
+    # Altura negativa = linhas gravadas de cima para baixo
+    return width, abs(height)
+
+FRAME_INSPECTORS = {"PNG": _inspect_png, "JPEG": _inspect_jpeg, "EXR": _inspect_exr, "TIFF": _inspect_tiff, "BMP": _inspect_bmp}
+
+def inspect_frame_file(path, output_format="", size=None, expected_size=None):
+    # Devolve {"path", "ok", "corrupt", "width", "height", "reason"}; sem output_format, o formato vem da extensão.
+    # "corrupt" separa arquivos truncados ou ilegíveis de imagens íntegras com tamanho diferente do esperado
+    result = {"path": path, "ok": False, "corrupt": True, "width": None, "height": None, "reason": ""}
+    inspect = FRAME_INSPECTORS.get(output_format or EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower()))
+    try:
+        if size is None:
+            size = os.path.getsize(path)
+        if size == 0:
+            result["reason"] = "arquivo vazio"
+            return result
+        if inspect is None:
+            result["ok"], result["corrupt"] = True, False
+            return result
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            result["width"], result["height"] = inspect(data)
+    except FrameCorrupt as e:
+        result["reason"] = str(e)
+        return result
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        result["reason"] = f"não foi possível ler o arquivo ({e})"
+        return result
+    result["corrupt"] = False
+    if expected_size and [result["width"], result["height"]] != list(expected_size):
+        result["reason"] = f"tamanho {result['width']}x{result['height']}, esperado {expected_size[0]}x{expected_size[1]}"
+        return result
+    result["ok"] = True
+    return result
+
+class FrameVerifier:
+    # Grupo de processos que confere os frames em paralelo aos renders; submit não bloqueia quem lê a saída do Blender
+    def __init__(self, processes=0, log=print):
+        # Importados só aqui: a retomada (frame_file_is_complete) usa este módulo sem o grupo de processos
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # "spawn": não copia o processo atual (que pode ser o próprio Blender, no addon)
+        self.pool = ProcessPoolExecutor(processes or min(8, os.cpu_count() or 1), mp_context=multiprocessing.get_context("spawn"))
+        self.log = log
+        self.lock = threading.Lock()
+        self.broken = False
+        self.stats = {"verified": 0, "corrupt": 0, "wrong_size": 0, "seconds": 0.0}
+
+    def submit(self, path, expected_size=None, callback=None):
+        # callback(result) é chamado numa thread do grupo quando a verificação termina
+        started = time.perf_counter()
+        try:
+            future = self.pool.submit(inspect_frame_file, path, "", None, expected_size)
+        except RuntimeError as e:
+            self._finish(self._inspect_here(path, expected_size, e), started, callback)
+            return
+        future.add_done_callback(lambda future: self._done(future, path, expected_size, started, callback))
+
+    def _inspect_here(self, path, expected_size, error):
+        # Grupo de processos quebrado (ex.: processo morto pelo sistema): a verificação continua na thread atual
+        with self.lock:
+            if not self.broken:
+                self.broken = True
+                self.log(f"Grupo de processos da verificação indisponível, conferindo nas threads de render: {str(error).strip().splitlines()[0]}")
+        return inspect_frame_file(path, "", None, expected_size)
+
+    def _done(self, future, path, expected_size, started, callback):
+        try:
+            result = future.result()
+        except RuntimeError as e:
+            result = self._inspect_here(path, expected_size, e)
+        self._finish(result, started, callback)
+
+    def _finish(self, result, started, callback):
+        with self.lock:
+            self.stats["seconds"] += time.perf_counter() - started
+            self.stats["verified" if result["ok"] else "corrupt" if result["corrupt"] else "wrong_size"] += 1
+        if callback is not None:
+            callback(result)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        return self.stats
+
+def format_verify_report(stats):
+    checked = stats["verified"] + stats["corrupt"] + stats["wrong_size"]
+    latency = stats["seconds"] / max(1, checked)
+    return (
+        f"Verificação: {checked} frame(s) conferido(s), {stats['corrupt']} com defeito, {stats['wrong_size']} com tamanho diferente do esperado; "
+        f"tempo médio após salvar: {latency * 1000:.0f} ms."
+    )
@@ -0,0 +1,215 @@
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from .affinity import with_thread_count
+from .metrics import FrameEventParser
+
+# --- Fila de Render sem Bloquear a Interface ---
+# Não cria threads para agendar: quem chama poll() periodicamente (no addon, um bpy.app.timers)
+# lê a saída disponível de cada processo sem bloquear, atualiza o progresso e inicia o próximo job.
+# A ordem da lista é a prioridade: os jobs na fila são iniciados de cima para baixo.
+STATE_LABELS = {
+    "QUEUED": "Na fila",
+    "RUNNING": "Renderizando",
+    "DONE": "Concluído",
+    "FAILED": "Falhou",
+    "CANCELLED": "Cancelado",
+}
+
+def _set_nonblocking(stream):
+    # Pipes não bloqueantes no Windows só existem a partir do Python 3.12
+    try:
+        os.set_blocking(stream.fileno(), False)
+        return True
+    except (AttributeError, OSError):
+        return False
+
+def _lower_priority(process, nice):
+    # Processos de render com prioridade menor para o artista continuar trabalhando
+    if nice <= 0:
+        return
+    if hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, process.pid, nice)
+        except OSError:
+            pass
+
+def _priority_flags(nice):
+    if sys.platform.startswith("win") and nice > 0:
+        return subprocess.IDLE_PRIORITY_CLASS if nice >= 15 else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    return 0
+
+class RenderQueue:
+    def __init__(self, chunks, max_workers=1, nice=10, threads_per_process=0, metrics=None, log=print):
+        self.max_workers = max(1, max_workers)
+        self.nice = nice
+        self.threads_per_process = threads_per_process
+        self.metrics = metrics
+        self.log = log
+        self.jobs = []
+        self.next_id = 1
+        for chunk in chunks:
+            self.add(chunk)
+
+    def add(self, chunk):
+        job = {
+            "id": self.next_id,
+            "name": chunk["name"] or "render",
+            "argv": chunk["argv"],
+            "env": chunk.get("env"),
+            "start": chunk["start"],
+            "end": chunk["end"],
+            "frame_count": chunk["frame_count"],
+            "frames_done": 0,
+            "state": "QUEUED",
+            "returncode": None,
+            "process": None,
+            "started": None,
+            "finished": None,
+            "last_line": "",
+        }
+        self.next_id += 1
+        self.jobs.append(job)
+        if self.metrics is not None:
+            self.metrics.add_job(job["name"], job["frame_count"])
+        return job
+
+    def get(self, job_id):
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def is_active(self):
+        # Jobs cancelados continuam ativos até o processo encerrado ser recolhido
+        return any(job["state"] in ("QUEUED", "RUNNING") or (job["process"] is not None and job["returncode"] is None) for job in self.jobs)
+
+    def counts(self):
+        counts = dict.fromkeys(STATE_LABELS, 0)
+        for job in self.jobs:
+            counts[job["state"]] += 1
+        return counts
+
+    def progress(self, job):
+        if job["state"] == "DONE":
+            return 1.0
+        return min(1.0, job["frames_done"] / job["frame_count"]) if job["frame_count"] else 0.0
+
+    def move(self, job_id, offset):
+        # Reprioriza um job que ainda está na fila, trocando-o de lugar com o vizinho na fila
+        job = self.get(job_id)
+        if job is None or job["state"] != "QUEUED":
+            return False
+        queued = [other for other in self.jobs if other["state"] == "QUEUED"]
+        target = queued.index(job) + offset
+        if target < 0 or target >= len(queued):
+            return False
+        a, b = self.jobs.index(job), self.jobs.index(queued[target])
+        self.jobs[a], self.jobs[b] = self.jobs[b], self.jobs[a]
+        return True
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job["state"] not in ("QUEUED", "RUNNING"):
+            return False
+        if job["state"] == "RUNNING":
+            job["process"].terminate()
+        job["state"] = "CANCELLED"
+        job["finished"] = time.time()
+        return True
+
+    def cancel_all(self):
+        for job in self.jobs:
+            self.cancel(job["id"])
+
+    def poll(self):
+        # Uma passada rápida: nunca espera por um processo. Devolve True enquanto houver trabalho.
+        for job in self.jobs:
+            if job["process"] is not None and job["returncode"] is None:
+                self._drain(job)
+        running = sum(1 for job in self.jobs if job["state"] == "RUNNING")
+        for job in self.jobs:
+            if running >= self.max_workers:
+                break
+            if job["state"] == "QUEUED":
+                self._start(job)
+                running += 1
+        return self.is_active()
+
+    def _start(self, job):
+        argv = with_thread_count(job["argv"], self.threads_per_process) if self.threads_per_process else job["argv"]
+        # Variáveis de ambiente do job, como no agendador paralelo
+        env = dict(os.environ, **job["env"]) if job["env"] else None
+        try:
+            process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, creationflags=_priority_flags(self.nice))
+        except OSError as e:
+            job["state"] = "FAILED"
+            job["last_line"] = str(e)
+            self.log(f"Falha ao iniciar {job['name']} {job['start']}-{job['end']}: {e}")
+            return
+        _lower_priority(process, self.nice)
+        job.update(process=process, state="RUNNING", started=time.time(), parser=FrameEventParser(), buffer=b"", lines=None)
+        if not _set_nonblocking(process.stdout):
+            # Sem pipes não bloqueantes: uma thread só lê as linhas, poll() continua sem esperar
+            job["lines"] = queue.Queue()
+            threading.Thread(target=self._read_lines, args=(process.stdout, job["lines"]), daemon=True).start()
+
+    def _read_lines(self, stream, lines):
+        for line in iter(stream.readline, b""):
+            lines.put(line)
+        lines.put(None)
+
+    def _drain(self, job):
+        process = job["process"]
+        exited = process.poll() is not None
+        eof = False
+        if job["lines"] is None:
+            while True:
+                try:
+                    data = os.read(process.stdout.fileno(), 65536)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    eof = True
+                    break
+                if not data:
+                    eof = True
+                    break
+                job["buffer"] += data
+            *lines, job["buffer"] = job["buffer"].split(b"\n")
+        else:
+            lines = []
+            while True:
+                try:
+                    line = job["lines"].get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    eof = True
+                    break
+                lines.append(line)
+        for line in lines:
+            self._handle_line(job, line.decode("utf-8", "replace").rstrip("\r\n"))
+        if exited and eof:
+            if job["buffer"]:
+                self._handle_line(job, job["buffer"].decode("utf-8", "replace"))
+            process.stdout.close()
+            job["returncode"] = process.returncode
+            if job["state"] == "RUNNING":
+                job["state"] = "DONE" if process.returncode == 0 else "FAILED"
+                job["finished"] = time.time()
+                self.log(f"{job['name']} {job['start']}-{job['end']}: {STATE_LABELS[job['state']].lower()} em {job['finished'] - job['started']:.1f}s (código {process.returncode})")
+
+    def _handle_line(self, job, line):
+        if line.strip():
+            job["last_line"] = line
+        if self.metrics is not None:
+            event = self.metrics.feed(job["name"], job["parser"], line)
+        else:
+            event = job["parser"].feed(line)
+        if event is not None:
+            job["frames_done"] += 1
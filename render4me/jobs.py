@@ -0,0 +1,119 @@
+import json
+import shlex
+import subprocess
+import sys
+from array import array
+
+from .frames import frames_to_ranges, parse_frame_list
+
+# --- Modelo de Jobs: Listas de Argumentos em Vez de Texto de Shell ---
+# Cada processo de render é um RenderJob: a lista de argumentos executada diretamente (sem shell nem terminal
+# por job), os frames num array compacto, o padrão de saída e variáveis de ambiente extras. Nomes de cenas e
+# câmeras com espaços, aspas ou "$" vão intactos para o Blender. O texto mostrado no painel é só uma
+# apresentação dos jobs (format_jobs); nos arquivos e na fila de render eles são gravados em JSON:
+#   {"jobs": [{"argv": [...], "name": "Cam 1", "kind": "camera", "ranges": [[1, 250]], "output": "//render_Cam 1_####", ...}]}
+# "resolution" é o tamanho esperado dos frames, conferido pela verificação de integridade (integrity.py)
+# quando a cena é conhecida no planejamento.
+JOB_FLAGS = {"-c": "camera", "-S": "scene"}
+
+class RenderJob:
+    __slots__ = ("argv", "name", "kind", "frames", "output", "output_format", "env", "resolution")
+
+    def __init__(self, argv, name="", kind="render", frames=(), output="", output_format="", env=None, resolution=None):
+        self.argv = [str(arg) for arg in argv]
+        self.name = name
+        self.kind = kind
+        self.frames = array("i", frames)
+        self.output = output
+        self.output_format = output_format
+        self.env = dict(env or {})
+        self.resolution = list(resolution) if resolution else None
+
+    def to_dict(self):
+        # Os frames viram intervalos: 1-10000 ocupa um par, não dez mil números
+        return {
+            "argv": self.argv,
+            "name": self.name,
+            "kind": self.kind,
+            "ranges": [list(frame_range) for frame_range in frames_to_ranges(self.frames)],
+            "output": self.output,
+            "output_format": self.output_format,
+            "env": self.env,
+            "resolution": self.resolution,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data.get("argv"):
+            raise ValueError("Job sem argumentos (argv) no arquivo de jobs.")
+        frames = [frame for start, end in data.get("ranges", []) for frame in range(start, end + 1)]
+        return cls(data["argv"], data.get("name", ""), data.get("kind", "render"), frames, data.get("output", ""), data.get("output_format", ""), data.get("env"), data.get("resolution"))
+
+    @classmethod
+    def from_command(cls, command):
+        # Comandos digitados ou editados à mão no painel
+        job = parse_job_argv(split_render_command(command))
+        frames = job.get("frames") or (range(job["start"], job["end"] + 1) if job["start"] is not None and job["end"] is not None else ())
+        return cls(job["argv"], job["name"], job["kind"], frames, job["output"], job["output_format"])
+
+    def to_command(self):
+        return format_command(self.argv)
+
+def split_render_command(command):
+    # No Windows as barras invertidas fazem parte dos caminhos, então não usamos o modo POSIX
+    if sys.platform.startswith('win'):
+        return [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg for arg in shlex.split(command, posix=False)]
+    return shlex.split(command)
+
+def format_command(argv):
+    # Texto equivalente para copiar num terminal do sistema
+    if sys.platform.startswith('win'):
+        return subprocess.list2cmdline(argv)
+    return shlex.join(argv)
+
+def parse_job_argv(argv):
+    # Extrai de uma linha de comando do Blender as informações necessárias para dividi-la em pedaços
+    job = {"argv": list(argv), "name": "", "kind": "render", "start": None, "end": None, "output": "", "output_format": ""}
+    for i, arg in enumerate(argv[:-1]):
+        value = argv[i + 1]
+        if arg in JOB_FLAGS:
+            job["name"] = value
+            job["kind"] = JOB_FLAGS[arg]
+        elif arg == "-o":
+            job["output"] = value
+        elif arg == "-F":
+            job["output_format"] = value
+        elif arg == "-s":
+            job["start"] = int(value)
+        elif arg == "-e":
+            job["end"] = int(value)
+        elif arg == "-f":
+            job["frames"] = parse_frame_list(value)
+    if job["start"] is None and "-b" in argv and "--python" in argv and "-o" not in argv:
+        job["kind"] = "worker"
+    return job
+
+def format_jobs(jobs):
+    return "\n\n".join(job.to_command() for job in jobs)
+
+def jobs_from_text(text):
+    return [RenderJob.from_command(command.strip()) for command in text.split("\n\n") if command.strip()]
+
+def jobs_to_json(jobs):
+    return json.dumps({"jobs": [job.to_dict() for job in jobs]}, ensure_ascii=False)
+
+def jobs_from_json(text):
+    return [RenderJob.from_dict(item) for item in json.loads(text)["jobs"]]
+
+def write_jobs_file(jobs, path):
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(jobs_to_json(jobs))
+    return path
+
+def read_jobs_file(path):
+    # Arquivos de comandos em texto (um comando por parágrafo) continuam aceitos
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    if text.lstrip().startswith("{"):
+        return jobs_from_json(text)
+    return jobs_from_text(text)
@@ -0,0 +1,119 @@
+import json
+import os
+import signal
+
+from .paths import render4me_data_dir
+from .profiles import profile_key
+
+# --- Controle de Admissão por Memória ---
+# Cenas pesadas passam de 40 GB cada; iniciar processos demais faz o sistema matar o lote inteiro.
+# O pico de memória de cada job (.blend + cena/câmera) é aprendido das execuções anteriores e um
+# novo processo só é iniciado quando o pico previsto cabe na memória disponível mais a folga.
+GB = 1024 ** 3
+PEAK_SAMPLES = 5
+
+def read_process_memory(pid):
+    # (RSS atual, pico de RSS) em bytes, lidos de /proc/<pid>/status; None fora do Linux
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as handle:
+            values = {}
+            for line in handle:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    values[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    if "VmRSS" not in values:
+        return None
+    return values["VmRSS"], values.get("VmHWM", values["VmRSS"])
+
+def read_available_memory():
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def memory_job_key(argv, name):
+    blend_file = argv[argv.index("-b") + 1] if "-b" in argv and argv.index("-b") + 1 < len(argv) else ""
+    key = f"{os.path.abspath(blend_file) if blend_file and not blend_file.startswith('-') else blend_file}|{name}"
+    # A resolução do perfil muda o pico de memória
+    return f"{key}|{profile_key(argv)}" if profile_key(argv) else key
+
+class MemoryGovernor:
+    def __init__(self, headroom_bytes=4 * GB, default_peak_bytes=8 * GB, pressure_action="PAUSE", history_path=None, log=print):
+        self.headroom_bytes = headroom_bytes
+        self.default_peak_bytes = default_peak_bytes
+        self.pressure_action = pressure_action
+        self.history_path = history_path or os.path.join(render4me_data_dir(), "memory_peaks.json")
+        self.log = log
+        self.history = {}
+        if os.path.exists(self.history_path):
+            try:
+                with open(self.history_path, "r", encoding="utf-8") as handle:
+                    self.history = json.load(handle)
+            except (OSError, ValueError):
+                self.history = {}
+
+    def predicted_peak(self, key):
+        samples = self.history.get(key)
+        return max(samples) if samples else self.default_peak_bytes
+
+    def can_admit(self, key, running):
+        # Sempre admite quando nada está rodando, para o lote nunca travar
+        active = [entry for entry in running if not entry["paused"]]
+        if not active:
+            return True
+        available = read_available_memory()
+        if available is None:
+            return True
+        # Os jobs em andamento ainda podem crescer até o pico previsto de cada um
+        growth = sum(max(0, self.predicted_peak(entry["key"]) - entry["rss"]) for entry in running)
+        return available - growth - self.headroom_bytes >= self.predicted_peak(key)
+
+    def sample(self, running):
+        for entry in running:
+            memory = read_process_memory(entry["process"].pid)
+            if memory is not None:
+                entry["rss"], peak = memory
+                entry["peak"] = max(entry["peak"], peak)
+
+    def record(self, key, peak):
+        if peak <= 0:
+            return
+        self.history[key] = (self.history.get(key, []) + [peak])[-PEAK_SAMPLES:]
+
+    def relieve_pressure(self, running):
+        # Perto de usar swap: pausa (SIGSTOP) ou devolve à fila o job mais novo; retoma quando há folga
+        available = read_available_memory()
+        if available is None:
+            return
+        active = sorted((entry for entry in running if not entry["paused"] and not entry["requeued"]), key=lambda entry: entry["started"])
+        paused = sorted((entry for entry in running if entry["paused"]), key=lambda entry: entry["started"])
+        if available < self.headroom_bytes and len(active) > 1:
+            newest = active[-1]
+            if self.pressure_action == "REQUEUE":
+                newest["requeued"] = True
+                newest["process"].terminate()
+                self.log(f"Memória baixa ({available / GB:.1f} GB livres): job {newest['name']} devolvido à fila.")
+            elif hasattr(signal, "SIGSTOP"):
+                os.kill(newest["process"].pid, signal.SIGSTOP)
+                newest["paused"] = True
+                self.log(f"Memória baixa ({available / GB:.1f} GB livres): job {newest['name']} pausado.")
+        elif paused:
+            oldest = paused[0]
+            needed = max(0, self.predicted_peak(oldest["key"]) - oldest["rss"])
+            if not active or available - self.headroom_bytes >= needed:
+                os.kill(oldest["process"].pid, signal.SIGCONT)
+                oldest["paused"] = False
+                self.log(f"Memória liberada: job {oldest['name']} retomado.")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+        temp_path = self.history_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.history, handle)
+        os.replace(temp_path, self.history_path)
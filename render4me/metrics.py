@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import threading
+import time
+
+# --- Métricas ao Vivo: Leitura da Saída do Blender ---
+# Linhas típicas da saída do Blender em segundo plano:
+#   Fra:12 Mem:512.00M (Peak 740.00M) | Time:00:03.21 | Sample 64/128
+#   Saved: '/renders/render_Cam_0012.png'
+#    Time: 00:04.87 (Saving: 00:00.12)
+#   Append frame 12 (vídeos)
+FRAME_RE = re.compile(r"^Fra:(\d+)\b")
+PEAK_RE = re.compile(r"Peak:? ?([\d.]+)M")
+SAVED_RE = re.compile(r"^Saved: '(.*)'")
+APPEND_RE = re.compile(r"^Append frame (\d+)")
+FRAME_TIME_RE = re.compile(r"^\s*Time: ([\d:.]+) \(Saving: ([\d:.]+)\)")
+
+def parse_blender_time(value):
+    # "MM:SS.ss" ou "HH:MM:SS.ss" em segundos
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def percentile(sorted_values, fraction):
+    # Percentil com interpolação linear sobre uma lista já ordenada
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+class FrameEventParser:
+    # Um por processo: junta as linhas "Fra:", "Saved:" e "Time:" em um evento por frame concluído
+    def __init__(self):
+        self.current_frame = None
+        self.saved_path = None
+        self.peak_megabytes = 0.0
+
+    def feed(self, line):
+        match = FRAME_RE.match(line)
+        if match:
+            frame = int(match.group(1))
+            if frame != self.current_frame:
+                self.peak_megabytes = 0.0
+            self.current_frame = frame
+            peak = PEAK_RE.search(line)
+            if peak:
+                self.peak_megabytes = max(self.peak_megabytes, float(peak.group(1)))
+            return None
+        match = SAVED_RE.match(line)
+        if match:
+            self.saved_path = match.group(1)
+            return None
+        match = APPEND_RE.match(line)
+        if match:
+            self.current_frame = int(match.group(1))
+            return None
+        match = FRAME_TIME_RE.match(line)
+        if match:
+            event = {
+                "frame": self.current_frame,
+                "seconds": parse_blender_time(match.group(1)),
+                "saving_seconds": parse_blender_time(match.group(2)),
+                "path": self.saved_path,
+                "peak_bytes": int(self.peak_megabytes * 1024 ** 2),
+            }
+            self.saved_path = None
+            self.peak_megabytes = 0.0
+            return event
+        return None
+
+class JobMetrics:
+    def __init__(self, name, total_frames):
+        self.name = name
+        self.total_frames = total_frames
+        self.frame_seconds = []
+        self.saving_seconds = 0.0
+        self.started = None
+        self.last_frame = None
+
+    def add_frame(self, event, now):
+        if self.started is None:
+            # O primeiro frame já consumiu seu próprio tempo de render
+            self.started = now - event["seconds"]
+        self.frame_seconds.append(event["seconds"])
+        self.saving_seconds += event["saving_seconds"]
+        self.last_frame = event["frame"]
+
+    def snapshot(self, now):
+        done = len(self.frame_seconds)
+        ordered = sorted(self.frame_seconds)
+        elapsed = now - self.started if self.started is not None else 0.0
+        # Vazão observada: inclui todos os pedaços deste job rodando em paralelo
+        frames_per_hour = done / elapsed * 3600 if elapsed > 0 else 0.0
+        remaining = max(0, self.total_frames - done)
+        return {
+            "job": self.name,
+            "frames_done": done,
+            "total_frames": self.total_frames,
+            "last_frame": self.last_frame,
+            "mean": sum(ordered) / done if done else 0.0,
+            "p50": percentile(ordered, 0.5),
+            "p95": percentile(ordered, 0.95),
+            "frames_per_hour": frames_per_hour,
+            "eta_seconds": remaining / frames_per_hour * 3600 if frames_per_hour > 0 else None,
+            "saving_seconds": self.saving_seconds,
+        }
+
+class BatchMetrics:
+    # Métricas de todos os jobs de um lote, com exportação opcional em JSON Lines
+    def __init__(self, metrics_path=None):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.metrics_path = metrics_path
+        if metrics_path:
+            os.makedirs(os.path.dirname(os.path.abspath(metrics_path)), exist_ok=True)
+
+    def add_job(self, name, frame_count):
+        with self.lock:
+            job = self.jobs.get(name)
+            if job is None:
+                self.jobs[name] = JobMetrics(name, frame_count)
+            else:
+                job.total_frames += frame_count
+
+    def feed(self, name, parser, line):
+        event = parser.feed(line)
+        if event is None:
+            return None
+        now = time.time()
+        with self.lock:
+            job = self.jobs.setdefault(name, JobMetrics(name, 0))
+            job.add_frame(event, now)
+            record = dict(job.snapshot(now), event="frame", ts=now, frame=event["frame"], seconds=event["seconds"], path=event["path"])
+            self._write(record)
+        return event
+
+    def snapshots(self):
+        now = time.time()
+        with self.lock:
+            return [job.snapshot(now) for job in self.jobs.values()]
+
+    def write_summary(self, summary):
+        with self.lock:
+            self._write(dict(summary, event="batch_done", ts=time.time()))
+
+    def _write(self, record):
+        if not self.metrics_path:
+            return
+        with open(self.metrics_path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
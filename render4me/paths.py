@@ -0,0 +1,8 @@
+import os
+
+# --- Pastas de Dados do Render4Me ---
+def render4me_data_dir():
+    # Pasta de dados persistentes do addon (cache, históricos, scripts gerados)
+    path = os.environ.get("RENDER4ME_HOME") or os.path.join(os.path.expanduser("~"), ".render4me")
+    os.makedirs(path, exist_ok=True)
+    return path
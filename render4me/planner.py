@@ -0,0 +1,104 @@
+import glob
+import json
+import os
+
+from .frames import frames_to_ranges
+from .paths import render4me_data_dir
+
+# --- Otimizador do Plano de Jobs ---
+# Fica entre as listas de cenas/câmeras e a geração dos comandos:
+#   - nomes repetidos viram um único job (ranges sobrepostos ou vizinhos são unidos; em vídeo, só repetições exatas)
+#   - câmeras trocadas por marcadores da timeline podem ser renderizadas num único processo da cena
+# Cada processo a menos economiza a inicialização do Blender e o carregamento do .blend.
+DEFAULT_STARTUP_SECONDS = 2.0
+LOAD_BYTES_PER_SECOND = 100 * 1024 ** 2
+
+def merge_items(items, merge_ranges=True):
+    # Um job por nome (e por motor/pasta de saída próprios, se o item os tiver), na ordem da primeira ocorrência;
+    # devolve (jobs, frames duplicados removidos)
+    jobs, requested = {}, 0
+    for item in items:
+        name, start_frame, end_frame = item["name"], item["start_frame"], item["end_frame"]
+        render_engine, output_path = item.get("render_engine", ""), item.get("output_path", "")
+        requested += end_frame - start_frame + 1
+        job = jobs.setdefault((name, render_engine, output_path), {"name": name, "render_engine": render_engine, "output_path": output_path, "ranges": []})
+        if (start_frame, end_frame) not in job["ranges"]:
+            job["ranges"].append((start_frame, end_frame))
+    for job in jobs.values():
+        if merge_ranges:
+            job["ranges"] = frames_to_ranges(frame for start, end in job["ranges"] for frame in range(start, end + 1))
+    planned = sum(end - start + 1 for job in jobs.values() for start, end in job["ranges"])
+    return list(jobs.values()), requested - planned
+
+def _camera_at(scene, frame):
+    # Como o Blender: vale o último marcador com câmera no frame ou antes dele; sem marcador, a câmera da cena
+    camera = scene["camera"]
+    for marker in scene["markers"]:
+        if marker["frame"] > frame:
+            break
+        if marker["camera"]:
+            camera = marker["camera"]
+    return camera
+
+def group_cameras_by_markers(jobs, info):
+    # Câmeras ativas (por marcadores) em todos os seus frames dentro da mesma cena viram um só job da cena.
+    # Devolve os jobs restantes e os grupos {"scene", "cameras", "ranges"}.
+    # Câmeras com motor ou pasta de saída próprios continuam em processos separados.
+    groups = {}
+    remaining = []
+    for job in jobs:
+        if job.get("render_engine") or job.get("output_path"):
+            remaining.append(job)
+            continue
+        frames = [frame for start, end in job["ranges"] for frame in range(start, end + 1)]
+        for scene in info["scenes"]:
+            if not any(marker["camera"] for marker in scene["markers"]):
+                continue
+            if all(_camera_at(scene, frame) == job["name"] for frame in frames):
+                groups.setdefault(scene["name"], []).append((job, frames))
+                break
+        else:
+            remaining.append(job)
+    result = []
+    for scene_name, members in groups.items():
+        if len(members) < 2:
+            remaining.extend(job for job, _ in members)
+            continue
+        result.append({
+            "scene": scene_name,
+            "cameras": [job["name"] for job, _ in members],
+            "ranges": frames_to_ranges(frame for _, frames in members for frame in frames),
+        })
+    # Mantém a ordem original dos jobs que não foram agrupados
+    order = {id(job): index for index, job in enumerate(jobs)}
+    remaining.sort(key=lambda job: order[id(job)])
+    return remaining, result
+
+def estimate_startup_seconds(blend_file_path):
+    # Usa o tempo de carregamento medido pelo worker persistente; sem medição, estima pelo tamanho do arquivo
+    blend_file = os.path.abspath(blend_file_path)
+    samples = []
+    for report_path in glob.glob(os.path.join(render4me_data_dir(), "workers", "*.report.json")):
+        try:
+            with open(report_path, "r", encoding="utf-8") as handle:
+                report = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if report.get("blend_file") == blend_file and report.get("load_seconds"):
+            samples.append(report["load_seconds"])
+    if samples:
+        return DEFAULT_STARTUP_SECONDS + sum(samples) / len(samples), True
+    try:
+        size = os.path.getsize(blend_file)
+    except OSError:
+        size = 0
+    return DEFAULT_STARTUP_SECONDS + size / LOAD_BYTES_PER_SECOND, False
+
+def format_plan_summary(naive_launches, launches, duplicate_frames, blend_file_path):
+    startup_seconds, measured = estimate_startup_seconds(blend_file_path)
+    saved = max(0, naive_launches - launches) * startup_seconds
+    summary = f"Plano: {launches} processo(s) do Blender (plano ingênuo: {naive_launches})"
+    if duplicate_frames:
+        summary += f", {duplicate_frames} frame(s) repetido(s) removido(s)"
+    origin = "medido" if measured else "estimado"
+    return f"{summary}; inicialização economizada: ~{saved:.0f}s ({startup_seconds:.1f}s por processo, {origin})."
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+
+from .paths import render4me_data_dir
+
+# --- Perfis de Desempenho: Ajustes de Render Aplicados pela Linha de Comando ---
+# Cada perfil vira um script "--python" executado depois de abrir o .blend e selecionar a cena,
+# antes do render. Valores 0 ou "KEEP" mantêm o que está gravado no .blend.
+PROFILE_DEFAULTS = {
+    "resolution_percentage": 0,
+    "samples": 0,
+    "adaptive_threshold": 0.0,
+    "persistent_data": "KEEP",
+    "denoiser": "KEEP",
+    "tile_size": 0,
+}
+PERSISTENT_DATA_OPTIONS = ("KEEP", "ON", "OFF")
+DENOISER_OPTIONS = ("KEEP", "NONE", "OPENIMAGEDENOISE", "OPTIX")
+
+BUILTIN_PROFILES = {
+    "draft": {"resolution_percentage": 50, "samples": 32, "adaptive_threshold": 0.1, "persistent_data": "ON", "denoiser": "OPENIMAGEDENOISE", "tile_size": 0},
+    "preview": {"resolution_percentage": 75, "samples": 128, "adaptive_threshold": 0.05, "persistent_data": "ON", "denoiser": "OPENIMAGEDENOISE", "tile_size": 0},
+    "final": {"resolution_percentage": 100, "samples": 0, "adaptive_threshold": 0.0, "persistent_data": "KEEP", "denoiser": "KEEP", "tile_size": 0},
+}
+
+# Também usada pelo worker persistente, que aplica o perfil a cada cena
+PROFILE_FUNCTION = """def apply_profile(scene, profile):
+    render = scene.render
+    if profile["resolution_percentage"]:
+        render.resolution_percentage = profile["resolution_percentage"]
+    if profile["persistent_data"] != "KEEP":
+        render.use_persistent_data = profile["persistent_data"] == "ON"
+    cycles = getattr(scene, "cycles", None)
+    if cycles is not None:
+        if profile["samples"]:
+            cycles.samples = profile["samples"]
+        if profile["adaptive_threshold"]:
+            cycles.use_adaptive_sampling = True
+            cycles.adaptive_threshold = profile["adaptive_threshold"]
+        if profile["denoiser"] == "NONE":
+            cycles.use_denoising = False
+        elif profile["denoiser"] != "KEEP":
+            cycles.use_denoising = True
+            try:
+                cycles.denoiser = profile["denoiser"]
+            except TypeError:
+                print(f"Render4Me: denoiser {profile['denoiser']} indisponível, mantendo {cycles.denoiser}.")
+        if profile["tile_size"]:
+            cycles.use_auto_tile = True
+            cycles.tile_size = profile["tile_size"]
+    eevee = getattr(scene, "eevee", None)
+    if eevee is not None and profile["samples"]:
+        eevee.taa_render_samples = profile["samples"]
+    print(f"Render4Me: perfil {profile['name']} aplicado à cena {scene.name}")
+"""
+
+PROFILE_SCRIPT_TEMPLATE = "import json\nimport bpy\n\n" + PROFILE_FUNCTION + "\napply_profile(bpy.context.scene, json.loads(__PROFILE__))\n"
+
+def resolve_profile(name, profiles=None):
+    # Perfis da especificação/painel têm precedência sobre os perfis padrão de mesmo nome
+    available = dict(BUILTIN_PROFILES, **(profiles or {}))
+    if name not in available:
+        raise ValueError(f"Perfil de desempenho desconhecido: {name}. Disponíveis: {', '.join(sorted(available))}.")
+    unknown = sorted(set(available[name]) - set(PROFILE_DEFAULTS))
+    if unknown:
+        raise ValueError(f"Campo(s) desconhecido(s) no perfil {name}: {', '.join(unknown)}")
+    profile = dict(PROFILE_DEFAULTS, **available[name])
+    if profile["persistent_data"] not in PERSISTENT_DATA_OPTIONS:
+        raise ValueError(f"persistent_data do perfil {name} deve ser {', '.join(PERSISTENT_DATA_OPTIONS)}.")
+    if profile["denoiser"] not in DENOISER_OPTIONS:
+        raise ValueError(f"denoiser do perfil {name} deve ser {', '.join(DENOISER_OPTIONS)}.")
+    if not 0 <= profile["resolution_percentage"] <= 100 or profile["samples"] < 0 or profile["tile_size"] < 0 or profile["adaptive_threshold"] < 0:
+        raise ValueError(f"Valores inválidos no perfil {name}.")
+    profile["name"] = name
+    return profile
+
+def write_profile_script(profile):
+    # O nome do script vem do conteúdo: o mesmo perfil gera sempre o mesmo arquivo (e a mesma chave no histórico)
+    profiles_dir = os.path.join(render4me_data_dir(), "profiles")
+    os.makedirs(profiles_dir, exist_ok=True)
+    profile_id = hashlib.sha1(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    script_path = os.path.join(profiles_dir, f"profile_{profile_id}.py")
+    if not os.path.exists(script_path):
+        with open(script_path, "w", encoding="utf-8") as handle:
+            handle.write(PROFILE_SCRIPT_TEMPLATE.replace("__PROFILE__", repr(json.dumps(profile))))
+    return script_path
+
+def profile_key(argv):
+    # Identifica o perfil de um comando gerado ("" sem perfil); renders com perfis diferentes não se misturam no histórico
+    for i, arg in enumerate(argv[:-1]):
+        if arg == "--python" and os.path.basename(argv[i + 1]).startswith("profile_"):
+            return os.path.splitext(os.path.basename(argv[i + 1]))[0]
+    return ""
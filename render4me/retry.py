@@ -0,0 +1,87 @@
+import signal
+
+from .frames import IMAGE_FORMATS, format_frame_list, frames_to_ranges, parse_frame_list
+
+# --- Isolamento de Falhas: Novas Tentativas Só com os Frames que Faltam ---
+# Quando um processo termina com erro (código diferente de 0 ou morto por um sinal), os frames que já
+# foram salvos são mantidos e só os restantes voltam para a fila, depois de uma espera exponencial.
+# Se a tentativa caiu sem concluir nenhum frame, o range é dividido ao meio até o frame defeituoso ficar
+# sozinho; um frame que falha sozinho em todas as tentativas vai para a quarentena em vez de travar o lote.
+class RetryPolicy:
+    def __init__(self, max_attempts=3, backoff_seconds=2.0, max_backoff_seconds=60.0):
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    def delay(self, failures):
+        # Só falhas repetidas dos mesmos frames dobram a espera; divisões e retomadas usam a espera base
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** max(0, failures - 1))
+
+def describe_exit(returncode):
+    if returncode is not None and returncode < 0:
+        try:
+            return f"sinal {signal.Signals(-returncode).name}"
+        except ValueError:
+            return f"sinal {-returncode}"
+    if returncode is not None and returncode > 255:
+        # Exceções do Windows (ex.: 0xC0000005, acesso inválido à memória)
+        return f"código 0x{returncode:08X}"
+    return f"código {returncode}"
+
+def chunk_frames(chunk):
+    argv = chunk["argv"]
+    if "-f" in argv:
+        return parse_frame_list(argv[argv.index("-f") + 1])
+    if chunk["start"] is None or chunk["end"] is None:
+        return []
+    return list(range(chunk["start"], chunk["end"] + 1))
+
+def frames_chunk(chunk, frames, attempt, failures):
+    # Mesmo comando com outros frames: "-s/-e -a" para um range contínuo, "-f" para uma lista
+    argv = list(chunk["argv"])
+    contiguous = frames == list(range(frames[0], frames[-1] + 1))
+    if "-f" in argv:
+        argv[argv.index("-f") + 1] = format_frame_list(frames)
+    elif contiguous or "-a" not in argv:
+        argv[argv.index("-s") + 1] = str(frames[0])
+        argv[argv.index("-e") + 1] = str(frames[-1])
+    else:
+        # "-f" toma o lugar do "-a", depois de "-o" e "-F"
+        argv[argv.index("-a"):argv.index("-a") + 1] = ["-f", format_frame_list(frames)]
+        for flag in ("-s", "-e"):
+            del argv[argv.index(flag):argv.index(flag) + 2]
+    return dict(chunk, argv=argv, start=frames[0], end=frames[-1], frame_count=len(frames), attempt=attempt, failures=failures)
+
+def plan_retry(chunk, done_frames, policy):
+    # Devolve (pedaços para tentar de novo, frames em quarentena)
+    attempt = chunk.get("attempt", 0) + 1
+    output_format = chunk["argv"][chunk["argv"].index("-F") + 1] if "-F" in chunk["argv"] else ""
+    if "video" in chunk or output_format not in IMAGE_FORMATS:
+        # Vídeo não pode ser retomado no meio: o pedaço inteiro é repetido
+        if attempt >= policy.max_attempts:
+            return [], chunk_frames(chunk)
+        return [dict(chunk, attempt=attempt, failures=attempt)], []
+    done = set(done_frames)
+    remaining = [frame for frame in chunk_frames(chunk) if frame not in done]
+    if not remaining:
+        return [], []
+    # Sem nenhum frame concluído nesta tentativa, o defeito está no começo do range
+    failures = chunk.get("failures", 0) + 1 if not done else 1
+    if len(remaining) == 1:
+        if failures >= policy.max_attempts:
+            return [], remaining
+        return [frames_chunk(chunk, remaining, attempt, failures)], []
+    if done:
+        return [frames_chunk(chunk, remaining, attempt, 0)], []
+    middle = len(remaining) // 2
+    return [frames_chunk(chunk, remaining[:middle], attempt, 0), frames_chunk(chunk, remaining[middle:], attempt, 0)], []
+
+def format_quarantine_report(quarantined):
+    # quarantined: {job: {"frames": [...], "exit": "sinal SIGSEGV", "files": [arquivos com defeito mantidos no disco]}}
+    lines = []
+    for job, entry in sorted(quarantined.items()):
+        ranges = ", ".join(f"{start}-{end}" if start != end else str(start) for start, end in frames_to_ranges(entry["frames"]))
+        lines.append(f"Quarentena {job}: {len(entry['frames'])} frame(s) [{ranges}] (última falha: {entry['exit']})")
+        if entry.get("files"):
+            lines.append(f"  Arquivo(s) com defeito mantido(s) em: {', '.join(sorted(entry['files']))}")
+    return lines
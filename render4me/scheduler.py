@@ -0,0 +1,317 @@
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from .affinity import pin_process, with_thread_count
+from .frames import IMAGE_FORMATS, format_frame_list, split_frame_range
+from .jobs import RenderJob, parse_job_argv
+from .memory import GB, memory_job_key
+from .metrics import FrameEventParser
+from .retry import describe_exit, frames_chunk, plan_retry
+
+# --- Agendador Paralelo Local ---
+def parse_render_command(command):
+    # Aceita um RenderJob (jobs.py) ou o texto de um comando gerado
+    job = command if isinstance(command, RenderJob) else RenderJob.from_command(command)
+    return dict(parse_job_argv(job.argv), command=job.to_command(), env=job.env, resolution=job.resolution)
+
+def chunk_label(chunk):
+    # Nome mostrado no log e nas métricas; no lote de vários .blend (batch.py), prefixado pelo arquivo
+    name = chunk["name"] or "render"
+    return f"{chunk['batch']}/{name}" if chunk.get("batch") else name
+
+def build_render_chunks(commands, frames_per_chunk):
+    # frames_per_chunk <= 0 mantém cada comando inteiro (execução sequencial tradicional)
+    chunks = []
+    for command in commands:
+        job = parse_render_command(command)
+        first = len(chunks)
+        if frames_per_chunk <= 0:
+            frame_count = len(job["frames"]) if "frames" in job else (job["end"] - job["start"] + 1 if job["start"] is not None and job["end"] is not None else 1)
+            chunks.append({"argv": job["argv"], "name": job["name"], "start": job["start"], "end": job["end"], "frame_count": frame_count})
+        elif job["output_format"] in IMAGE_FORMATS and len(job.get("frames", [])) > 1:
+            frames = job["frames"]
+            for i in range(0, len(frames), frames_per_chunk):
+                chunk_frames = frames[i:i + frames_per_chunk]
+                argv = list(job["argv"])
+                argv[argv.index("-f") + 1] = format_frame_list(chunk_frames)
+                chunks.append({"argv": argv, "name": job["name"], "start": chunk_frames[0], "end": chunk_frames[-1], "frame_count": len(chunk_frames)})
+        elif job["output_format"] not in IMAGE_FORMATS or job["start"] is None or job["end"] is None:
+            # Vídeos e frames únicos não podem ser divididos sem gerar arquivos separados
+            frame_count = job["end"] - job["start"] + 1 if job["start"] is not None and job["end"] is not None else 1
+            chunks.append({"argv": job["argv"], "name": job["name"], "start": job["start"], "end": job["end"], "frame_count": frame_count})
+        else:
+            for chunk_start, chunk_end in split_frame_range(job["start"], job["end"], frames_per_chunk):
+                argv = list(job["argv"])
+                argv[argv.index("-s") + 1] = str(chunk_start)
+                argv[argv.index("-e") + 1] = str(chunk_end)
+                chunks.append({"argv": argv, "name": job["name"], "start": chunk_start, "end": chunk_end, "frame_count": chunk_end - chunk_start + 1})
+        for key in ("env", "resolution"):
+            if job[key]:
+                for chunk in chunks[first:]:
+                    chunk[key] = job[key]
+    return chunks
+
+class ParallelRenderScheduler:
+    # Mantém N processos "blender -b" ocupados a partir de uma fila compartilhada de pedaços
+    def __init__(self, chunks, max_workers, log=print, metrics=None, echo=False, threads_per_process=0, cpu_slots=None, memory_governor=None, output_mover=None, history=None, retry_policy=None, frame_verifier=None):
+        self.chunks = chunks
+        self.max_workers = max(1, max_workers)
+        self.log = log
+        # "-t" para cada processo e, opcionalmente, um conjunto fixo de núcleos por vaga de worker
+        self.threads_per_process = threads_per_process
+        self.cpu_slots = cpu_slots
+        # A saída de cada processo é lida linha a linha para alimentar as métricas
+        self.metrics = metrics
+        self.echo = echo
+        # Admissão por memória: processos em execução ficam em self.running para o monitor ler o RSS
+        self.memory_governor = memory_governor
+        self.running = []
+        # Com saída em disco local, cada frame salvo é entregue ao OutputMover
+        self.output_mover = output_mover
+        # Tempo de cada frame, pico de memória e código de saída vão para o histórico em SQLite
+        self.history = history
+        # Pedaços com erro voltam para a fila só com os frames que faltam (ver retry.py)
+        self.retry_policy = retry_policy
+        self.quarantined = {}
+        # Cada frame salvo é conferido (integrity.py); os com defeito voltam para a fila sozinhos
+        self.frame_verifier = frame_verifier
+        self.corrupt_frames = {}
+        # Frames com defeito que ficaram no disco local: a varredura final do OutputMover não os transfere
+        self.rejected_files = set()
+        self.queue = queue.Queue()
+        self.results = []
+        self.outstanding = 0
+        self.total_chunks = 0
+        self.lock = threading.Lock()
+        self.cancelled = False
+
+    def _next_chunk(self):
+        # Com a fila vazia, espera enquanto algum processo ainda pode devolver frames para nova tentativa
+        while not self.cancelled:
+            try:
+                chunk = self.queue.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    if self.outstanding == 0:
+                        return None
+                time.sleep(0.2)
+                continue
+            wait = chunk.get("retry_at", 0.0) - time.time()
+            if wait > 0:
+                self.queue.put(chunk)
+                time.sleep(min(wait, 0.2))
+                continue
+            return chunk
+        return None
+
+    def _worker(self, slot_index):
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return
+            started = time.perf_counter()
+            returncode, recorded, queued_retries = -1, False, 0
+            try:
+                try:
+                    returncode, events = self._run_chunk(chunk, slot_index)
+                except OSError as e:
+                    self.log(f"Falha ao iniciar o pedaço {chunk['name']} {chunk['start']}-{chunk['end']}: {e}")
+                    returncode, events = -1, []
+                if returncode is None:
+                    # Devolvido à fila pelo controle de memória
+                    self.queue.put(chunk)
+                    continue
+                elapsed = time.perf_counter() - started
+                retries, quarantined = [], []
+                if returncode != 0 and self.retry_policy is not None and not self.cancelled:
+                    retries, quarantined = plan_retry(chunk, [event["frame"] for event in events], self.retry_policy)
+                with self.lock:
+                    self.results.append({"chunk": chunk, "returncode": returncode, "seconds": elapsed, "retried": bool(retries)})
+                    recorded = True
+                    self.total_chunks += len(retries)
+                    self.log(f"[{len(self.results)}/{self.total_chunks}] {chunk_label(chunk)} {chunk['start']}-{chunk['end']}: {elapsed:.1f}s ({describe_exit(returncode)})")
+                    if retries:
+                        delay = self.retry_policy.delay(max(retry["failures"] for retry in retries))
+                        self.log(f"Nova tentativa em {delay:.1f}s: " + ", ".join(f"{retry['start']}-{retry['end']}" for retry in retries))
+                        for retry in retries:
+                            self.queue.put(dict(retry, retry_at=time.time() + delay))
+                            queued_retries += 1
+                    if quarantined:
+                        entry = self.quarantined.setdefault(chunk_label(chunk), {"frames": [], "exit": ""})
+                        entry["frames"] = sorted(set(entry["frames"]) | set(quarantined))
+                        entry["exit"] = describe_exit(returncode)
+                        self.log(f"Frame(s) em quarentena: {chunk_label(chunk)} {', '.join(str(frame) for frame in quarantined)}")
+            except Exception as e:
+                # Erro inesperado (ex.: na leitura da saída do Blender): o pedaço conta como falha e a thread continua
+                self.log(f"Erro inesperado no pedaço {chunk_label(chunk)} {chunk['start']}-{chunk['end']}: {e!r}")
+            finally:
+                # Sempre fecha a contagem do pedaço: sem isso, run() esperaria para sempre por ele
+                if returncode is not None:
+                    with self.lock:
+                        if not recorded:
+                            self.results.append({"chunk": chunk, "returncode": -1, "seconds": time.perf_counter() - started, "retried": False})
+                        self.outstanding += queued_retries - 1
+                    self.queue.task_done()
+
+    def _admit(self, entry, chunk):
+        # Reserva a vaga sob o lock, para dois workers não serem admitidos com a mesma memória livre
+        if self.memory_governor is None:
+            with self.lock:
+                self.running.append(entry)
+            return
+        waiting_logged = False
+        while True:
+            with self.lock:
+                if self.cancelled or self.memory_governor.can_admit(entry["key"], self.running):
+                    self.running.append(entry)
+                    return
+            if not waiting_logged:
+                self.log(f"Aguardando memória para {entry['name']} {chunk['start']}-{chunk['end']} (pico previsto: {self.memory_governor.predicted_peak(entry['key']) / GB:.1f} GB)")
+                waiting_logged = True
+            time.sleep(1.0)
+
+    def _monitor_memory(self, workers):
+        while any(worker.is_alive() for worker in workers):
+            with self.lock:
+                started = [entry for entry in self.running if entry["process"] is not None]
+                self.memory_governor.sample(started)
+                self.memory_governor.relieve_pressure(started)
+            time.sleep(1.0)
+
+    def _run_chunk(self, chunk, slot_index):
+        entry = {"process": None, "name": chunk_label(chunk), "key": memory_job_key(chunk["argv"], chunk["name"]), "started": time.time(), "rss": 0, "peak": 0, "paused": False, "requeued": False}
+        self._admit(entry, chunk)
+        events = []
+        returncode = None
+        try:
+            argv = with_thread_count(chunk["argv"], self.threads_per_process) if self.threads_per_process else chunk["argv"]
+            env = dict(os.environ, **chunk["env"]) if chunk.get("env") else None
+            process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace", bufsize=1, env=env)
+            if self.cpu_slots:
+                pin_process(process.pid, self.cpu_slots[slot_index % len(self.cpu_slots)])
+            with self.lock:
+                entry["process"] = process
+                entry["started"] = time.time()
+            returncode = self._stream_output(chunk, process, events)
+        finally:
+            if returncode is None and entry["process"] is not None:
+                # Exceção ao ler a saída: o Blender não continua rodando sem ninguém acompanhando
+                entry["process"].kill()
+                entry["process"].wait()
+            with self.lock:
+                self.running.remove(entry)
+                if self.memory_governor is not None and entry["process"] is not None and not entry["requeued"]:
+                    self.memory_governor.record(entry["key"], entry["peak"])
+            if self.history is not None and entry["process"] is not None and not entry["requeued"]:
+                self.history.record_chunk(chunk, events, time.time() - entry["started"], returncode, entry["peak"])
+        return (None if entry["requeued"] else returncode), events
+
+    def _stream_output(self, chunk, process, events):
+        parser = FrameEventParser()
+        label = chunk_label(chunk)
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if self.echo:
+                print(f"[{label}] {line}", flush=True)
+            if self.metrics is not None:
+                event = self.metrics.feed(label, parser, line)
+            else:
+                event = parser.feed(line)
+            if event is not None:
+                events.append(event)
+            if event is not None and event["path"] and self.frame_verifier is not None:
+                self._verify_frame(chunk, event)
+            elif event is not None and event["path"] and self.output_mover is not None and "staging" in chunk:
+                self.output_mover.submit(event["path"], chunk["staging"], label)
+        process.stdout.close()
+        return process.wait()
+
+    def _verify_frame(self, chunk, event):
+        # A verificação pendente conta como trabalho em aberto: os workers esperam uma possível nova tentativa
+        with self.lock:
+            self.outstanding += 1
+        self.frame_verifier.submit(event["path"], chunk.get("resolution"), lambda result: self._frame_verified(chunk, event["frame"], result))
+
+    def _frame_verified(self, chunk, frame, result):
+        label = chunk_label(chunk)
+        if not result["corrupt"]:
+            # Imagem íntegra com tamanho diferente do esperado (ex.: ajuste não lido do .blend): só é informada
+            if not result["ok"]:
+                self.log(f"Frame com tamanho diferente do esperado: {label} {frame} ({result['reason']})")
+            # Com saída em disco local, só frames íntegros vão para a pasta final
+            if self.output_mover is not None and "staging" in chunk:
+                self.output_mover.submit(result["path"], chunk["staging"], label)
+            with self.lock:
+                self.outstanding -= 1
+            return
+        # O worker persistente não recebe frames avulsos; sem política de novas tentativas, o frame só é informado
+        can_retry = self.retry_policy is not None and frame is not None and ("-f" in chunk["argv"] or "-s" in chunk["argv"])
+        with self.lock:
+            failures = self.corrupt_frames[(label, frame)] = self.corrupt_frames.get((label, frame), 0) + 1
+            self.log(f"Frame com defeito: {label} {frame} ({result['reason']})")
+            if can_retry and failures < self.retry_policy.max_attempts and not self.cancelled:
+                # O Blender pode não sobrescrever um arquivo existente: o arquivo truncado é apagado antes de renderizar de novo
+                try:
+                    os.remove(result["path"])
+                except OSError:
+                    pass
+                self.total_chunks += 1
+                self.outstanding += 1
+                self.queue.put(frames_chunk(chunk, [frame], chunk.get("attempt", 0) + 1, failures))
+            else:
+                # Sem nova tentativa o arquivo fica onde está; com saída em disco local, fica fora da pasta final
+                if self.output_mover is not None and "staging" in chunk:
+                    self.rejected_files.add(os.path.abspath(result["path"]))
+                if not self.cancelled and frame is not None:
+                    entry = self.quarantined.setdefault(label, {"frames": [], "exit": ""})
+                    entry["frames"] = sorted(set(entry["frames"]) | {frame})
+                    entry["exit"] = f"arquivo com defeito: {result['reason']}"
+                    entry.setdefault("files", []).append(result["path"])
+                    self.log(f"Frame(s) em quarentena: {label} {frame} (arquivo mantido em {result['path']})")
+            self.outstanding -= 1
+
+    def run(self):
+        self.outstanding = self.total_chunks = len(self.chunks)
+        for chunk in self.chunks:
+            self.queue.put(chunk)
+            if self.metrics is not None:
+                self.metrics.add_job(chunk_label(chunk), chunk["frame_count"])
+        started = time.perf_counter()
+        workers = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(min(self.max_workers, len(self.chunks)))]
+        for worker in workers:
+            worker.start()
+        if self.memory_governor is not None:
+            monitor = threading.Thread(target=self._monitor_memory, args=(workers,), daemon=True)
+            monitor.start()
+        for worker in workers:
+            worker.join()
+        if self.memory_governor is not None:
+            monitor.join()
+            self.memory_governor.save()
+        if self.frame_verifier is not None:
+            self.frame_verifier.close()
+        if self.output_mover is not None:
+            from .staging import cleanup_staging
+
+            for chunk in {chunk["staging"]["scratch_dir"]: chunk for chunk in self.chunks if "staging" in chunk}.values():
+                self.output_mover.sweep(chunk["staging"], chunk_label(chunk), self.rejected_files)
+            self.output_mover.close()
+            cleanup_staging(self.chunks)
+        wall_time = time.perf_counter() - started
+        serial_time = sum(result["seconds"] for result in self.results)
+        summary = {
+            "chunks": len(self.chunks),
+            "failed": sum(1 for result in self.results if result["returncode"] != 0 and not result["retried"]),
+            "retries": self.total_chunks - len(self.chunks),
+            "quarantined": self.quarantined,
+            "corrupt_frames": len(self.corrupt_frames),
+            "wall_time": wall_time,
+            "serial_time": serial_time,
+            "speedup": serial_time / wall_time if wall_time > 0 else 1.0,
+        }
+        if self.metrics is not None:
+            self.metrics.write_summary(summary)
+        return summary
@@ -0,0 +1,120 @@
+import csv
+import itertools
+import json
+import os
+
+# --- Listas de Planos: Importação e Exportação de Câmeras e Cenas em CSV ou JSON ---
+# Uma linha por plano: nome, frame inicial, frame final e, opcionalmente, um motor de render e uma pasta de
+# saída próprios (vazios = configurações gerais). O CSV pode usar vírgula, ponto e vírgula ou tab:
+#   name;start_frame;end_frame;render_engine;output_path
+#   CamA;1;120;;
+#   CamB;121;240;EEVEE;/renders/camB
+# O arquivo inteiro é conferido de uma vez e todos os problemas são informados juntos.
+SHOT_FIELDS = ("name", "start_frame", "end_frame", "render_engine", "output_path")
+SHOT_FIELD_ALIASES = {"start": "start_frame", "end": "end_frame", "engine": "render_engine", "output": "output_path"}
+SHOT_ENGINES = ("CYCLES", "EEVEE", "WORKBENCH")
+MAX_REPORTED_ERRORS = 10
+
+class ShotListError(Exception):
+    pass
+
+def validate_shots(items, item_label, numbers=None):
+    # Confere todos os itens e devolve a lista de problemas (vazia se estiver tudo certo)
+    errors = []
+    for i, item in zip(numbers or itertools.count(1), items):
+        name = item.get("name", "")
+        where = f"{item_label} {i}" + (f" ({name})" if name else "")
+        start_frame, end_frame = item.get("start_frame"), item.get("end_frame")
+        if not name:
+            errors.append(f"{where}: nome obrigatório")
+        has_numbers = True
+        for value, label in ((start_frame, "Frame Inicial"), (end_frame, "Frame Final")):
+            if not isinstance(value, int) or isinstance(value, bool):
+                errors.append(f"{where}: {label} não é um número ({value!r})")
+                has_numbers = False
+        if has_numbers and start_frame < 1:
+            errors.append(f"{where}: Frame Inicial inválido ({start_frame})")
+        elif has_numbers and end_frame < start_frame:
+            errors.append(f"{where}: Frame Final inválido ({end_frame}, menor que o Frame Inicial {start_frame})")
+        engine = item.get("render_engine", "")
+        if engine and engine not in SHOT_ENGINES:
+            errors.append(f"{where}: motor de render desconhecido ({engine}; use {', '.join(SHOT_ENGINES)} ou deixe vazio)")
+    return errors
+
+def format_shot_errors(errors, source):
+    shown = "; ".join(errors[:MAX_REPORTED_ERRORS])
+    more = f"; ... e mais {len(errors) - MAX_REPORTED_ERRORS}" if len(errors) > MAX_REPORTED_ERRORS else ""
+    return f"{len(errors)} problema(s) {source}: {shown}{more}"
+
+def _shot_from_row(row):
+    # Valores que não são números ficam como estão e são informados por validate_shots
+    shot = {"name": str(row.get("name") or "").strip(), "render_engine": str(row.get("render_engine") or "").strip().upper(), "output_path": str(row.get("output_path") or "").strip()}
+    for key in ("start_frame", "end_frame"):
+        value = row.get(key)
+        try:
+            shot[key] = int(value)
+        except (TypeError, ValueError):
+            # Planilhas costumam gravar números inteiros como "12.0"
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                number = None
+            shot[key] = int(number) if number is not None and number.is_integer() else value
+    return shot
+
+def _read_rows(path):
+    # Devolve (linhas como dicionários, número de cada linha no arquivo, nome usado nas mensagens)
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            keys = [key for key in ("shots", "cameras", "scenes") if key in data]
+            if len(keys) != 1:
+                raise ShotListError("O JSON deve ser uma lista de planos ou um objeto com \"shots\", \"cameras\" ou \"scenes\".")
+            data = data[keys[0]]
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ShotListError("O JSON deve ser uma lista de objetos com name, start_frame e end_frame.")
+        return data, list(range(1, len(data) + 1)), "item"
+    # utf-8-sig: arquivos salvos pelo Excel começam com BOM
+    with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+        text = handle.read()
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(text.splitlines(), dialect=dialect)
+    reader.fieldnames = [SHOT_FIELD_ALIASES.get(field.strip().lower(), field.strip().lower()) for field in reader.fieldnames or []]
+    rows, numbers = [], []
+    for row in reader:
+        # Linhas só com separadores (comuns no fim de planilhas) são ignoradas
+        if any((value or "").strip() for value in row.values() if isinstance(value, str)):
+            rows.append(row)
+            numbers.append(reader.line_num)
+    return rows, numbers, "linha"
+
+def read_shot_list(path):
+    rows, numbers, item_label = _read_rows(path)
+    errors = []
+    fields = set(field for row in rows for field in row if field is not None)
+    unknown = sorted(fields - set(SHOT_FIELDS) - set(SHOT_FIELD_ALIASES))
+    if unknown:
+        errors.append(f"coluna(s) desconhecida(s): {', '.join(unknown)} (use {', '.join(SHOT_FIELDS)})")
+    rows = [{SHOT_FIELD_ALIASES.get(key, key): value for key, value in row.items()} for row in rows]
+    shots = [_shot_from_row(row) for row in rows]
+    errors += validate_shots(shots, item_label, numbers)
+    if errors:
+        raise ShotListError(format_shot_errors(errors, f"em {os.path.basename(path)}"))
+    return shots
+
+def write_shot_list(shots, path):
+    if path.lower().endswith(".json"):
+        # No JSON, só os campos preenchidos
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump([{key: shot[key] for key in SHOT_FIELDS if shot.get(key) not in (None, "")} for shot in shots], handle, indent=2, ensure_ascii=False)
+        return path
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=SHOT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for shot in shots:
+            writer.writerow({key: shot.get(key, "") for key in SHOT_FIELDS})
+    return path
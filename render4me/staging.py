@@ -0,0 +1,152 @@
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+import time
+
+# --- Saída em Disco Local com Transferência em Segundo Plano ---
+# O Blender grava cada frame numa pasta local rápida (tmpfs/NVMe) em vez do compartilhamento de rede;
+# um grupo de threads copia os arquivos prontos para a pasta final através de uma fila limitada,
+# conferindo o checksum e tentando de novo em caso de erro.
+COPY_BLOCK = 4 * 1024 * 1024
+
+def default_staging_dir():
+    return os.path.join(tempfile.gettempdir(), "render4me_stage")
+
+def stage_chunks(chunks, staging_dir):
+    # Troca a pasta do "-o" de cada pedaço por uma pasta local; a pasta final fica em chunk["staging"]
+    staged = []
+    for chunk in chunks:
+        argv = list(chunk["argv"])
+        # Segmentos de vídeo já são gravados numa pasta de trabalho local
+        if "-o" not in argv or "-b" not in argv or "video" in chunk:
+            staged.append(chunk)
+            continue
+        output = argv[argv.index("-o") + 1]
+        if output.startswith("//"):
+            output = os.path.join(os.path.dirname(os.path.abspath(argv[argv.index("-b") + 1])), output[2:])
+        final_dir, pattern = os.path.split(os.path.abspath(output))
+        scratch_dir = os.path.join(staging_dir, hashlib.sha1(final_dir.encode("utf-8")).hexdigest()[:12])
+        argv[argv.index("-o") + 1] = os.path.join(scratch_dir, pattern)
+        staged.append(dict(chunk, argv=argv, staging={"scratch_dir": scratch_dir, "final_dir": final_dir}))
+    return staged
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(COPY_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class OutputMover:
+    def __init__(self, threads=4, queue_size=64, retries=3, log=print):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.retries = retries
+        self.log = log
+        self.lock = threading.Lock()
+        self.submitted = set()
+        self.stats = {}
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(max(1, threads))]
+        for thread in self.threads:
+            thread.start()
+
+    def _job_stats(self, job):
+        return self.stats.setdefault(job, {"files": 0, "bytes": 0, "failed": 0, "move_seconds": 0.0, "queue_wait_seconds": 0.0})
+
+    def submit(self, path, staging, job):
+        # Bloqueia quando a fila está cheia: o tempo de espera é contabilizado no job
+        source = os.path.abspath(path)
+        with self.lock:
+            if source in self.submitted:
+                return
+            self.submitted.add(source)
+        dest = os.path.join(staging["final_dir"], os.path.relpath(source, staging["scratch_dir"]))
+        started = time.perf_counter()
+        self.queue.put((source, dest, job))
+        waited = time.perf_counter() - started
+        with self.lock:
+            self._job_stats(job)["queue_wait_seconds"] += waited
+
+    def sweep(self, staging, job, exclude=()):
+        # Arquivos que não apareceram numa linha "Saved:" (vídeos, passes extras) são enviados no final;
+        # os de "exclude" (caminhos absolutos recusados pelo agendador) ficam no disco local
+        for root, _, names in os.walk(staging["scratch_dir"]):
+            for name in names:
+                path = os.path.join(root, name)
+                if not name.endswith(".part") and os.path.abspath(path) not in exclude:
+                    self.submit(path, staging, job)
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            source, dest, job = item
+            started = time.perf_counter()
+            size = self._move(source, dest)
+            with self.lock:
+                stats = self._job_stats(job)
+                stats["move_seconds"] += time.perf_counter() - started
+                if size is None:
+                    stats["failed"] += 1
+                else:
+                    stats["files"] += 1
+                    stats["bytes"] += size
+                self.submitted.discard(source)
+            self.queue.task_done()
+
+    def _move(self, source, dest):
+        for attempt in range(1, self.retries + 1):
+            try:
+                size = os.path.getsize(source)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                if os.stat(source).st_dev == os.stat(os.path.dirname(dest)).st_dev:
+                    os.replace(source, dest)
+                    return size
+                # Outro disco: copia para ".part", confere o checksum do destino e só então troca o nome
+                temp_path = dest + ".part"
+                digest = hashlib.sha256()
+                with open(source, "rb") as src, open(temp_path, "wb") as dst:
+                    for block in iter(lambda: src.read(COPY_BLOCK), b""):
+                        digest.update(block)
+                        dst.write(block)
+                if _file_digest(temp_path) != digest.hexdigest():
+                    raise OSError("checksum diferente após a cópia")
+                os.replace(temp_path, dest)
+                os.remove(source)
+                return size
+            except OSError as e:
+                self.log(f"Transferência de {os.path.basename(source)} falhou (tentativa {attempt}/{self.retries}): {e}")
+                if attempt < self.retries:
+                    time.sleep(0.5 * 2 ** attempt)
+        return None
+
+    def close(self):
+        # Espera a fila esvaziar e encerra as threads; devolve as estatísticas por job
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        return self.stats
+
+def format_staging_report(stats, metrics_snapshots=()):
+    # "Saving" do Blender = tempo em que o render ficou parado gravando o arquivo (agora no disco local)
+    saving = {snapshot["job"]: snapshot["saving_seconds"] for snapshot in metrics_snapshots}
+    lines = []
+    for job, job_stats in sorted(stats.items()):
+        lines.append(
+            f"{job}: {job_stats['files']} arquivo(s), {job_stats['bytes'] / 1024 ** 2:.1f} MB transferidos em {job_stats['move_seconds']:.1f}s; "
+            f"gravação bloqueada {saving.get(job, 0.0):.1f}s, fila cheia {job_stats['queue_wait_seconds']:.1f}s, falhas: {job_stats['failed']}"
+        )
+    return lines
+
+def cleanup_staging(chunks):
+    # Remove só as pastas vazias: arquivos com falha de transferência ou recusados ficam no disco local
+    for scratch_dir in {chunk["staging"]["scratch_dir"] for chunk in chunks if "staging" in chunk}:
+        for root, _, _ in os.walk(scratch_dir, topdown=False):
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import subprocess
+import time
+
+from .frames import FORMAT_EXTENSIONS, IMAGE_FORMATS
+from .paths import render4me_data_dir
+from .scheduler import build_render_chunks, parse_render_command
+
+# --- Still em Tiles: Regiões do Mesmo Frame em Processos Paralelos ---
+# Um comando de frame único ("-f N" com formato de imagem) vira uma grade de regiões (border + crop),
+# cada uma renderizada por um processo. As regiões se sobrepõem em alguns pixels: na montagem, feita
+# pelo próprio Blender (bpy + numpy, que leem PNG, EXR e TIFF), cada tile contribui só com a sua parte
+# da grade e a sobreposição serve para conferir as emendas entre tiles vizinhos.
+DEFAULT_TILE_OVERLAP = 8
+# Diferença média aceita na sobreposição (1/255 = um nível de cor em 8 bits)
+SEAM_TOLERANCE = 1.0 / 255
+
+BLENDER_FORMATS = {"PNG": "PNG", "JPEG": "JPEG", "EXR": "OPEN_EXR", "TIFF": "TIFF", "BMP": "BMP"}
+
+# Executado dentro de cada processo, depois de "-o"/"-F" e antes de "-f": calcula a região em pixels
+# com a resolução da própria cena e grava a posição do tile para a montagem
+TILE_EXPRESSION_TEMPLATE = """import json
+import bpy
+render = bpy.context.scene.render
+width = render.resolution_x * render.resolution_percentage // 100
+height = render.resolution_y * render.resolution_percentage // 100
+column, row, columns, rows, overlap = __GRID__
+core = [column * width // columns, (column + 1) * width // columns, row * height // rows, (row + 1) * height // rows]
+region = [max(0, core[0] - overlap), min(width, core[1] + overlap), max(0, core[2] - overlap), min(height, core[3] + overlap)]
+render.use_border = True
+render.use_crop_to_border = True
+# O Blender trunca border * resolução; o +0.25 evita perder um pixel no arredondamento do float
+render.border_min_x, render.border_max_x = (region[0] + 0.25) / width, min(1.0, (region[1] + 0.25) / width)
+render.border_min_y, render.border_max_y = (region[2] + 0.25) / height, min(1.0, (region[3] + 0.25) / height)
+with open(__META__, "w", encoding="utf-8") as handle:
+    json.dump({"width": width, "height": height, "core": core, "region": region}, handle)
+"""
+
+STITCH_SCRIPT_TEMPLATE = """import json
+import bpy
+import numpy as np
+
+SPEC = json.loads(__SPEC__)
+
+def load_pixels(path):
+    image = bpy.data.images.load(path)
+    width, height = image.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    is_float = image.is_float
+    bpy.data.images.remove(image)
+    return pixels.reshape(height, width, 4), is_float
+
+tiles = []
+for tile in SPEC["tiles"]:
+    with open(tile["meta"], "r", encoding="utf-8") as handle:
+        meta = json.load(handle)
+    pixels, is_float = load_pixels(tile["image"])
+    x0, x1, y0, y1 = meta["region"]
+    if pixels.shape[:2] != (y1 - y0, x1 - x0):
+        raise SystemExit(f"Render4Me: tile {tile['image']} com {pixels.shape[1]}x{pixels.shape[0]} px, esperado {x1 - x0}x{y1 - y0} px")
+    tiles.append(dict(meta, pixels=pixels, is_float=is_float, name=tile["name"]))
+
+width, height = tiles[0]["width"], tiles[0]["height"]
+canvas = np.zeros((height, width, 4), dtype=np.float32)
+covered = np.zeros((height, width), dtype=bool)
+for tile in tiles:
+    x0, x1, y0, y1 = tile["region"]
+    c0, c1, d0, d1 = tile["core"]
+    canvas[d0:d1, c0:c1] = tile["pixels"][d0 - y0:d1 - y0, c0 - x0:c1 - x0]
+    covered[d0:d1, c0:c1] = True
+
+# Emendas: os pixels que dois tiles vizinhos renderizaram em comum devem ser iguais
+seams = []
+for i, first in enumerate(tiles):
+    for second in tiles[i + 1:]:
+        x0, x1 = max(first["region"][0], second["region"][0]), min(first["region"][1], second["region"][1])
+        y0, y1 = max(first["region"][2], second["region"][2]), min(first["region"][3], second["region"][3])
+        if x1 <= x0 or y1 <= y0:
+            continue
+        a = first["pixels"][y0 - first["region"][2]:y1 - first["region"][2], x0 - first["region"][0]:x1 - first["region"][0]]
+        b = second["pixels"][y0 - second["region"][2]:y1 - second["region"][2], x0 - second["region"][0]:x1 - second["region"][0]]
+        difference = np.abs(a - b)
+        seams.append({"tiles": [first["name"], second["name"]], "pixels": int(difference.shape[0] * difference.shape[1]), "mean": float(difference.mean()), "max": float(difference.max())})
+
+is_float = any(tile["is_float"] for tile in tiles)
+image = bpy.data.images.new("render4me_stitch", width, height, alpha=True, float_buffer=is_float)
+image.pixels.foreach_set(canvas.ravel())
+image.filepath_raw = SPEC["output"]
+image.file_format = SPEC["file_format"]
+image.save()
+print("Render4Me stitch: " + json.dumps({"width": width, "height": height, "uncovered": int((~covered).sum()), "seams": seams}), flush=True)
+"""
+
+class TileStitchError(Exception):
+    # Falha ao montar o still; os tiles são mantidos para inspeção
+    pass
+
+def parse_tile_grid(value):
+    # "4x3" = 4 colunas por 3 linhas; "4" = 4x4
+    columns, _, rows = value.lower().partition("x")
+    try:
+        columns, rows = int(columns), int(rows or columns)
+    except ValueError:
+        raise ValueError(f"Grade de tiles inválida: {value}")
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Grade de tiles inválida: {value}")
+    return columns, rows
+
+def _still_output_path(argv, frame):
+    # Mesmo nome que o Blender daria ao frame inteiro: "#" viram o número do frame e a extensão é acrescentada
+    output = argv[argv.index("-o") + 1] if "-o" in argv else "//"
+    if output.startswith("//"):
+        blend_file = argv[argv.index("-b") + 1]
+        output = os.path.join(os.path.dirname(os.path.abspath(blend_file)), output[2:])
+    hashes = len(output) - len(output.rstrip("#"))
+    if hashes:
+        output = output[:-hashes] + f"{frame:0{hashes}d}"
+    else:
+        output += f"{frame:04d}"
+    return output + FORMAT_EXTENSIONS[argv[argv.index("-F") + 1]]
+
+def plan_tile_chunks(commands, columns, rows, overlap=DEFAULT_TILE_OVERLAP, work_root=None):
+    # Divide os comandos de frame único em tiles; os demais comandos seguem o caminho normal
+    work_root = work_root or os.path.join(render4me_data_dir(), "tiles", f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+    chunks, stitches = [], []
+    for command in commands:
+        job = parse_render_command(command)
+        argv = job["argv"]
+        if columns * rows <= 1 or job["output_format"] not in IMAGE_FORMATS or len(job.get("frames", [])) != 1 or "-a" in argv:
+            chunks.extend(build_render_chunks([command], 0))
+            continue
+        frame = job["frames"][0]
+        work_dir = os.path.join(work_root, f"still_{len(stitches) + 1:02d}")
+        stitch = {
+            "name": job["name"],
+            "blender": argv[0],
+            "argv": argv,
+            "frame": frame,
+            "output": _still_output_path(argv, frame),
+            "file_format": BLENDER_FORMATS[job["output_format"]],
+            "work_dir": work_dir,
+            "tiles": [],
+        }
+        for row in range(rows):
+            for column in range(columns):
+                name = f"tile_{column}_{row}"
+                meta_path = os.path.join(work_dir, f"{name}.json")
+                expression = TILE_EXPRESSION_TEMPLATE.replace("__GRID__", repr((column, row, columns, rows, overlap))).replace("__META__", repr(meta_path))
+                tile_argv = list(argv)
+                tile_argv[tile_argv.index("-o") + 1] = os.path.join(work_dir, f"{name}_####")
+                tile_argv[tile_argv.index("-f"):tile_argv.index("-f")] = ["--python-expr", expression]
+                stitch["tiles"].append({
+                    "name": name,
+                    "meta": meta_path,
+                    "image": os.path.join(work_dir, f"{name}_{frame:04d}{FORMAT_EXTENSIONS[job['output_format']]}"),
+                })
+                label = f"{job['name']} {name}" if job["name"] else name
+                chunks.append({"argv": tile_argv, "name": label, "start": frame, "end": frame, "frame_count": 1, "tile": len(stitches)})
+        os.makedirs(work_dir, exist_ok=True)
+        stitches.append(stitch)
+    return chunks, stitches
+
+def stitch_tiles(stitch, log=print):
+    # Monta o still num processo do Blender em segundo plano; devolve o resultado das emendas
+    spec = {"tiles": stitch["tiles"], "output": stitch["output"], "file_format": stitch["file_format"]}
+    script_path = os.path.join(stitch["work_dir"], "stitch.py")
+    with open(script_path, "w", encoding="utf-8") as handle:
+        handle.write(STITCH_SCRIPT_TEMPLATE.replace("__SPEC__", repr(json.dumps(spec))))
+    os.makedirs(os.path.dirname(os.path.abspath(stitch["output"])), exist_ok=True)
+    result = subprocess.run([stitch["blender"], "-b", "--factory-startup", "--python-exit-code", "1", "--python", script_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+    report = None
+    for line in result.stdout.splitlines():
+        if line.startswith("Render4Me stitch: "):
+            report = json.loads(line[len("Render4Me stitch: "):])
+    if result.returncode != 0 or report is None:
+        details = [line for line in result.stdout.splitlines() if line.startswith("Render4Me") or "Error" in line]
+        raise TileStitchError(f"Falha ao montar os tiles em {stitch['output']}: {' '.join(details[-3:]) or f'código {result.returncode}'}")
+    if report["uncovered"]:
+        raise TileStitchError(f"{report['uncovered']} pixel(s) sem tile em {stitch['output']} (tiles mantidos em {stitch['work_dir']}).")
+    bad_seams = [seam for seam in report["seams"] if seam["mean"] > SEAM_TOLERANCE]
+    for seam in bad_seams:
+        log(f"Emenda visível entre {seam['tiles'][0]} e {seam['tiles'][1]}: diferença média {seam['mean'] * 255:.1f}/255, máxima {seam['max'] * 255:.1f}/255")
+    log(f"Still montado com {len(stitch['tiles'])} tile(s) ({report['width']}x{report['height']} px, {len(report['seams'])} emenda(s) conferida(s)): {stitch['output']}")
+    return dict(report, output=stitch["output"], bad_seams=bad_seams)
+
+def stitch_stills(stitches, results, log=print):
+    # Monta os stills cujos tiles terminaram sem erro; devolve (relatórios, segundos gastos)
+    if not stitches:
+        return [], 0.0
+    started = time.perf_counter()
+    failed = {result["chunk"]["tile"] for result in results if result["returncode"] != 0 and not result["retried"] and "tile" in result["chunk"]}
+    reports = []
+    for index, stitch in enumerate(stitches):
+        if index in failed:
+            log(f"Still {stitch['output']} não montado: há tiles com falha (arquivos mantidos em {stitch['work_dir']}).")
+            continue
+        reports.append(stitch_tiles(stitch, log))
+        if not reports[-1]["bad_seams"]:
+            shutil.rmtree(stitch["work_dir"], ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(stitch["work_dir"]))
+            except OSError:
+                pass
+    return reports, time.perf_counter() - started
+
+def single_process_seconds(stitches, summary, history=None):
+    # Tempo do still num só processo: medido pelo histórico quando já foi renderizado inteiro, senão estimado pela soma dos tiles
+    if history is not None:
+        measured = [history.predict_chunk_seconds({"argv": stitch["argv"], "name": stitch["name"], "start": stitch["frame"], "end": stitch["frame"], "frame_count": 1}) for stitch in stitches]
+        if measured and all(seconds is not None for seconds in measured):
+            return sum(measured), "histórico"
+    return summary["serial_time"], "estimado"
+
+def format_tile_report(summary, stitch_seconds, still_count, single_seconds, origin):
+    total = summary["wall_time"] + stitch_seconds
+    return (
+        f"{still_count} still(s) em tiles em {total:.1f}s (render {summary['wall_time']:.1f}s + montagem {stitch_seconds:.1f}s); "
+        f"processo único ({origin}): {single_seconds:.1f}s, speedup {single_seconds / total if total > 0 else 1.0:.2f}x"
+    )
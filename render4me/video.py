@@ -0,0 +1,171 @@
+import os
+import shutil
+import subprocess
+import time
+
+from .frames import IMAGE_FORMATS, split_frame_range
+from .paths import render4me_data_dir
+from .scheduler import build_render_chunks, parse_render_command
+
+# --- Vídeo em Paralelo: Pedaços Renderizados Separadamente e Unidos no Final ---
+# SEGMENTS: cada pedaço vira um vídeo curto no formato pedido; os segmentos são unidos
+#           pelo concat do ffmpeg copiando os streams (sem recodificar) quando o formato permite.
+# IMAGES:   cada pedaço vira uma sequência PNG; o vídeo é codificado uma única vez no final.
+VIDEO_MODES = ("SEGMENTS", "IMAGES")
+
+# Formatos cujos segmentos podem ser concatenados sem recodificar (todos começam em um quadro-chave).
+# O Ogg Theora não tem timestamps confiáveis para o concat e é sempre recodificado.
+STREAM_COPY_FORMATS = {"FFMPEG", "H264", "MPEG", "AVI_JPEG"}
+
+# Encoder e extensão usados ao codificar (modo IMAGES ou quando a cópia de streams falha)
+FORMAT_ENCODERS = {
+    "FFMPEG": ("libx264", ".mkv"),
+    "H264": ("libx264", ".mp4"),
+    "MPEG": ("mpeg2video", ".mpg"),
+    "AVI_JPEG": ("mjpeg", ".avi"),
+    "OGV": ("libtheora", ".ogv"),
+}
+
+class VideoAssemblyError(Exception):
+    # Falha ao unir os pedaços; os arquivos temporários são mantidos para inspeção
+    pass
+
+def find_ffmpeg(ffmpeg_path=""):
+    path = ffmpeg_path or os.environ.get("RENDER4ME_FFMPEG") or shutil.which("ffmpeg")
+    if not path:
+        raise VideoAssemblyError("ffmpeg não encontrado. Instale-o ou informe o caminho do executável.")
+    if not os.path.isfile(path):
+        raise VideoAssemblyError(f"Executável do ffmpeg não encontrado: {path}")
+    return path
+
+def _option_value(argv, flag, default=None):
+    return argv[argv.index(flag) + 1] if flag in argv and argv.index(flag) + 1 < len(argv) else default
+
+def _resolve_blender_path(path, blend_file_path):
+    # "//" é relativo à pasta do .blend
+    if path.startswith("//"):
+        return os.path.join(os.path.dirname(os.path.abspath(blend_file_path)), path[2:])
+    return path
+
+def plan_video_chunks(commands, frames_per_chunk, mode="SEGMENTS", work_root=None):
+    # Divide os comandos de vídeo em pedaços paralelos; comandos de imagem seguem o caminho normal
+    work_root = work_root or os.path.join(render4me_data_dir(), "video", f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+    chunks, assemblies = [], []
+    for command in commands:
+        job = parse_render_command(command)
+        if job["output_format"] in IMAGE_FORMATS or job["start"] is None or job["end"] is None or frames_per_chunk <= 0:
+            chunks.extend(build_render_chunks([command], frames_per_chunk))
+            continue
+        argv = job["argv"]
+        work_dir = os.path.join(work_root, f"video_{len(assemblies) + 1:02d}")
+        assembly = {
+            "name": job["name"],
+            "output_format": job["output_format"],
+            "output": _resolve_blender_path(_option_value(argv, "-o", "//"), _option_value(argv, "-b", "")),
+            "start": job["start"],
+            "end": job["end"],
+            "mode": mode,
+            "video_codec": _option_value(argv, "-vcodec", ""),
+            "fps": int(_option_value(argv, "-fps", "0")),
+            "work_dir": work_dir,
+            "segments": [],
+        }
+        for chunk_start, chunk_end in split_frame_range(job["start"], job["end"], frames_per_chunk):
+            chunk_argv = list(argv)
+            chunk_argv[chunk_argv.index("-s") + 1] = str(chunk_start)
+            chunk_argv[chunk_argv.index("-e") + 1] = str(chunk_end)
+            segment_dir = os.path.join(work_dir, f"{chunk_start:06d}-{chunk_end:06d}")
+            if mode == "IMAGES":
+                chunk_argv[chunk_argv.index("-o") + 1] = os.path.join(work_dir, "frames", "frame_####")
+                chunk_argv[chunk_argv.index("-F") + 1] = "PNG"
+                if "-vcodec" in chunk_argv:
+                    del chunk_argv[chunk_argv.index("-vcodec"):chunk_argv.index("-vcodec") + 2]
+            else:
+                # Uma pasta por segmento: o Blender acrescenta o range e a extensão ao nome do vídeo
+                chunk_argv[chunk_argv.index("-o") + 1] = os.path.join(segment_dir, "segment_")
+                assembly["segments"].append(segment_dir)
+            chunks.append({"argv": chunk_argv, "name": job["name"], "start": chunk_start, "end": chunk_end, "frame_count": chunk_end - chunk_start + 1, "video": len(assemblies)})
+        assemblies.append(assembly)
+    return chunks, assemblies
+
+def _segment_file(segment_dir):
+    try:
+        names = sorted(name for name in os.listdir(segment_dir) if name.startswith("segment_"))
+    except OSError:
+        names = []
+    if not names:
+        raise VideoAssemblyError(f"Nenhum segmento de vídeo encontrado em {segment_dir}.")
+    return os.path.join(segment_dir, names[0])
+
+def _run_ffmpeg(ffmpeg, args):
+    result = subprocess.run([ffmpeg, "-hide_banner", "-loglevel", "error", "-y"] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace")
+    return result.returncode, result.stderr.strip()
+
+def assemble_video(assembly, ffmpeg, log=print):
+    # Une os pedaços de um job no arquivo final, com o mesmo nome que o Blender daria ao vídeo inteiro
+    encoder, extension = FORMAT_ENCODERS[assembly["output_format"]]
+    encoder = assembly["video_codec"] or encoder
+    frame_range = f"{assembly['start']:04d}-{assembly['end']:04d}"
+    rate_args = ["-r", str(assembly["fps"])] if assembly["fps"] else []
+    if assembly["mode"] == "IMAGES":
+        output_path = f"{assembly['output']}{frame_range}{extension}"
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        returncode, error = _run_ffmpeg(ffmpeg, [
+            "-framerate", str(assembly["fps"] or 24), "-start_number", str(assembly["start"]),
+            "-i", os.path.join(assembly["work_dir"], "frames", "frame_%04d.png"),
+            "-c:v", encoder, "-pix_fmt", "yuv420p" if encoder != "mjpeg" else "yuvj420p", output_path,
+        ])
+        if returncode != 0:
+            raise VideoAssemblyError(f"ffmpeg falhou ao codificar {output_path}: {error}")
+        log(f"Vídeo codificado a partir das imagens: {output_path}")
+        return output_path
+
+    segments = [_segment_file(segment_dir) for segment_dir in assembly["segments"]]
+    output_path = f"{assembly['output']}{frame_range}{os.path.splitext(segments[0])[1] or extension}"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    list_path = os.path.join(assembly["work_dir"], "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as handle:
+        for segment in segments:
+            escaped = os.path.abspath(segment).replace("'", "'\\''")
+            handle.write(f"file '{escaped}'\n")
+    concat_args = ["-f", "concat", "-safe", "0", "-i", list_path]
+    if assembly["output_format"] in STREAM_COPY_FORMATS:
+        returncode, error = _run_ffmpeg(ffmpeg, concat_args + ["-c", "copy", output_path])
+        if returncode == 0:
+            log(f"{len(segments)} segmento(s) unidos sem recodificar: {output_path}")
+            return output_path
+        log(f"Não foi possível unir os segmentos copiando os streams ({error}); recodificando.")
+    returncode, error = _run_ffmpeg(ffmpeg, concat_args + rate_args + ["-c:v", encoder, "-c:a", "copy", output_path])
+    if returncode != 0:
+        raise VideoAssemblyError(f"ffmpeg falhou ao unir os segmentos em {output_path}: {error}")
+    log(f"{len(segments)} segmento(s) recodificados em: {output_path}")
+    return output_path
+
+def assemble_videos(assemblies, results, ffmpeg_path="", log=print):
+    # Monta os vídeos cujos pedaços terminaram sem erro; devolve (arquivos gerados, segundos gastos)
+    if not assemblies:
+        return [], 0.0
+    started = time.perf_counter()
+    ffmpeg = find_ffmpeg(ffmpeg_path)
+    failed = {result["chunk"]["video"] for result in results if result["returncode"] != 0 and not result["retried"] and "video" in result["chunk"]}
+    outputs = []
+    for index, assembly in enumerate(assemblies):
+        if index in failed:
+            log(f"Vídeo {assembly['name'] or assembly['output']} não montado: há pedaços com falha (arquivos mantidos em {assembly['work_dir']}).")
+            continue
+        outputs.append(assemble_video(assembly, ffmpeg, log))
+        shutil.rmtree(assembly["work_dir"], ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(assembly["work_dir"]))
+        except OSError:
+            pass
+    return outputs, time.perf_counter() - started
+
+def format_video_report(summary, assembly_seconds, video_count):
+    # O caminho de processo único é estimado pela soma dos tempos dos pedaços
+    total = summary["wall_time"] + assembly_seconds
+    single = summary["serial_time"]
+    return (
+        f"{video_count} vídeo(s) em {total:.1f}s (render {summary['wall_time']:.1f}s + união {assembly_seconds:.1f}s); "
+        f"processo único estimado: {single:.1f}s, speedup {single / total if total > 0 else 1.0:.2f}x"
+    )
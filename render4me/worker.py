@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+
+from .holds import HOLD_LINK_FUNCTION
+from .paths import render4me_data_dir
+from .profiles import PROFILE_FUNCTION
+
+# --- Worker Persistente: Um Processo Carrega o .blend e Renderiza Todos os Jobs ---
+# Script executado pelo Blender em segundo plano ("blender -b --python script.py").
+# O arquivo é aberto pelo próprio script para medir o tempo de carregamento.
+PERSISTENT_WORKER_TEMPLATE = """import json
+import time
+import bpy
+
+SPEC = json.loads(__SPEC__)
+
+FILE_FORMATS = {"PNG": "PNG", "JPEG": "JPEG", "EXR": "OPEN_EXR", "TIFF": "TIFF", "BMP": "BMP", "AVI_JPEG": "AVI_JPEG"}
+FFMPEG_CONTAINERS = {"FFMPEG": None, "H264": "MPEG4", "MPEG": "MPEG2", "OGV": "OGG"}
+ENGINES = {"CYCLES": ["CYCLES"], "EEVEE": ["BLENDER_EEVEE_NEXT", "BLENDER_EEVEE"], "WORKBENCH": ["BLENDER_WORKBENCH"]}
+
+__PROFILE_FUNCTION__
+# Quadros parados do job atual: frame renderizado -> frames que recebem um link dele
+HOLDS = {}
+
+__HOLD_LINK_FUNCTION__
+
+def apply_settings(scene, job):
+    render = scene.render
+    render.filepath = job["output"]
+    output_format = SPEC["output_format"]
+    if output_format in FFMPEG_CONTAINERS:
+        render.image_settings.file_format = "FFMPEG"
+        if FFMPEG_CONTAINERS[output_format]:
+            render.ffmpeg.format = FFMPEG_CONTAINERS[output_format]
+        if output_format == "H264":
+            render.ffmpeg.codec = "H264"
+        elif output_format == "OGV":
+            render.ffmpeg.codec = "THEORA"
+        if SPEC["video_codec"]:
+            try:
+                render.ffmpeg.codec = SPEC["video_codec"].upper()
+            except TypeError:
+                print(f"Render4Me: codec '{SPEC['video_codec']}' desconhecido, usando o padrão.")
+    else:
+        render.image_settings.file_format = FILE_FORMATS[output_format]
+    if SPEC["fps"]:
+        render.fps = SPEC["fps"]
+    for engine in ENGINES.get(job.get("render_engine") or SPEC["render_engine"], []):
+        try:
+            render.engine = engine
+            break
+        except TypeError:
+            continue
+    if SPEC["profile"]:
+        apply_profile(scene, SPEC["profile"])
+
+started = time.perf_counter()
+bpy.ops.wm.open_mainfile(filepath=SPEC["blend_file"])
+load_seconds = time.perf_counter() - started
+# Registrado depois de abrir o arquivo: open_mainfile remove os handlers
+bpy.app.handlers.render_write.append(link_held_frames)
+print(f"Render4Me: arquivo carregado em {load_seconds:.1f}s")
+
+results = []
+for job in SPEC["jobs"]:
+    job_started = time.perf_counter()
+    if job["kind"] == "scene":
+        scene = bpy.data.scenes.get(job["name"])
+        if scene is None:
+            print(f"Render4Me: cena '{job['name']}' não encontrada, pulando.")
+            results.append({"name": job["name"], "ok": False, "seconds": 0.0})
+            continue
+    else:
+        scene = bpy.context.scene
+        camera = bpy.data.objects.get(job["name"])
+        if camera is None or camera.type != "CAMERA":
+            print(f"Render4Me: câmera '{job['name']}' não encontrada, pulando.")
+            results.append({"name": job["name"], "ok": False, "seconds": 0.0})
+            continue
+        scene.camera = camera
+    apply_settings(scene, job)
+    HOLDS = job.get("holds", {})
+    for start, end in job["ranges"]:
+        scene.frame_start = start
+        scene.frame_end = end
+        bpy.ops.render.render(animation=True, scene=scene.name)
+    results.append({"name": job["name"], "ok": True, "seconds": time.perf_counter() - job_started})
+
+rendered = sum(1 for result in results if result["ok"])
+saved_seconds = load_seconds * max(0, rendered - 1)
+print(f"Render4Me: {rendered}/{len(results)} job(s) renderizado(s); economia estimada de carregamento: {saved_seconds:.1f}s")
+with open(SPEC["report_path"], "w", encoding="utf-8") as handle:
+    json.dump({"blend_file": SPEC["blend_file"], "load_seconds": load_seconds, "saved_seconds": saved_seconds, "jobs": results}, handle, indent=2)
+"""
+
+def write_persistent_worker_script(blend_file_path, jobs, output_format, render_engine, video_codec, fps, profile=None):
+    workers_dir = os.path.join(render4me_data_dir(), "workers")
+    os.makedirs(workers_dir, exist_ok=True)
+    spec = {
+        "blend_file": os.path.abspath(blend_file_path),
+        "jobs": jobs,
+        "output_format": output_format,
+        "render_engine": render_engine,
+        "video_codec": video_codec,
+        "fps": fps,
+        "profile": profile,
+    }
+    worker_id = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    spec["report_path"] = os.path.join(workers_dir, f"worker_{worker_id}.report.json")
+    script_path = os.path.join(workers_dir, f"worker_{worker_id}.py")
+    with open(script_path, "w", encoding="utf-8") as handle:
+        handle.write(PERSISTENT_WORKER_TEMPLATE.replace("__PROFILE_FUNCTION__", PROFILE_FUNCTION).replace("__HOLD_LINK_FUNCTION__", HOLD_LINK_FUNCTION).replace("__SPEC__", repr(json.dumps(spec))))
+    return script_path